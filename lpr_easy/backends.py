@@ -0,0 +1,102 @@
+# lpr_easy/backends.py
+# All comments/docstrings in English.
+
+"""
+Detector and OCR backend registry.
+
+A backend is a factory `factory(cfg: AppConfig) -> instance`, registered by
+name either as a callable or as a "module:attr" string that is only imported
+when the backend is created, so heavy frameworks (torch, ultralytics,
+easyocr, onnxruntime) never load for --help or for unused backends.
+
+Detectors provide `predict_batch(images, conf, imgsz) -> [[(x1,y1,x2,y2,score,cls)]]`
+and `class_names`. OCR engines provide `read_img_detail(bgr) -> OcrReading`
+and `settings_key()` (and `recognizer_only` to use the batched scheduler path).
+
+Third-party packages register without touching the CLI through entry points:
+
+    [project.entry-points."lpr_easy.detectors"]
+    mydet = "my_pkg.lpr:build_detector"
+"""
+
+from importlib import import_module
+from typing import Callable, Dict, List, Union
+
+from .config import AppConfig
+
+DETECTOR_GROUP = "lpr_easy.detectors"
+OCR_GROUP = "lpr_easy.ocr"
+
+Factory = Union[str, Callable[[AppConfig], object]]
+
+def _yolo(cfg: AppConfig):
+    from .detectors.yolo_detector import YoloPlateDetector
+    return YoloPlateDetector(cfg.weights)
+
+def _onnx(cfg: AppConfig):
+    from .detectors.onnx_detector import OnnxPlateDetector
+    return OnnxPlateDetector(cfg.weights, threads=cfg.worker_threads)
+
+def _easyocr_plus(cfg: AppConfig):
+    from .ocr.easyocr_engine import EasyOCREngine
+    gpu_flag = None
+    if cfg.ocr_gpu is not None:
+        gpu_flag = cfg.ocr_gpu.strip().lower() in ("true","1","yes","on")
+    return EasyOCREngine(langs=["en"], gpu=gpu_flag, mode=cfg.ocr_mode, accept_score=cfg.ocr_accept,
+                         recognizer_only=cfg.ocr_recognizer_only,
+                         plate_formats=cfg.plate_formats.split(",") if cfg.plate_formats else None)
+
+_REGISTRY: Dict[str, Dict[str, Factory]] = {
+    DETECTOR_GROUP: {"yolo": _yolo, "onnx": _onnx},
+    OCR_GROUP: {"easyocr-plus": _easyocr_plus},
+}
+_entry_points_loaded = set()
+
+def _load_entry_points(group: str):
+    """Add installed entry points of a group (names only; targets load on use)."""
+    if group in _entry_points_loaded:
+        return
+    _entry_points_loaded.add(group)
+    try:
+        from importlib.metadata import entry_points
+        eps = entry_points()
+        found = eps.select(group=group) if hasattr(eps, "select") else eps.get(group, [])
+    except Exception:
+        return
+    for ep in found:
+        _REGISTRY[group].setdefault(ep.name, ep.value)
+
+def register_detector(name: str, factory: Factory):
+    _REGISTRY[DETECTOR_GROUP][name] = factory
+
+def register_ocr(name: str, factory: Factory):
+    _REGISTRY[OCR_GROUP][name] = factory
+
+def detector_names() -> List[str]:
+    _load_entry_points(DETECTOR_GROUP)
+    return sorted(_REGISTRY[DETECTOR_GROUP])
+
+def ocr_names() -> List[str]:
+    """OCR backends, plus "none" (OCR disabled)."""
+    _load_entry_points(OCR_GROUP)
+    return ["none"] + sorted(_REGISTRY[OCR_GROUP])
+
+def _create(group: str, kind: str, name: str, cfg: AppConfig):
+    _load_entry_points(group)
+    factory = _REGISTRY[group].get(name)
+    if factory is None:
+        raise ValueError(f"Unknown {kind} backend: {name} (available: {', '.join(sorted(_REGISTRY[group]))})")
+    if isinstance(factory, str):
+        module, _, attr = factory.partition(":")
+        factory = getattr(import_module(module), attr)
+        _REGISTRY[group][name] = factory
+    return factory(cfg)
+
+def create_detector(name: str, cfg: AppConfig):
+    return _create(DETECTOR_GROUP, "detector", name, cfg)
+
+def create_ocr(name: str, cfg: AppConfig):
+    """OCR engine for a backend name; None for "none"."""
+    if name == "none":
+        return None
+    return _create(OCR_GROUP, "OCR", name, cfg)
@@ -0,0 +1,11 @@
+"""
+Benchmarks for LPR Easy (Pro).
+All comments/docstrings in English.
+"""
+
+from ..backends import register_detector, register_ocr
+
+# model-free "stub" backends; registered only when the benchmarks are imported,
+# so the user CLI never offers them (see `python -m lpr_easy.bench.stubs`)
+register_detector("stub", "lpr_easy.bench.stubs:build_stub_detector")
+register_ocr("stub", "lpr_easy.bench.stubs:build_stub_ocr")
@@ -0,0 +1,4 @@
+# python -m lpr_easy.bench -> offline benchmark suite
+from .suite import main
+
+main()
@@ -0,0 +1,139 @@
+# lpr_easy/bench/load_test.py
+# Closed-loop load test of `lpr_easy serve`: latency vs throughput per concurrency level.
+
+import argparse
+import http.client
+import json
+import socket
+import tempfile
+import threading
+import time
+from itertools import islice
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ..utils.inputs import iter_images
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float = 60.0):
+        super().__init__("localhost", timeout=timeout)
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+def _connect(url: str) -> http.client.HTTPConnection:
+    if url.startswith("unix:"):
+        return UnixHTTPConnection(url[len("unix:"):])
+    host, _, port = url.replace("http://", "").rstrip("/").partition(":")
+    return http.client.HTTPConnection(host, int(port or 80), timeout=60.0)
+
+def run_level(url: str, payloads: List[bytes], concurrency: int, duration: float) -> dict:
+    """
+    `concurrency` clients each send one image, wait for the answer and send
+    the next, for `duration` seconds. Returns throughput and latency percentiles.
+    """
+    lat: List[float] = []
+    codes: Dict[int, int] = {}
+    detections = [0]
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def client(k: int):
+        conn = _connect(url)
+        i = k
+        while time.perf_counter() < stop_at:
+            body = payloads[i % len(payloads)]
+            i += concurrency
+            t0 = time.perf_counter()
+            try:
+                conn.request("POST", "/detect", body=body, headers={"Content-Type": "application/octet-stream"})
+                resp = conn.getresponse()
+                data = resp.read()
+                code = resp.status
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = _connect(url)
+                code, data = 0, b""
+            dt = time.perf_counter() - t0
+            with lock:
+                codes[code] = codes.get(code, 0) + 1
+                if code == 200:
+                    lat.append(dt)
+                    detections[0] += len(json.loads(data))
+            if code == 429:
+                time.sleep(0.005)
+        conn.close()
+
+    threads = [threading.Thread(target=client, args=(k,)) for k in range(concurrency)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+    a = np.asarray(lat) * 1000.0 if lat else np.zeros(1)
+    p50, p95, p99 = np.percentile(a, [50, 95, 99])
+    return {
+        "concurrency": concurrency, "ok": len(lat), "rejected_429": codes.get(429, 0),
+        "errors": sum(v for c, v in codes.items() if c not in (200, 429)),
+        "images_per_sec": round(len(lat) / wall, 2), "detections_per_sec": round(detections[0] / wall, 2),
+        "latency_ms": {"p50": round(float(p50), 2), "p95": round(float(p95), 2), "p99": round(float(p99), 2)},
+    }
+
+def health(url: str) -> Optional[dict]:
+    conn = _connect(url)
+    try:
+        conn.request("GET", "/health")
+        return json.loads(conn.getresponse().read())
+    except (OSError, http.client.HTTPException, ValueError):
+        return None
+    finally:
+        conn.close()
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Load-test a running `lpr_easy serve` (latency vs throughput)")
+    p.add_argument("--url", default="http://127.0.0.1:8080", help="http://host:port or unix:/path/to.sock")
+    p.add_argument("--input_dir", default=None, help="Images to send (default: synthetic plate scenes).")
+    p.add_argument("--pattern", default="**/*.*")
+    p.add_argument("--images", type=int, default=32, help="Images to load / generate.")
+    p.add_argument("--concurrency", default="1,2,4,8,16", help="Comma-separated client counts to sweep.")
+    p.add_argument("--duration", type=float, default=10.0, help="Seconds per concurrency level.")
+    p.add_argument("--out", default=None, help="Write the JSON report here (default: stdout).")
+    args = p.parse_args(argv)
+
+    if args.input_dir:
+        paths = list(islice(iter_images(args.input_dir, args.pattern), args.images))
+    else:
+        from .synthetic import make_dataset
+        paths = make_dataset(tempfile.mkdtemp(prefix="lpr_load_"), n=args.images)
+    payloads = []
+    for path in paths:
+        with open(path, "rb") as f:
+            payloads.append(f.read())
+    if not payloads:
+        raise SystemExit("No images to send.")
+    if health(args.url) is None:
+        raise SystemExit(f"No server answering /health at {args.url}")
+
+    levels = []
+    for c in (int(x) for x in args.concurrency.split(",") if x.strip()):
+        res = run_level(args.url, payloads, c, args.duration)
+        levels.append(res)
+        print(f"[INFO] c={c:<3} {res['images_per_sec']:>8.1f} img/s  p50={res['latency_ms']['p50']:.1f} ms  "
+              f"p99={res['latency_ms']['p99']:.1f} ms  429={res['rejected_429']}  errors={res['errors']}")
+    report = {"url": args.url, "images": len(payloads), "duration_s": args.duration,
+              "levels": levels, "server": health(args.url)}
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+        print(f"[OK] Load-test report written: {args.out}")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# lpr_easy/bench/ocr_modes.py
+# Compare readtext (CRAFT + recognizer) vs recognizer-only OCR on the same crops.
+
+import argparse
+import json
+import time
+from typing import Dict, List
+
+import cv2
+
+from ..ocr.easyocr_engine import EasyOCREngine, VALID_PLATE_SCORE
+from ..utils.io_utils import collect_images
+from ..utils.text_utils import plate_validity_score
+
+def bench_ocr_modes(engine: EasyOCREngine, crops: List, repeat: int = 1) -> Dict[str, dict]:
+    """
+    Read every crop with recognizer_only off and on. Returns per-mode stats:
+    seconds per crop, recognizer passes per crop, valid-pattern rate, readtext
+    fallbacks, and agreement with the readtext mode.
+    """
+    modes = {"readtext": False, "recognizer-only": True}
+    texts: Dict[str, List[str]] = {}
+    stats: Dict[str, dict] = {}
+    saved = engine.recognizer_only
+    try:
+        for name, flag in modes.items():
+            engine.recognizer_only = flag
+            out, passes, fallbacks = [], 0, 0
+            t0 = time.perf_counter()
+            for _ in range(repeat):
+                out = []
+                for crop in crops:
+                    r = engine.read_img_detail(crop)
+                    out.append(r.text)
+                    passes += r.passes
+                    fallbacks += int(flag and r.source == "readtext")
+            dt = time.perf_counter() - t0
+            n = max(1, len(crops) * repeat)
+            texts[name] = out
+            stats[name] = {
+                "crops": len(crops),
+                "sec_per_crop": round(dt / n, 5),
+                "crops_per_sec": round(n / dt, 2) if dt > 0 else 0.0,
+                "passes_per_crop": round(passes / n, 2),
+                "valid_rate": round(sum(plate_validity_score(t) >= VALID_PLATE_SCORE for t in out) / max(1, len(out)), 4),
+                "readtext_fallbacks": fallbacks // max(1, repeat),
+            }
+    finally:
+        engine.recognizer_only = saved
+
+    ref = texts["readtext"]
+    for name, out in texts.items():
+        stats[name]["agree_with_readtext"] = round(sum(a == b for a, b in zip(out, ref)) / max(1, len(ref)), 4)
+    return stats
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Benchmark readtext vs recognizer-only OCR on plate crops")
+    p.add_argument("--crops_dir", required=True, help="Folder with plate crops (e.g. output of --save_crops).")
+    p.add_argument("--pattern", default="**/*.jpg", help="Glob pattern for crops.")
+    p.add_argument("--limit", type=int, default=0, help="Use at most N crops (0 = all).")
+    p.add_argument("--repeat", type=int, default=1, help="Repeat each mode N times.")
+    p.add_argument("--ocr-mode", dest="ocr_mode", choices=["cascade","exhaustive"], default="cascade")
+    p.add_argument("--ocr-gpu", type=str, default=None, help="'true'/'false'; autodetect if omitted.")
+    p.add_argument("--json", type=str, default=None, help="Optional JSON report path.")
+    args = p.parse_args(argv)
+
+    paths = collect_images(args.crops_dir, args.pattern)
+    if args.limit:
+        paths = paths[:args.limit]
+    crops = [c for c in (cv2.imread(x) for x in paths) if c is not None]
+    if not crops:
+        print("[INFO] No crops found.")
+        return
+
+    gpu = None if args.ocr_gpu is None else args.ocr_gpu.strip().lower() in ("true","1","yes","on")
+    engine = EasyOCREngine(langs=["en"], gpu=gpu, mode=args.ocr_mode)
+    engine.read_img_detail(crops[0])  # warm-up
+    stats = bench_ocr_modes(engine, crops, repeat=args.repeat)
+
+    print(f"{'mode':<16}{'crops/s':>10}{'s/crop':>10}{'passes':>8}{'valid':>8}{'agree':>8}{'fallbk':>8}")
+    for name, s in stats.items():
+        print(f"{name:<16}{s['crops_per_sec']:>10}{s['sec_per_crop']:>10}{s['passes_per_crop']:>8}"
+              f"{s['valid_rate']:>8}{s['agree_with_readtext']:>8}{s['readtext_fallbacks']:>8}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(stats, f, indent=2)
+        print(f"[OK] JSON written: {args.json}")
+
+if __name__ == "__main__":
+    main()
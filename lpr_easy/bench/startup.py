@@ -0,0 +1,66 @@
+# lpr_easy/bench/startup.py
+# Startup cost of the CLI: wall time, peak RSS and which heavy frameworks got imported.
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+HEAVY = ("torch", "ultralytics", "easyocr", "onnxruntime", "cv2")
+
+_REPORT = (
+    "\nimport json, sys\n"
+    "try:\n    import resource; rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+    "except ImportError:\n    rss = 0\n"
+    "if sys.platform == 'darwin': rss //= 1024\n"
+    f"print('@@' + json.dumps({{'rss_kb': rss, 'loaded': [m for m in {HEAVY!r} if m in sys.modules]}}))\n"
+)
+
+CASES: Dict[str, str] = {
+    "import lpr_easy": "import lpr_easy",
+    "lpr-easy --help": ("import sys, io, contextlib\nsys.argv = ['lpr-easy', '--help']\n"
+                        "from lpr_easy.cli import main\n"
+                        "with contextlib.redirect_stdout(io.StringIO()):\n"
+                        "    try:\n        main()\n    except SystemExit:\n        pass"),
+    "import pipeline": "import lpr_easy.pipelines.detect_then_read",
+    # what every start used to pay before backends were imported lazily
+    "eager frameworks": "import lpr_easy.pipelines.detect_then_read, torch, ultralytics, easyocr",
+}
+
+def measure(code: str, repeat: int = 5) -> dict:
+    """Median wall time (ms) of a fresh interpreter running code, plus its peak RSS."""
+    times: List[float] = []
+    info = {}
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-c", code + _REPORT], capture_output=True, text=True)
+        times.append((time.perf_counter() - t0) * 1000.0)
+        if proc.returncode != 0:
+            return {"error": (proc.stderr.strip().splitlines() or ["failed"])[-1]}
+        info = json.loads([l for l in proc.stdout.splitlines() if l.startswith("@@")][-1][2:])
+    return {"ms_median": round(statistics.median(times), 1), "ms_min": round(min(times), 1),
+            "peak_rss_mb": round(info["rss_kb"] / 1024.0, 1), "heavy_modules": info["loaded"]}
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Measure CLI startup time and memory (fresh interpreter per run)")
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--out", default=None, help="Write the JSON report here (default: stdout).")
+    args = p.parse_args(argv)
+
+    baseline = measure("pass", args.repeat)
+    report = {"python": baseline}
+    for name, code in CASES.items():
+        report[name] = measure(code, args.repeat)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+        print(f"[OK] Startup report written: {args.out}")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
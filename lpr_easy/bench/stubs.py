@@ -0,0 +1,154 @@
+# lpr_easy/bench/stubs.py
+# Model-free detector and OCR backends so benchmarks run without weights or downloads.
+
+import json
+import zlib
+from typing import List, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from ..ocr.easyocr_engine import CASCADE_PLAN, EXHAUSTIVE_PLAN, OCR_MODES, RECOG_HEIGHT, EasyOCREngine
+
+Detection = Tuple[int, int, int, int, float, int]
+
+class StubPlateDetector:
+    """
+    Drop-in for YoloPlateDetector on synthetic scenes: plates are the only
+    bright, plate-shaped blobs, so threshold + contours finds them. Same
+    predict/predict_batch interface and output tuples.
+
+    With resample=True images are first resized so the long side is imgsz,
+    like YOLO's letterbox, so small plates get lost at low imgsz and cost
+    grows with imgsz (used by the tiling benchmark).
+    """
+    class_names = ["plate"]
+
+    def __init__(self, min_height: int = 8, aspect: Tuple[float, float] = (1.8, 6.0), resample: bool = False):
+        self.min_height = min_height
+        self.aspect = aspect
+        self.resample = resample
+
+    def _find(self, img: np.ndarray, conf: float) -> List[Detection]:
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        _, mask = cv2.threshold(gray, 200, 255, cv2.THRESH_BINARY)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, np.ones((5, 5), np.uint8))
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        dets = []
+        for c in contours:
+            x, y, w, h = cv2.boundingRect(c)
+            if h < self.min_height or not (self.aspect[0] <= w / h <= self.aspect[1]):
+                continue
+            score = float(cv2.contourArea(c)) / float(w * h)
+            if score >= conf:
+                dets.append((x, y, x + w, y + h, score, 0))
+        return dets
+
+    def predict(self, img: np.ndarray, conf: float, imgsz: int) -> List[Detection]:
+        return self.predict_batch([img], conf=conf, imgsz=imgsz)[0]
+
+    def _find_resampled(self, img: np.ndarray, conf: float, imgsz: int) -> List[Detection]:
+        h, w = img.shape[:2]
+        r = imgsz / float(max(h, w))
+        small = cv2.resize(img, (max(1, round(w * r)), max(1, round(h * r))),
+                           interpolation=cv2.INTER_AREA if r < 1 else cv2.INTER_LINEAR)
+        return [(min(w - 1, int(x1 / r)), min(h - 1, int(y1 / r)), min(w - 1, int(x2 / r)), min(h - 1, int(y2 / r)), s, c)
+                for x1, y1, x2, y2, s, c in self._find(small, conf)]
+
+    def predict_batch(self, images: Sequence[np.ndarray], conf: float, imgsz: int) -> List[List[Detection]]:
+        if self.resample:
+            return [self._find_resampled(img, conf, imgsz) for img in images]
+        return [self._find(img, conf) for img in images]
+
+def build_stub_detector(cfg) -> StubPlateDetector:
+    """Backend factory ("stub"): model-free detector for benchmarks and load tests."""
+    return StubPlateDetector()
+
+class StubReader:
+    """
+    Stands in for easyocr.Reader. Each call spends `work` filter passes on the
+    model-height image (a stand-in for recognizer cost) and returns a
+    plate-shaped string derived from the image content, so identical crops
+    read identically. Low-contrast images read as nothing (exercises fallbacks).
+    """
+    character = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+    def __init__(self, work: int = 4, min_contrast: float = 12.0):
+        self.work = work
+        self.min_contrast = min_contrast
+
+    def _read(self, img: np.ndarray) -> Tuple[str, float]:
+        gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        h, w = gray.shape[:2]
+        if h == 0 or w == 0:
+            return "", 0.0
+        line = cv2.resize(gray, (max(1, int(w * RECOG_HEIGHT / h)), RECOG_HEIGHT))
+        acc = line.astype(np.float32)
+        for _ in range(self.work):
+            acc = cv2.Sobel(acc, cv2.CV_32F, 1, 0) * 0.5 + acc * 0.5
+        contrast = float(line.std())
+        if contrast < self.min_contrast:
+            return "", 0.0
+        thumb = cv2.resize(gray, (8, 4), interpolation=cv2.INTER_AREA)
+        rng = np.random.default_rng(zlib.crc32((thumb > thumb.mean()).tobytes()))
+        letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+        text = ("".join(rng.choice(list(letters), 3)) + str(rng.integers(0, 10))
+                + rng.choice(list(letters)) + "".join(str(d) for d in rng.integers(0, 10, 2)))
+        return text, min(0.99, 0.5 + contrast / 200.0)
+
+    def readtext(self, img: np.ndarray, detail: int = 1, rotation_info=None, **kwargs):
+        results = []
+        for angle in [0] + list(rotation_info or []):
+            rimg = img if not angle else np.ascontiguousarray(np.rot90(img, k=int(angle) // 90))
+            txt, conf = self._read(rimg)
+            if txt:
+                h, w = rimg.shape[:2]
+                results.append(([[0, 0], [w, 0], [w, h], [0, h]], txt, conf))
+        return [r[1] for r in results] if detail == 0 else results
+
+class StubOCREngine(EasyOCREngine):
+    """
+    EasyOCREngine with a StubReader: the real variants, cascade plans and
+    recognizer-only batching run unchanged, only the model calls are stubbed.
+    """
+    def __init__(self, mode: str = "cascade", accept_score: float = 12.8,
+                 plan=None, recognizer_only: bool = False, work: int = 4, plate_formats=None):
+        if mode not in OCR_MODES:
+            raise ValueError(f"Unknown OCR mode: {mode} (expected one of {OCR_MODES})")
+        self.langs = ["en"]
+        self.reader = StubReader(work=work)
+        self.mode = mode
+        self.accept_score = accept_score
+        self.plan = tuple(plan) if plan else (CASCADE_PLAN if mode == "cascade" else EXHAUSTIVE_PLAN)
+        self.recognizer_only = recognizer_only
+        self.set_plate_formats(plate_formats)
+
+    def settings_key(self) -> str:
+        return json.dumps({"stub": True, "work": self.reader.work, "base": super().settings_key()}, sort_keys=True)
+
+    def recognize_lines(self, lines: List[np.ndarray], batch_size: int = 32) -> List[Tuple[str, float]]:
+        return [self.reader._read(line) for line in lines]
+
+    def recognize_probs(self, lines: List[np.ndarray], batch_size: int = 32) -> List[np.ndarray]:
+        """CTC-shaped frames of the stub reads: blank, then each character twice at its conf and a blank."""
+        cols = 1 + len(self.grammar.charset)
+        out = []
+        for text, conf in self.recognize_lines(lines, batch_size):
+            frames = [np.eye(cols, dtype=np.float32)[0]]
+            for ch in text:
+                f = np.full(cols, (1.0 - conf) / (cols - 1), dtype=np.float32)
+                f[1 + self.grammar.charset.index(ch)] = conf
+                frames += [f, f, np.eye(cols, dtype=np.float32)[0]]
+            out.append(np.stack(frames))
+        return out
+
+def build_stub_ocr(cfg) -> StubOCREngine:
+    """Backend factory ("stub"): model-free OCR for benchmarks and load tests."""
+    return StubOCREngine(mode=cfg.ocr_mode, accept_score=cfg.ocr_accept, recognizer_only=cfg.ocr_recognizer_only,
+                         plate_formats=cfg.plate_formats.split(",") if cfg.plate_formats else None)
+
+if __name__ == "__main__":
+    # the regular CLI (batch or `serve`) with the stub backends registered, e.g.
+    # python -m lpr_easy.bench.stubs serve --detector stub --ocr stub --weights none
+    from ..cli import main
+    main()
@@ -0,0 +1,275 @@
+# lpr_easy/bench/suite.py
+# Offline benchmark: synthetic plates through the image pipeline, the OCR engine and the video pipeline.
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from ..config import AppConfig
+from ..pipelines.detect_then_read import iter_results
+from ..pipelines.outputs import ResultSink
+from ..pipelines.video_demo import process_video
+from ..utils.io_utils import decode_reduced, jpeg_size, pad_crop, pick_decode_scale
+from ..utils.tracking import greedy_match, iou_matrix
+from .stubs import StubOCREngine, StubPlateDetector
+from .synthetic import make_dataset, make_video
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+class Latencies:
+    """Per-stage call latencies (seconds) with percentile summaries in ms."""
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+
+    def add(self, stage: str, seconds: float):
+        self.samples.setdefault(stage, []).append(seconds)
+
+    def wrap(self, obj, method: str, stage: str):
+        """
+        Time every call of obj.method (instance attribute override). Calls whose
+        first argument is an empty list (nothing to do) are not recorded.
+        """
+        fn = getattr(obj, method)
+
+        def timed(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                if not (args and isinstance(args[0], list) and not args[0]):
+                    self.add(stage, time.perf_counter() - t0)
+        setattr(obj, method, timed)
+
+    def summary(self) -> Dict[str, dict]:
+        out = {}
+        for stage, xs in self.samples.items():
+            a = np.asarray(xs) * 1000.0
+            p50, p95, p99 = np.percentile(a, [50, 95, 99])
+            out[stage] = {"n": len(xs), "p50": round(float(p50), 3), "p95": round(float(p95), 3),
+                          "p99": round(float(p99), 3), "mean": round(float(a.mean()), 3)}
+        return out
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return round(rss / (1 << 20) if sys.platform == "darwin" else rss / 1024.0, 1)
+
+def bench_images(paths: List[str], truth: Dict[str, list], work_dir: str, batch_size: int = 8,
+                 prefetch: int = 2, ocr_work: int = 4, recognizer_only: bool = False) -> dict:
+    """Image pipeline (iter_results + ResultSink) with stub models."""
+    lat = Latencies()
+    for p in paths:  # standalone decode cost (also warms the page cache)
+        t0 = time.perf_counter()
+        cv2.imread(p)
+        lat.add("decode", time.perf_counter() - t0)
+
+    cfg = AppConfig(batch_size=batch_size, prefetch=prefetch, ocr="easyocr-plus", ocr_batch_size=16,
+                    ocr_recognizer_only=recognizer_only, csv=os.path.join(work_dir, "bench.csv"),
+                    save_crops=os.path.join(work_dir, "crops"), checkpoint_every=0)
+    os.makedirs(cfg.save_crops, exist_ok=True)
+    detector = StubPlateDetector()
+    engine = StubOCREngine(recognizer_only=recognizer_only, work=ocr_work)
+    lat.wrap(detector, "predict_batch", "detect_batch")
+    lat.wrap(engine, "read_img_detail", "ocr_crop")
+    lat.wrap(engine, "recognize_lines", "ocr_recognize_batch")
+
+    sink = ResultSink(cfg)
+    lat.wrap(sink, "write", "write_image")
+    plates = matched = n_truth = 0
+    t0 = time.perf_counter()
+    try:
+        for r in iter_results(cfg, paths, models=(detector, engine)):
+            sink.write(r)
+            plates += len(r.entries)
+            gt = np.array([t["bbox"] for t in truth.get(r.image, [])], dtype=np.float32).reshape(-1, 4)
+            pred = np.array([e["bbox"] for e in r.entries], dtype=np.float32).reshape(-1, 4)
+            matched += len(greedy_match(iou_matrix(gt, pred), 0.5))
+            n_truth += len(gt)
+    finally:
+        sink.close()
+    dt = time.perf_counter() - t0
+    return {
+        "images": len(paths), "plates": plates, "seconds": round(dt, 3),
+        "images_per_sec": round(len(paths) / dt, 2), "plates_per_sec": round(plates / dt, 2),
+        "det_recall": round(matched / max(1, n_truth), 4),
+        "latency_ms": lat.summary(),
+    }
+
+def bench_ocr(paths: List[str], truth: Dict[str, list], ocr_work: int = 4, recognizer_only: bool = False) -> dict:
+    """OCR engine alone on ground-truth crops."""
+    crops = []
+    for p in paths:
+        img = cv2.imread(p)
+        crops += [pad_crop(img, t["bbox"]) for t in truth.get(p, [])]
+    engine = StubOCREngine(recognizer_only=recognizer_only, work=ocr_work)
+    lat = Latencies()
+    passes = 0
+    t0 = time.perf_counter()
+    for crop in crops:
+        t1 = time.perf_counter()
+        passes += engine.read_img_detail(crop).passes
+        lat.add("read", time.perf_counter() - t1)
+    dt = time.perf_counter() - t0
+    return {
+        "crops": len(crops), "seconds": round(dt, 3),
+        "plates_per_sec": round(len(crops) / dt, 2) if dt > 0 else 0.0,
+        "passes_per_crop": round(passes / max(1, len(crops)), 2),
+        "latency_ms": lat.summary(),
+    }
+
+def bench_decode(paths: List[str], square_size: int = 640) -> dict:
+    """Full vs reduced (--decode-scale auto) JPEG decode of large photos."""
+    lat = Latencies()
+    decoded_mb = {"full": 0.0, "reduced": 0.0}
+    scales = []
+    for p in paths:
+        with open(p, "rb") as f:
+            data = f.read()
+        t0 = time.perf_counter()
+        img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        lat.add("full", time.perf_counter() - t0)
+        decoded_mb["full"] += img.nbytes / (1 << 20)
+        t0 = time.perf_counter()
+        size = jpeg_size(data)
+        scale = pick_decode_scale(size, square_size, "auto")
+        img, _ = decode_reduced(data, scale, size)
+        lat.add("reduced", time.perf_counter() - t0)
+        decoded_mb["reduced"] += img.nbytes / (1 << 20)
+        scales.append(scale)
+    n = max(1, len(paths))
+    return {
+        "images": len(paths), "scale": max(set(scales), key=scales.count) if scales else 1,
+        "decoded_mb_per_image": {k: round(v / n, 2) for k, v in decoded_mb.items()},
+        "latency_ms": lat.summary(),
+    }
+
+def bench_video(video: str, work_dir: str, ocr_work: int = 4, **kwargs) -> dict:
+    """Video pipeline (detections + per-track OCR, no re-encode) with stub models."""
+    detector = StubPlateDetector()
+    lat = Latencies()
+    lat.wrap(detector, "predict_batch", "detect_batch")
+    stats = process_video("", video, None, detector=detector, ocr_engine=StubOCREngine(work=ocr_work),
+                          detections_out=os.path.join(work_dir, "video_dets.csv"),
+                          events_out=os.path.join(work_dir, "video_events.csv"), **kwargs)
+    return {
+        "frames": stats["frames"], "seconds": round(stats["seconds"], 3),
+        "frames_per_sec": round(stats["overall_fps"], 2),
+        "stage_fps": {k: round(v, 2) for k, v in stats["fps"].items()},
+        "tracks": stats["tracks"],
+        "latency_ms": lat.summary(),
+    }
+
+def run_suite(images: int = 60, frames: int = 150, seed: int = 0, batch_size: int = 8, ocr_work: int = 4,
+              recognizer_only: bool = False, work_dir: Optional[str] = None) -> dict:
+    with tempfile.TemporaryDirectory(prefix="lpr_bench_") as tmp:
+        work_dir = work_dir or tmp
+        data_dir = os.path.join(work_dir, "data")
+        paths = make_dataset(data_dir, n=images, seed=seed)
+        with open(os.path.join(data_dir, "truth.json")) as f:
+            truth = json.load(f)
+        report = {
+            "meta": {
+                "images": images, "frames": frames, "seed": seed, "batch_size": batch_size,
+                "ocr_work": ocr_work, "recognizer_only": recognizer_only,
+                "python": platform.python_version(), "opencv": cv2.__version__, "machine": platform.machine(),
+            },
+            "image_pipeline": bench_images(paths, truth, work_dir, batch_size=batch_size,
+                                           ocr_work=ocr_work, recognizer_only=recognizer_only),
+            "ocr_engine": bench_ocr(paths, truth, ocr_work=ocr_work, recognizer_only=recognizer_only),
+            "large_jpeg_decode": bench_decode(make_dataset(os.path.join(work_dir, "large"), n=4, seed=seed,
+                                                           size=(4000, 3000))),
+        }
+        if frames > 0:
+            video = make_video(os.path.join(work_dir, "bench.avi"), frames=frames, seed=seed)
+            report["video"] = bench_video(video, work_dir, ocr_work=ocr_work, detect_stride=3)
+        report["peak_rss_mb"] = peak_rss_mb()
+    return report
+
+def _flatten(d: dict, prefix: str = "") -> Dict[str, float]:
+    out = {}
+    for k, v in d.items():
+        key = f"{prefix}{k}"
+        if isinstance(v, dict):
+            out.update(_flatten(v, key + "."))
+        elif isinstance(v, (int, float)) and not isinstance(v, bool):
+            out[key] = float(v)
+    return out
+
+def _higher_is_better(key: str) -> Optional[bool]:
+    """Direction of a metric, or None for metrics that are not compared."""
+    if key.startswith("meta.") or key.endswith((".n", ".images", ".plates", ".crops", ".frames", ".tracks")):
+        return None
+    if key.endswith(("_per_sec", "recall")) or ".stage_fps." in key:
+        return True
+    if ".latency_ms." in key and key.endswith((".p50", ".p95", ".p99")) or key == "peak_rss_mb":
+        return False
+    return None
+
+def compare(report: dict, baseline: dict, tolerance: float = 0.10) -> List[dict]:
+    """
+    Metrics that got worse than the baseline by more than `tolerance`
+    (relative): lower throughput/recall, higher latency or peak RSS.
+    """
+    cur, base = _flatten(report), _flatten(baseline)
+    regressions = []
+    for key, old in sorted(base.items()):
+        higher = _higher_is_better(key)
+        if higher is None or key not in cur or old <= 0:
+            continue
+        change = (cur[key] - old) / old
+        if (higher and change < -tolerance) or (not higher and change > tolerance):
+            regressions.append({"metric": key, "baseline": old, "current": cur[key], "change": round(change, 4)})
+    return regressions
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Offline LPR benchmark on synthetic plates (stub models, no downloads)")
+    p.add_argument("--images", type=int, default=60, help="Synthetic scenes for the image pipeline.")
+    p.add_argument("--frames", type=int, default=150, help="Synthetic video frames (0 = skip the video pipeline).")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--batch-size", dest="batch_size", type=int, default=8)
+    p.add_argument("--ocr-work", dest="ocr_work", type=int, default=4,
+                   help="Filter passes per stub recognizer call (simulated OCR cost).")
+    p.add_argument("--recognizer-only", dest="recognizer_only", action="store_true")
+    p.add_argument("--work-dir", dest="work_dir", default=None, help="Keep generated data and outputs here.")
+    p.add_argument("--out", default=None, help="Write the JSON report here (default: stdout).")
+    p.add_argument("--compare", default=None, help="Baseline JSON report; exit 1 on regressions.")
+    p.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative slowdown vs the baseline.")
+    args = p.parse_args(argv)
+
+    report = run_suite(images=args.images, frames=args.frames, seed=args.seed, batch_size=args.batch_size,
+                       ocr_work=args.ocr_work, recognizer_only=args.recognizer_only, work_dir=args.work_dir)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+        print(f"[OK] Benchmark report written: {args.out}")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("meta") != report["meta"]:
+            print("[WARN] Baseline was run with different settings or environment; comparison may be skewed.")
+        regressions = compare(report, baseline, args.tolerance)
+        for r in regressions:
+            print(f"[REGRESSION] {r['metric']}: {r['baseline']:g} -> {r['current']:g} ({r['change']:+.1%})")
+        if regressions:
+            sys.exit(1)
+        print(f"[OK] No regressions vs {args.compare} (tolerance {args.tolerance:.0%})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# lpr_easy/bench/synthetic.py
+# Synthetic plate scenes for offline benchmarks (no downloads, deterministic per seed).
+
+import json
+import os
+import string
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from ..utils.text_utils import PAT_BR_MERC, PAT_BR_OLD
+
+LETTERS = string.ascii_uppercase
+DIGITS = string.digits
+
+def random_plate(rng: np.random.Generator, mercosur: Optional[bool] = None) -> str:
+    """A random plate matching PAT_BR_MERC (ABC1D23) or PAT_BR_OLD (ABC1234)."""
+    if mercosur is None:
+        mercosur = bool(rng.integers(0, 2))
+    head = "".join(rng.choice(list(LETTERS), 3))
+    if mercosur:
+        text = head + rng.choice(list(DIGITS)) + rng.choice(list(LETTERS)) + "".join(rng.choice(list(DIGITS), 2))
+        assert PAT_BR_MERC.match(text)
+    else:
+        text = head + "".join(rng.choice(list(DIGITS), 4))
+        assert PAT_BR_OLD.match(text)
+    return text
+
+def render_plate(text: str, height: int = 60) -> np.ndarray:
+    """White plate with dark characters; Mercosur plates get the blue top band."""
+    width = int(height * 3.2)
+    plate = np.full((height, width, 3), 245, np.uint8)
+    cv2.rectangle(plate, (0, 0), (width - 1, height - 1), (20, 20, 20), max(1, height // 30))
+    top = 0
+    if PAT_BR_MERC.match(text):
+        top = height // 5
+        plate[:top] = (160, 60, 10)
+    scale = (height - top) / 38.0
+    thick = max(1, int(scale * 2))
+    (tw, th), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, scale, thick)
+    org = ((width - tw) // 2, top + (height - top + th) // 2)
+    cv2.putText(plate, text, org, cv2.FONT_HERSHEY_SIMPLEX, scale, (15, 15, 15), thick, cv2.LINE_AA)
+    return plate
+
+def make_background(rng: np.random.Generator, size: Tuple[int, int]) -> np.ndarray:
+    """Dark gradient + noise + a few 'vehicle' blocks (kept below plate brightness)."""
+    w, h = size
+    gy = np.linspace(40, 120, h, dtype=np.float32)[:, None]
+    gx = np.linspace(0, 30, w, dtype=np.float32)[None, :]
+    base = (gy + gx)[..., None] + rng.normal(0, 8, (h, w, 3)).astype(np.float32)
+    img = np.clip(base, 0, 170).astype(np.uint8)
+    for _ in range(int(rng.integers(2, 6))):
+        x, y = int(rng.integers(0, w - 50)), int(rng.integers(0, h - 50))
+        bw, bh = int(rng.integers(w // 8, w // 3)), int(rng.integers(h // 8, h // 3))
+        color = tuple(int(c) for c in rng.integers(20, 160, 3))
+        cv2.rectangle(img, (x, y), (min(w - 1, x + bw), min(h - 1, y + bh)), color, -1)
+    return img
+
+def paste_plate(img: np.ndarray, plate: np.ndarray, x: int, y: int, blur: float = 0.0) -> Tuple[int, int, int, int]:
+    """Paste a plate (optionally blurred) and return its box (x1, y1, x2, y2)."""
+    ph, pw = plate.shape[:2]
+    if blur > 0:
+        plate = cv2.GaussianBlur(plate, (0, 0), blur)
+    img[y:y + ph, x:x + pw] = plate
+    return x, y, x + pw, y + ph
+
+def make_scene(rng: np.random.Generator, size: Tuple[int, int] = (1280, 720), max_plates: int = 3,
+               heights: Tuple[int, int] = (18, 80), max_blur: float = 1.5):
+    """
+    One scene with 1..max_plates non-overlapping plates at varied scale and blur.
+    Returns (image, [{"bbox": [...], "plate": text}]).
+    """
+    w, h = size
+    img = make_background(rng, size)
+    truth, boxes = [], []
+    for _ in range(int(rng.integers(1, max_plates + 1))):
+        text = random_plate(rng)
+        plate = render_plate(text, int(rng.integers(heights[0], heights[1] + 1)))
+        ph, pw = plate.shape[:2]
+        for _attempt in range(20):
+            x, y = int(rng.integers(0, w - pw)), int(rng.integers(0, h - ph))
+            if all(x + pw + 8 < b[0] or b[2] + 8 < x or y + ph + 8 < b[1] or b[3] + 8 < y for b in boxes):
+                box = paste_plate(img, plate, x, y, float(rng.uniform(0, max_blur)))
+                boxes.append(box)
+                truth.append({"bbox": list(box), "plate": text})
+                break
+    return img, truth
+
+def make_dataset(out_dir: str, n: int = 50, seed: int = 0, size: Tuple[int, int] = (1280, 720)) -> List[str]:
+    """Write n JPEG scenes plus truth.json to out_dir; returns the image paths."""
+    os.makedirs(out_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    paths, truth = [], {}
+    for k in range(n):
+        img, t = make_scene(rng, size)
+        p = os.path.join(out_dir, f"scene_{k:05d}.jpg")
+        cv2.imwrite(p, img, [cv2.IMWRITE_JPEG_QUALITY, 92])
+        paths.append(p)
+        truth[p] = t
+    with open(os.path.join(out_dir, "truth.json"), "w") as f:
+        json.dump(truth, f, indent=2)
+    return paths
+
+def make_video(path: str, frames: int = 120, fps: float = 30.0, size: Tuple[int, int] = (960, 540),
+               seed: int = 0, plates: int = 2) -> str:
+    """Write an MJPG video with plates drifting across a static background."""
+    rng = np.random.default_rng(seed)
+    w, h = size
+    bg = make_background(rng, size)
+    movers = []
+    for k in range(plates):
+        plate = render_plate(random_plate(rng), int(rng.integers(30, 60)))
+        ph, pw = plate.shape[:2]
+        x0 = float(rng.uniform(0, w - pw))
+        y0 = float((k + 0.5) * h / plates - ph / 2)
+        vx = float(rng.uniform(-3, 3))
+        movers.append((plate, x0, y0, vx))
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, size)
+    if not writer.isOpened():
+        raise RuntimeError(f"Cannot open writer: {path}")
+    for f in range(frames):
+        img = bg.copy()
+        for plate, x0, y0, vx in movers:
+            ph, pw = plate.shape[:2]
+            x = int(np.clip(x0 + vx * f, 0, w - pw))
+            y = int(np.clip(y0, 0, h - ph))
+            paste_plate(img, plate, x, y)
+        writer.write(img)
+    writer.release()
+    return path
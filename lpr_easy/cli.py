@@ -2,9 +2,11 @@
 # All comments/docstrings in English.
 
 import argparse
+import sys
 from pathlib import Path
+from .backends import detector_names, ocr_names
 from .config import AppConfig
-from .pipelines.detect_then_read import run_pipeline
+from .utils.inputs import parse_shard
 
 def _str2bool(v: str):
     s = str(v).strip().lower()
@@ -12,35 +14,127 @@ def _str2bool(v: str):
     if s in ("no","false","f","n","0","off"): return False
     raise argparse.ArgumentTypeError("Boolean value expected.")
 
+def _shard(v: str):
+    try:
+        parse_shard(v)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return v.strip()
+
+def _plate_formats(v: str):
+    from .ocr.plate_grammar import country_templates
+    try:
+        country_templates(v.split(","))
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return ",".join(c.strip().upper() for c in v.split(",") if c.strip())
+
 def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(description="LPR Easy (Pro): YOLO detection + EasyOCR recognition")
     p.add_argument("--input_dir", type=str, default=None, help="Directory with images (used with --pattern).")
     p.add_argument("--image", type=str, default=None, help="Run on a single image file.")
     p.add_argument("--pattern", type=str, default="**/*.*", help="Glob pattern (e.g., '**/*.JPG').")
+    p.add_argument("--manifest", type=str, default=None,
+                   help="Read image paths from this file (one per line, '-' = stdin) instead of walking --input_dir.")
+    p.add_argument("--shard", type=_shard, default=None, metavar="K/N",
+                   help="Process only shard K (0-based) of N, split by a stable hash of the path relative to "
+                        "--input_dir (or of the manifest line). Merge the shards with `lpr-easy merge`.")
 
-    p.add_argument("--weights", type=str, required=True, help="YOLO .pt weights path.")
+    p.add_argument("--detector", type=str, default="yolo", choices=detector_names(),
+                   help="Detector backend (default: yolo).")
+    p.add_argument("--weights", type=str, required=True, help="Detector weights path (YOLO .pt).")
     p.add_argument("--square_size", type=int, default=640, help="YOLO inference size (imgsz).")
     p.add_argument("--conf", type=float, default=0.25, help="YOLO confidence threshold.")
+    p.add_argument("--batch-size", dest="batch_size", type=int, default=1,
+                   help="Number of images sent to YOLO per call (default: 1).")
+    p.add_argument("--tile", type=int, default=0,
+                   help="Tiled inference for small/distant plates: cut frames into overlapping tiles of this many "
+                        "source pixels (e.g. 640), each run at --square_size, merged across tiles (0 = off; "
+                        "disables --decode-scale).")
+    p.add_argument("--tile-overlap", dest="tile_overlap", type=float, default=0.2,
+                   help="Tile overlap as a fraction of the tile side (default: 0.2).")
+    p.add_argument("--tile-coarse", dest="tile_coarse", action="store_true",
+                   help="With --tile: also run the full frame (near plates) and skip flat tiles (sky, walls).")
+    p.add_argument("--decode-scale", dest="decode_scale", type=str, default="1", choices=["1","2","4","8","auto"],
+                   help="Decode JPEGs at 1/2, 1/4 or 1/8 size for detection ('auto': smallest that keeps the long "
+                        "side >= --square_size); boxes map back to full resolution and crops stay full-res. "
+                        "Ignored with --tile.")
+    p.add_argument("--prefetch", type=int, default=0,
+                   help="Batches to decode ahead of inference on a thread pool (0 = sequential).")
+    p.add_argument("--io-workers", dest="io_workers", type=int, default=4,
+                   help="Threads used for image decode and for JPEG writes in staged mode.")
+    p.add_argument("--cache-dir", dest="cache_dir", type=str, default=None,
+                   help="Folder for a persistent detection/OCR result cache keyed by content hash.")
+    p.add_argument("--cache-max-mb", dest="cache_max_mb", type=float, default=1024.0,
+                   help="Cache size limit in MB; least recently used entries are evicted (default: 1024).")
+    p.add_argument("--workers", type=int, default=0,
+                   help="Process images in N worker processes, each with its own warm models (0 = in-process).")
+    p.add_argument("--worker-threads", dest="worker_threads", type=int, default=0,
+                   help="Torch intra-op threads per worker (default: cores // workers).")
+    p.add_argument("--worker-timeout", dest="worker_timeout", type=float, default=300.0,
+                   help="Seconds per image before a worker is considered hung (0 = no limit).")
+
+    p.add_argument("--profile", action="store_true",
+                   help="Print per-stage timings (decode, detect, OCR, writes) and counters at the end.")
+    p.add_argument("--profile-prom", dest="profile_prom", type=str, default=None,
+                   help="Also write the profile as a Prometheus text-format file.")
+    p.add_argument("--profile-trace", dest="profile_trace", type=str, default=None,
+                   help="Also write a Chrome trace JSON (chrome://tracing, Perfetto) of the first spans.")
+    p.add_argument("--profile-trace-spans", dest="profile_trace_spans", type=int, default=20000,
+                   help="Spans recorded in the Chrome trace (default: 20000).")
+
+    p.add_argument("--watch", action="store_true",
+                   help="Keep running: process new images under --input_dir as they arrive (needs --csv or --out).")
+    p.add_argument("--watch-settle", dest="watch_settle", type=float, default=2.0,
+                   help="Seconds a new file must stay unchanged before it is read (default: 2).")
+    p.add_argument("--watch-poll", dest="watch_poll", type=float, default=1.0,
+                   help="Seconds between polls / event waits (default: 1).")
+    p.add_argument("--watch-backend", dest="watch_backend", choices=["auto","inotify","poll"], default="auto",
+                   help="File notification backend (auto = inotify on Linux, polling elsewhere).")
 
     p.add_argument("--save_pre", type=str, default=None, help="Folder for preprocessed (resized) images.")
     p.add_argument("--save_vis", type=str, default=None, help="Folder for detection visualizations.")
     p.add_argument("--save_crops", type=str, default=None, help="Folder to save plate crops.")
 
     p.add_argument("--csv", type=str, default=None, help="Main CSV output with detections (+OCR if enabled).")
-    p.add_argument("--out", type=str, default=None, help="Main JSON output file (used if --format json).")
-    p.add_argument("--format", dest="fmt", type=str, default="csv", choices=["csv","json"],
+    p.add_argument("--out", type=str, default=None, help="Main JSON/JSON Lines output file (used if --format json/jsonl).")
+    p.add_argument("--format", dest="fmt", type=str, default="csv", choices=["csv","json","jsonl"],
                    help="Main output format.")
-    p.add_argument("--name_with_plate", action="store_true", help="Rename crop files to include recognized plate.")
+    p.add_argument("--resume", action="store_true",
+                   help="Resume from the progress marker next to the main output: skip processed images and append.")
+    p.add_argument("--checkpoint-every", dest="checkpoint_every", type=int, default=0,
+                   help="Images between fsync'd progress checkpoints (default: 100 with --resume; "
+                        "without either flag no progress marker is written).")
+    p.add_argument("--name_with_plate", action="store_true", help="Include recognized plate in crop file names.")
 
-    p.add_argument("--ocr", choices=["none","easyocr-plus"], default="none",
-                   help="Apply OCR on saved crops (default: none).")
+    p.add_argument("--ocr", choices=ocr_names(), default="none",
+                   help="Apply OCR on detected plate crops (default: none).")
     p.add_argument("--ocr-gpu", type=str, default=None,
                    help="Force GPU for OCR: 'true'/'false'. If omitted, autodetect.")
     p.add_argument("--ocr-out", type=str, default=None,
                    help="Optional separate OCR-only file (CSV or JSON).")
+    p.add_argument("--ocr-mode", dest="ocr_mode", choices=["cascade","exhaustive"], default="cascade",
+                   help="cascade: cheapest variants first with early exit; exhaustive: all variants and rotations.")
+    p.add_argument("--ocr-accept", dest="ocr_accept", type=float, default=12.8,
+                   help="Cascade early-exit threshold on plate validity score + confidence (12 = valid 7-char plate).")
+    p.add_argument("--ocr-recognizer-only", dest="ocr_recognizer_only", action="store_true",
+                   help="Skip EasyOCR's text detector on YOLO crops; fall back to readtext if no plate pattern.")
+    p.add_argument("--ocr-batch-size", dest="ocr_batch_size", type=int, default=1,
+                   help="Plate crops collected across images per OCR batch (batched recognizer with --ocr-recognizer-only).")
+    p.add_argument("--plate-formats", dest="plate_formats", type=_plate_formats, default=None, metavar="CC[,CC...]",
+                   help="Decode plates against these country templates (e.g. BR, AR, ES, FR, IT, PT, DE; EU = all "
+                        "European ones) instead of the Brazilian normalization.")
     return p
 
 def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] == "serve":
+        from .pipelines.serve import main as serve_main
+        return serve_main(argv[1:])
+    if argv and argv[0] == "merge":
+        from .pipelines.merge import main as merge_main
+        return merge_main(argv[1:])
+
     parser = build_parser()
     args = parser.parse_args(argv)
 
@@ -50,4 +144,12 @@ def main(argv=None):
         args.pattern = Path(args.image).name
 
     cfg = AppConfig(**vars(args))
+    if cfg.watch:
+        from .pipelines.watch import watch_folder
+        if not cfg.input_dir:
+            parser.error("--watch needs --input_dir")
+        watch_folder(cfg, settle=cfg.watch_settle, poll=cfg.watch_poll, backend=cfg.watch_backend)
+        return
+    # imported here so --help and argument errors never load OpenCV or the models
+    from .pipelines.detect_then_read import run_pipeline
     run_pipeline(cfg)
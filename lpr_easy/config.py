@@ -10,11 +10,44 @@ class AppConfig:
     input_dir: Optional[str] = None
     image: Optional[str] = None
     pattern: str = "**/*.*"
+    manifest: Optional[str] = None  # file with one image path per line ("-" = stdin) instead of a directory walk
+    shard: Optional[str] = None  # "K/N": process only shard K (0-based) of N, by a stable hash of the path
 
     # Detection
+    detector: str = "yolo"  # backend name (see lpr_easy.backends)
     weights: str = ""
     square_size: int = 640
     conf: float = 0.25
+    batch_size: int = 1  # images per detector call
+    tile: int = 0  # tiled inference: tile side in source pixels (0 = whole frame)
+    tile_overlap: float = 0.2  # overlap between neighboring tiles, as a fraction of the tile side
+    tile_coarse: bool = False  # add a full-frame pass and skip flat tiles
+    decode_scale: str = "1"  # JPEG decode reduction for detection: "1" (full), "2", "4", "8" or "auto"
+
+    # Staged I/O
+    prefetch: int = 0  # batches decoded ahead of inference (0 = sequential)
+    io_workers: int = 4  # threads for decode and for JPEG writes
+
+    # Watch mode
+    watch: bool = False  # keep running and process new files under input_dir as they arrive
+    watch_settle: float = 2.0  # seconds a file must stay unchanged before it is read (polling)
+    watch_poll: float = 1.0  # seconds between polls / event waits
+    watch_backend: str = "auto"  # "auto" | "inotify" | "poll"
+
+    # Result cache
+    cache_dir: Optional[str] = None  # SQLite cache of detections/OCR keyed by content hash
+    cache_max_mb: float = 1024.0  # LRU eviction above this size
+
+    # Multi-process
+    workers: int = 0  # processes with their own models (0/1 = in-process)
+    worker_threads: int = 0  # torch threads per worker (0 = cores // workers)
+    worker_timeout: float = 300.0  # seconds per image before a worker is considered hung (0 = no limit)
+
+    # Profiling
+    profile: bool = False  # print per-stage timings and counters at the end
+    profile_prom: Optional[str] = None  # Prometheus text-format metrics file
+    profile_trace: Optional[str] = None  # Chrome trace JSON of the first profile_trace_spans spans
+    profile_trace_spans: int = 20000
 
     # Outputs
     save_pre: Optional[str] = None
@@ -22,10 +55,17 @@ class AppConfig:
     save_crops: Optional[str] = None
     csv: Optional[str] = None
     out: Optional[str] = None
-    fmt: str = "csv"
+    fmt: str = "csv"  # "csv" | "json" | "jsonl"
     name_with_plate: bool = False
+    resume: bool = False  # skip images recorded in the progress marker and append
+    checkpoint_every: int = 0  # images between fsync'd progress markers (0: 100 with --resume, else no marker)
 
     # OCR
-    ocr: str = "none"  # "none" | "easyocr-plus"
+    ocr: str = "none"  # "none" | OCR backend name, e.g. "easyocr-plus"
     ocr_gpu: Optional[str] = None  # "true" | "false" | None (autodetect)
     ocr_out: Optional[str] = None  # optional separate OCR-only CSV/JSON
+    ocr_mode: str = "cascade"  # "cascade" | "exhaustive"
+    ocr_accept: float = 12.8  # cascade stops once validity score + conf reaches this
+    ocr_recognizer_only: bool = False  # skip CRAFT; readtext only as a fallback
+    ocr_batch_size: int = 1  # crops queued across images before OCR runs (and lines per recognizer batch)
+    plate_formats: Optional[str] = None  # e.g. "BR,AR" or "EU": grammar-constrained decoding (plate_grammar)
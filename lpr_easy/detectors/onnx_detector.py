@@ -0,0 +1,125 @@
+# lpr_easy/detectors/onnx_detector.py
+# All comments/docstrings in English.
+
+import ast
+import os
+from typing import List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from .yolo_detector import Detection, boxes_to_dets
+
+def letterbox(img: np.ndarray, size: int, color: int = 114) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """
+    Resize keeping aspect ratio and pad to size x size (Ultralytics LetterBox,
+    centered). Returns (image, gain, (pad_x, pad_y)).
+    """
+    h, w = img.shape[:2]
+    r = min(size / h, size / w)
+    new_w, new_h = int(round(w * r)), int(round(h * r))
+    dw, dh = (size - new_w) / 2, (size - new_h) / 2
+    if (new_w, new_h) != (w, h):
+        img = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
+    left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
+    img = cv2.copyMakeBorder(img, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(color, color, color))
+    return img, r, (left, top)
+
+def to_blob(images: Sequence[np.ndarray]) -> np.ndarray:
+    """BGR HWC uint8 images (same size) -> RGB NCHW float32 in [0, 1]."""
+    batch = np.stack(images)[..., ::-1].transpose(0, 3, 1, 2)
+    return np.ascontiguousarray(batch, dtype=np.float32) * (1.0 / 255.0)
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """Greedy NMS on (N,4) xyxy boxes; returns kept indices by descending score."""
+    order = np.argsort(-scores, kind="stable")
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        xx1 = np.maximum(boxes[i, 0], boxes[rest, 0])
+        yy1 = np.maximum(boxes[i, 1], boxes[rest, 1])
+        xx2 = np.minimum(boxes[i, 2], boxes[rest, 2])
+        yy2 = np.minimum(boxes[i, 3], boxes[rest, 3])
+        inter = np.clip(xx2 - xx1, 0, None) * np.clip(yy2 - yy1, 0, None)
+        iou = inter / np.maximum(areas[i] + areas[rest] - inter, 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.asarray(keep, dtype=np.int64)
+
+def decode_predictions(pred: np.ndarray, conf: float, iou: float = 0.7,
+                       max_det: int = 300) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Decode one image of raw YOLOv8/YOLO11 export output, shape (4 + nc, N)
+    with (cx, cy, w, h, class scores...), into letterbox-space xyxy boxes,
+    scores and class ids after confidence filtering and per-class NMS.
+    """
+    scores_all = pred[4:]
+    cls_ids = scores_all.argmax(0)
+    scores = scores_all[cls_ids, np.arange(pred.shape[1])]
+    m = scores > conf
+    if not m.any():
+        empty = np.zeros((0,), dtype=np.float32)
+        return np.zeros((0, 4), dtype=np.float32), empty, empty
+    cx, cy, w, h = pred[:4, m]
+    boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+    scores, cls_ids = scores[m], cls_ids[m]
+    # offset boxes per class so one NMS call never suppresses across classes
+    keep = nms(boxes + cls_ids[:, None] * 7680.0, scores, iou)[:max_det]
+    return boxes[keep], scores[keep], cls_ids[keep].astype(np.float32)
+
+class OnnxPlateDetector:
+    """
+    Plate detector on ONNX Runtime (CPU provider) for Ultralytics ONNX
+    exports; no torch needed. Letterbox, normalization, decoding and NMS are
+    NumPy. Models exported with a dynamic batch axis run a whole batch per
+    call, fixed-batch models one image per call. Works the same with the int8
+    model written by `python -m lpr_easy.detectors.onnx_tools export --int8`.
+    """
+    def __init__(self, weights: str, threads: int = 0, iou: float = 0.7):
+        import onnxruntime as ort  # imported only when this backend is built
+        if not os.path.isfile(weights):
+            raise FileNotFoundError(f"ONNX model not found: {weights}")
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads > 0:
+            opts.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(weights, sess_options=opts, providers=["CPUExecutionProvider"])
+        inp = self.session.get_inputs()[0]
+        self.input_name = inp.name
+        self.dynamic_batch = not isinstance(inp.shape[0], int)
+        self.fixed_size: Optional[int] = inp.shape[2] if isinstance(inp.shape[2], int) else None
+        self.iou = iou
+        meta = self.session.get_modelmeta().custom_metadata_map
+        try:
+            names = ast.literal_eval(meta.get("names", "{}"))
+            self.class_names = [names[k] for k in sorted(names)] if names else ["plate"]
+        except (ValueError, SyntaxError):
+            self.class_names = ["plate"]
+
+    def predict(self, img: np.ndarray, conf: float, imgsz: int) -> List[Detection]:
+        return self.predict_batch([img], conf=conf, imgsz=imgsz)[0]
+
+    def predict_batch(self, images: Sequence[np.ndarray], conf: float, imgsz: int) -> List[List[Detection]]:
+        """
+        Run detection on N images; returns one detection list per image, in
+        original image coordinates. A static-shape model uses its own size.
+        """
+        if not images:
+            return []
+        size = self.fixed_size or imgsz
+        boxed = [letterbox(img, size) for img in images]
+        blob = to_blob([b[0] for b in boxed])
+        if self.dynamic_batch:
+            raw = self.session.run(None, {self.input_name: blob})[0]
+        else:
+            raw = np.concatenate([self.session.run(None, {self.input_name: blob[i:i + 1]})[0]
+                                  for i in range(len(blob))])
+        out = []
+        for img, (_, gain, (px, py)), pred in zip(images, boxed, raw):
+            xyxy, scores, cls_ids = decode_predictions(pred, conf, self.iou)
+            xyxy = (xyxy - np.array([px, py, px, py], dtype=np.float32)) / gain
+            out.append(boxes_to_dets(xyxy, scores, cls_ids, img.shape))
+        return out
@@ -0,0 +1,116 @@
+# lpr_easy/detectors/onnx_tools.py
+# Export a YOLO .pt plate model to ONNX (optionally int8) and check parity with Ultralytics.
+
+import argparse
+import importlib.util
+import json
+import shutil
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+import cv2
+import numpy as np
+
+from ..utils.io_utils import collect_images
+from ..utils.tracking import greedy_match, iou_matrix
+
+def export_onnx(weights: str, imgsz: int = 640, dynamic: bool = True, opset: int = 17,
+                int8: bool = False, out: str = "") -> List[str]:
+    """
+    Export with Ultralytics (needs torch, once) and optionally write an int8
+    copy with onnxruntime dynamic quantization. Returns the written paths.
+    """
+    from ultralytics import YOLO
+    path = YOLO(weights).export(format="onnx", imgsz=imgsz, dynamic=dynamic, opset=opset, simplify=True)
+    if out and Path(out).resolve() != Path(path).resolve():
+        shutil.move(path, out)
+        path = out
+    paths = [str(path)]
+    if int8:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        q_path = str(Path(path).with_suffix(".int8.onnx"))
+        quantize_dynamic(str(path), q_path, weight_type=QuantType.QUInt8)
+        paths.append(q_path)
+    return paths
+
+def parity(weights: str, onnx_path: str, images: List[str], conf: float = 0.25, imgsz: int = 640,
+           iou_match: float = 0.5) -> Dict[str, float]:
+    """
+    Run the Ultralytics and ONNX backends on the same images and compare
+    boxes matched by IoU: max/mean corner difference (px), max score
+    difference and boxes found by only one backend.
+    """
+    from .onnx_detector import OnnxPlateDetector
+    from .yolo_detector import YoloPlateDetector
+    ref_det, test_det = YoloPlateDetector(weights), OnnxPlateDetector(onnx_path)
+    diffs, score_diffs, only_ref, only_test, matched = [], [], 0, 0, 0
+    for p in images:
+        img = cv2.imread(p)
+        if img is None:
+            continue
+        ref = np.array(ref_det.predict(img, conf, imgsz), dtype=np.float32).reshape(-1, 6)
+        test = np.array(test_det.predict(img, conf, imgsz), dtype=np.float32).reshape(-1, 6)
+        pairs = greedy_match(iou_matrix(ref[:, :4], test[:, :4]), iou_match)
+        for i, j in pairs:
+            diffs.append(np.abs(ref[i, :4] - test[j, :4]).max())
+            score_diffs.append(abs(ref[i, 4] - test[j, 4]))
+        matched += len(pairs)
+        only_ref += len(ref) - len(pairs)
+        only_test += len(test) - len(pairs)
+    return {
+        "images": len(images), "matched": matched, "only_ultralytics": only_ref, "only_onnx": only_test,
+        "max_corner_px": float(max(diffs, default=0.0)), "mean_corner_px": float(np.mean(diffs)) if diffs else 0.0,
+        "max_score_diff": float(max(score_diffs, default=0.0)),
+    }
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="ONNX Runtime detector tools")
+    sub = p.add_subparsers(dest="cmd", required=True)
+
+    e = sub.add_parser("export", help="Export YOLO .pt weights to ONNX (optionally + int8 copy).")
+    e.add_argument("--weights", required=True, help="YOLO .pt weights")
+    e.add_argument("--imgsz", type=int, default=640)
+    e.add_argument("--static", action="store_true", help="Fixed batch of 1 (default: dynamic batch axis).")
+    e.add_argument("--opset", type=int, default=17)
+    e.add_argument("--int8", action="store_true", help="Also write <model>.int8.onnx (dynamic quantization).")
+    e.add_argument("--out", default="", help="Output .onnx path (default: next to the weights).")
+
+    c = sub.add_parser("parity", help="Compare ONNX boxes against the Ultralytics backend.")
+    c.add_argument("--weights", required=True, help="YOLO .pt weights (reference)")
+    c.add_argument("--onnx", required=True, help="Exported .onnx model")
+    c.add_argument("--input_dir", required=True)
+    c.add_argument("--pattern", default="**/*.*")
+    c.add_argument("--limit", type=int, default=50)
+    c.add_argument("--conf", type=float, default=0.25)
+    c.add_argument("--imgsz", type=int, default=640)
+    c.add_argument("--tol-px", dest="tol_px", type=float, default=3.0, help="Max allowed corner difference (px).")
+    c.add_argument("--tol-score", dest="tol_score", type=float, default=0.05, help="Max allowed score difference.")
+    c.add_argument("--max-unmatched", dest="max_unmatched", type=int, default=0,
+                   help="Boxes allowed to appear in only one backend (scores near --conf may flip).")
+    c.add_argument("--skip-missing", dest="skip_missing", action="store_true",
+                   help="Exit 0 with a notice when onnxruntime or ultralytics is not installed (CI jobs).")
+    args = p.parse_args(argv)
+
+    if args.cmd == "export":
+        for path in export_onnx(args.weights, args.imgsz, not args.static, args.opset, args.int8, args.out):
+            print(f"[OK] Written: {path}")
+        return
+
+    missing = [m for m in ("onnxruntime", "ultralytics") if importlib.util.find_spec(m) is None]
+    if missing and args.skip_missing:
+        print(f"[SKIP] ONNX parity needs {', '.join(missing)}.")
+        return
+    imgs = collect_images(args.input_dir, args.pattern)
+    if args.limit > 0:
+        imgs = imgs[:args.limit]
+    res = parity(args.weights, args.onnx, imgs, conf=args.conf, imgsz=args.imgsz)
+    print(json.dumps(res, indent=2))
+    ok = (res["max_corner_px"] <= args.tol_px and res["max_score_diff"] <= args.tol_score
+          and res["only_ultralytics"] + res["only_onnx"] <= args.max_unmatched)
+    print("[OK] ONNX matches Ultralytics within tolerance." if ok else "[FAIL] ONNX differs from Ultralytics.")
+    if not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,73 @@
 # lpr_easy/detectors/yolo_detector.py
 # All comments/docstrings in English.
 
-from typing import List, Tuple
+from typing import List, Sequence, Tuple
 import numpy as np
-from ultralytics import YOLO
+
+Detection = Tuple[int,int,int,int,float,int]
+
+def boxes_to_dets(xyxy: np.ndarray, scores: np.ndarray, cls_ids: np.ndarray,
+                  shape: Tuple[int, ...]) -> List[Detection]:
+    """
+    Convert (N,4) boxes + (N,) scores/classes into clipped detection tuples.
+    Boxes are truncated to int, clipped to the image and degenerate ones dropped.
+    """
+    if len(xyxy) == 0:
+        return []
+    h, w = shape[:2]
+    b = xyxy.astype(int)
+    b[:, [0, 2]] = np.clip(b[:, [0, 2]], 0, w-1)
+    b[:, [1, 3]] = np.clip(b[:, [1, 3]], 0, h-1)
+    keep = (b[:, 2] > b[:, 0]) & (b[:, 3] > b[:, 1])
+    return [
+        (int(x1), int(y1), int(x2), int(y2), float(s), int(c))
+        for (x1, y1, x2, y2), s, c in zip(b[keep].tolist(), scores[keep].tolist(), cls_ids[keep].tolist())
+    ]
 
 class YoloPlateDetector:
     """
     Thin wrapper around Ultralytics YOLO for plate detection.
     """
     def __init__(self, weights: str):
+        from ultralytics import YOLO  # heavy (torch); imported only when a detector is built
         self.model = YOLO(weights)
         # class names exposed by the model (if any)
         self.class_names = self.model.names if hasattr(self.model, "names") else ["plate"]
 
-    def predict(self, img: np.ndarray, conf: float, imgsz: int) -> List[Tuple[int,int,int,int,float,int]]:
+    def predict(self, img: np.ndarray, conf: float, imgsz: int) -> List[Detection]:
         """
         Run detection on a single image and return a list of detections:
         (x1, y1, x2, y2, score, cls_id)
         """
-        results = self.model.predict(img, conf=conf, imgsz=imgsz, verbose=False)
-        r = results[0]
-        dets = []
-        if r.boxes is not None and len(r.boxes) > 0:
-            h, w = img.shape[:2]
-            for b in r.boxes:
-                xyxy = b.xyxy[0].cpu().numpy().astype(int).tolist()
-                score = float(b.conf[0].cpu().numpy()) if b.conf is not None else 0.0
-                cls_id = int(b.cls[0].cpu().numpy()) if b.cls is not None else 0
-                x1, y1, x2, y2 = xyxy
-                x1 = max(0, min(x1, w-1)); x2 = max(0, min(x2, w-1))
-                y1 = max(0, min(y1, h-1)); y2 = max(0, min(y2, h-1))
-                if x2 > x1 and y2 > y1:
-                    dets.append((x1, y1, x2, y2, score, cls_id))
-        return dets
+        return self.predict_batch([img], conf=conf, imgsz=imgsz)[0]
+
+    def predict_batch(self, images: Sequence[np.ndarray], conf: float, imgsz: int) -> List[List[Detection]]:
+        """
+        Run detection on N images, one Ultralytics call per distinct image shape.
+        Returns one detection list per input image, in input order.
+
+        Ultralytics letterboxes a mixed-shape batch to a full imgsz square but a
+        same-shape batch (or a single image) to the minimal stride-aligned
+        rectangle, so grouping by shape keeps results equal to predict().
+        """
+        groups = {}
+        for i, img in enumerate(images):
+            groups.setdefault(img.shape, []).append(i)
+        out: List[List[Detection]] = [[] for _ in images]
+        for idx in groups.values():
+            results = self.model.predict([images[i] for i in idx], conf=conf, imgsz=imgsz, verbose=False)
+            for i, r in zip(idx, results):
+                out[i] = self._to_dets(r, images[i].shape)
+        return out
+
+    @staticmethod
+    def _to_dets(r, shape: Tuple[int, ...]) -> List[Detection]:
+        boxes = r.boxes
+        if boxes is None or len(boxes) == 0:
+            return []
+        # one device->host transfer per tensor instead of one per box
+        xyxy = boxes.xyxy.cpu().numpy()
+        n = len(xyxy)
+        scores = boxes.conf.cpu().numpy() if boxes.conf is not None else np.zeros(n, dtype=np.float32)
+        cls_ids = boxes.cls.cpu().numpy() if boxes.cls is not None else np.zeros(n, dtype=np.float32)
+        return boxes_to_dets(xyxy, scores, cls_ids, shape)
@@ -1,12 +1,16 @@
 # lpr_easy/ocr/easyocr_engine.py
 # All comments/docstrings in English.
 
-from typing import List, Tuple, Optional, Dict, Any
+import json
+import re
+from dataclasses import dataclass
+from typing import List, Tuple, Optional, Dict, Any, Sequence
 import cv2
 import numpy as np
-import easyocr
 
+from ..utils import profiling
 from ..utils.text_utils import normalize_plate, plate_validity_score, ALLOWLIST
+from .plate_grammar import PlateGrammar
 
 def _unsharp(img, ksize=(0,0), sigma=1.0, amount=1.5, thresh=0):
     import numpy as np, cv2
@@ -17,6 +21,7 @@ def _unsharp(img, ksize=(0,0), sigma=1.0, amount=1.5, thresh=0):
         np.copyto(sharp, img, where=low_contrast_mask)
     return sharp
 
+@profiling.profiled("ocr.variants")
 def build_variants(bgr: np.ndarray) -> List[np.ndarray]:
     """
     Build a small set of preprocessed grayscale variants for TTA-like OCR.
@@ -33,15 +38,167 @@ def build_variants(bgr: np.ndarray) -> List[np.ndarray]:
                                cv2.THRESH_BINARY, 31, 10)
     return [v1, v2, v3, v4]
 
+def split_plate_lines(gray: np.ndarray, max_aspect: float = 2.0,
+                      band: Tuple[float, float] = (0.3, 0.7)) -> List[List[int]]:
+    """
+    Cheap projection-based line split for two-row plates (Mercosur motorcycles).
+    Returns EasyOCR horizontal boxes [x_min, x_max, y_min, y_max]: one box for
+    the whole crop, or two boxes split at the emptiest row of the middle band.
+    """
+    h, w = gray.shape[:2]
+    full = [[0, w, 0, h]]
+    if h < 8 or w / float(h) > max_aspect:
+        return full
+    _, bw = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    ink = bw.mean(axis=1)
+    lo, hi = int(h * band[0]), int(h * band[1])
+    if hi <= lo:
+        return full
+    cut = lo + int(np.argmin(ink[lo:hi]))
+    # split only on a clear gap between two inked rows
+    if ink[cut] > 0.5 * min(ink[:cut].mean(), ink[cut:].mean()):
+        return full
+    return [[0, w, 0, cut], [0, w, cut, h]]
+
+def rotate_image(img: np.ndarray, angle: float) -> np.ndarray:
+    """Rotate around the center keeping the size; borders are replicated."""
+    h, w = img.shape[:2]
+    m = cv2.getRotationMatrix2D((w / 2.0, h / 2.0), angle, 1.0)
+    return cv2.warpAffine(img, m, (w, h), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+def join_lines(results: Sequence[Tuple[str, float]]) -> Tuple[str, float]:
+    """Join per-row reads top to bottom; confidence is that of the weakest row."""
+    texts = [(t, c) for t, c in results if t]
+    if not texts:
+        return "", 0.0
+    return "".join(t for t, _ in texts), min(c for _, c in texts)
+
+RECOG_HEIGHT = 64  # easyocr recognizer input height (easyocr.config.imgH)
+EASYOCR_TESTED = ((1, 7), (1, 8))  # [from, to) EasyOCR versions whose private helpers we call
+
+_easyocr_checked = False
+
+def _easyocr_private():
+    """
+    EasyOCR's undocumented line-level helpers (compute_ratio_and_resize,
+    get_text) used by the recognizer-only path. They are not public API, so
+    the installed version is checked once against EASYOCR_TESTED.
+    """
+    global _easyocr_checked
+    import easyocr
+    from easyocr.recognition import get_text
+    from easyocr.utils import compute_ratio_and_resize
+    if not _easyocr_checked:
+        _easyocr_checked = True
+        version = tuple(int(x) for x in re.findall(r"\d+", getattr(easyocr, "__version__", "0"))[:2])
+        if not EASYOCR_TESTED[0] <= version < EASYOCR_TESTED[1]:
+            print(f"[WARN] easyocr {getattr(easyocr, '__version__', '?')} is untested with the recognizer-only "
+                  f"path (written for {'.'.join(map(str, EASYOCR_TESTED[0]))}.x); check --ocr-recognizer-only reads.")
+    return compute_ratio_and_resize, get_text
+
+def resize_line(line: np.ndarray) -> np.ndarray:
+    """Resize a text row to recognizer height, keeping its aspect ratio (EasyOCR's own resize)."""
+    compute_ratio_and_resize, _ = _easyocr_private()
+    h, w = line.shape[:2]
+    return compute_ratio_and_resize(line, width=w, height=h, model_height=RECOG_HEIGHT)[0]
+
+def run_get_text(reader, lines: List[np.ndarray], width: int, ignore_char: str) -> List[Tuple[str, float]]:
+    """EasyOCR's get_text (beam search) on model-height lines padded to `width`; (text, conf) per line."""
+    _, get_text = _easyocr_private()
+    res = get_text(reader.character, imgH=RECOG_HEIGHT, imgW=width, recognizer=reader.recognizer,
+                   converter=reader.converter, image_list=[([[0, 0]] * 4, line) for line in lines],
+                   ignore_char=ignore_char, decoder="beamsearch", beamWidth=5, batch_size=len(lines),
+                   contrast_ths=0.05, adjust_contrast=1.0, filter_ths=0.003, workers=0, device=reader.device)
+    return [(txt, float(conf)) for _, txt, conf in res]
+RECOG_BUCKET = 64  # width granularity for batching line images
+
+VARIANT_NAMES = ("gray", "unsharp", "clahe", "adaptive")  # build_variants order
+
+# (variant, extra rotations) stages. Every readtext pass also reads the
+# unrotated image, so a stage costs 1 + len(rotations) recognizer passes.
+EXHAUSTIVE_PLAN = tuple((name, (0, -5, 5)) for name in VARIANT_NAMES)
+CASCADE_PLAN = (
+    ("gray", ()), ("clahe", ()), ("unsharp", ()),
+    ("gray", (-5, 5)), ("clahe", (-5, 5)), ("unsharp", (-5, 5)),
+    ("adaptive", (-5, 5)),
+)
+OCR_MODES = ("cascade", "exhaustive")
+VALID_PLATE_SCORE = 10  # plate_validity_score bonus for a pattern match
+
+@dataclass
+class OcrReading:
+    """
+    Best plate reading for one crop plus the path that produced it.
+    """
+    text: str = ""
+    conf: float = 0.0
+    variant: str = ""  # winning variant name ("" if nothing was read)
+    rotations: Tuple[int, ...] = ()  # extra rotations of the winning pass
+    passes: int = 0  # recognizer passes spent on this crop
+    source: str = ""  # "recognize" (no CRAFT) | "readtext" (CRAFT + recognizer)
+
 class EasyOCREngine:
     """
     EasyOCR engine with tuned defaults for alphanumeric license plates.
+
+    mode="cascade" tries variants cheapest-first and stops once
+    plate_validity_score + confidence reaches accept_score; rotations and the
+    adaptive-threshold variant only run as fallbacks. mode="exhaustive" reads
+    every variant with rotations (the original behavior).
+
+    recognizer_only=True skips EasyOCR's CRAFT text detector: the crop (or its
+    two text rows) is fed straight to the recognizer, and readtext only runs
+    when the direct read does not match a plate pattern.
+
+    plate_formats (country codes of plate_grammar.PLATE_FORMATS, e.g.
+    ["BR", "AR"] or ["EU"]) replaces normalize_plate: direct reads are
+    decoded from the recognizer's character probabilities against those
+    templates, readtext strings are snapped to them, and validity means
+    fitting one of them. Direct reads then always fit a template, so the
+    readtext stage is only skipped once their score reaches accept_score.
     """
-    def __init__(self, langs=None, gpu: Optional[bool] = None):
+    def __init__(self, langs=None, gpu: Optional[bool] = None,
+                 mode: str = "cascade", accept_score: float = 12.8,
+                 plan: Optional[Sequence[Tuple[str, Tuple[int, ...]]]] = None,
+                 recognizer_only: bool = False, plate_formats: Optional[Sequence[str]] = None):
+        import easyocr  # heavy (torch); imported only when an engine is built
         import torch
+        if mode not in OCR_MODES:
+            raise ValueError(f"Unknown OCR mode: {mode} (expected one of {OCR_MODES})")
         langs = langs or ["en"]
+        self.langs = list(langs)
         gpu_flag = torch.cuda.is_available() if gpu is None else bool(gpu)
         self.reader = easyocr.Reader(langs, gpu=gpu_flag, recog_network="latin_g2", download_enabled=True)
+        self.mode = mode
+        self.accept_score = accept_score
+        self.plan = tuple(plan) if plan else (CASCADE_PLAN if mode == "cascade" else EXHAUSTIVE_PLAN)
+        self.recognizer_only = recognizer_only
+        self.set_plate_formats(plate_formats)
+
+    def set_plate_formats(self, plate_formats: Optional[Sequence[str]]):
+        """Build the plate grammar (None or empty: normalize_plate, Brazilian patterns)."""
+        self.plate_formats = [c.strip().upper() for c in plate_formats or [] if c.strip()]
+        self.grammar = None
+        if self.plate_formats:
+            charset = "".join(c for c in ALLOWLIST if c in self.reader.character)
+            self.grammar = PlateGrammar.for_countries(self.plate_formats, charset)
+
+    def settings_key(self) -> str:
+        """Settings that change readings (used to key cached OCR results)."""
+        return json.dumps({
+            "langs": self.langs, "net": "latin_g2", "mode": self.mode, "accept": self.accept_score,
+            "plan": [[n, list(r)] for n, r in self.plan], "recognizer_only": self.recognizer_only,
+            "plate_formats": self.plate_formats,
+        }, sort_keys=True)
+
+    def normalize(self, txt: str) -> str:
+        return self.grammar.snap(txt) if self.grammar is not None else normalize_plate(txt)
+
+    def validity(self, text: str) -> int:
+        """plate_validity_score, or with plate formats VALID_PLATE_SCORE + 2 for any template match."""
+        if self.grammar is None:
+            return plate_validity_score(text)
+        return VALID_PLATE_SCORE + 2 if self.grammar.matches(text) else 0
 
     def read_path(self, path: str) -> Tuple[str, float]:
         img = cv2.imread(path)
@@ -50,25 +207,166 @@ class EasyOCREngine:
         return self.read_img(img)
 
     def read_img(self, bgr: np.ndarray) -> Tuple[str, float]:
-        variants = build_variants(bgr)
-        best_txt, best_conf, best_score = "", 0.0, -999
-        for v in variants:
+        r = self.read_img_detail(bgr)
+        return r.text, r.conf
+
+    def _readtext(self, img: np.ndarray, rotations: Tuple[int, ...]):
+        """CRAFT detection + recognition. Returns (results, recognizer passes)."""
+        with profiling.span("ocr.readtext"):
             results = self.reader.readtext(
-                v, detail=1, allowlist=ALLOWLIST, decoder="beamsearch",
+                img, detail=1, allowlist=ALLOWLIST, decoder="beamsearch",
                 text_threshold=0.3, low_text=0.2, link_threshold=0.2,
                 paragraph=False, min_size=5, contrast_ths=0.05, adjust_contrast=1.0,
-                rotation_info=[0,-5,5],
+                rotation_info=list(rotations) or None,
             )
+        return results, 1 + len(rotations)
+
+    def direct_candidates(self, img: np.ndarray, rotations: Tuple[int, ...]) -> List[List[np.ndarray]]:
+        """
+        Recognizer inputs for one variant: the unrotated image plus one per extra
+        rotation, each split into its text rows and resized to model height.
+        """
+        cands = []
+        for angle in (0,) + tuple(rotations):
+            rimg = rotate_image(img, angle) if angle else img
+            lines = []
+            for x_min, x_max, y_min, y_max in split_plate_lines(rimg):
+                line = rimg[y_min:y_max, x_min:x_max]
+                if line.size == 0:
+                    continue
+                lines.append(resize_line(line))
+            cands.append(lines)
+        return cands
+
+    @staticmethod
+    def _buckets(lines: List[np.ndarray], batch_size: int):
+        """(bucket width, line indices) chunks of at most batch_size lines, narrowest first."""
+        buckets: Dict[int, List[int]] = {}
+        for i, line in enumerate(lines):
+            width = -(-line.shape[1] // RECOG_BUCKET) * RECOG_BUCKET
+            buckets.setdefault(width, []).append(i)
+        for width, idxs in sorted(buckets.items()):
+            for k in range(0, len(idxs), max(1, batch_size)):
+                yield width, idxs[k:k + max(1, batch_size)]
+
+    @profiling.profiled("ocr.recognize")
+    def recognize_lines(self, lines: List[np.ndarray], batch_size: int = 32) -> List[Tuple[str, float]]:
+        """
+        Run the recognizer on model-height grayscale line images, grouped into
+        width buckets of at most batch_size images (one forward pass each).
+        Returns (text, conf) per line, in input order.
+        """
+        out: List[Tuple[str, float]] = [("", 0.0)] * len(lines)
+        ignore_char = "".join(set(self.reader.character) - set(ALLOWLIST))
+        for width, chunk in self._buckets(lines, batch_size):
+            for i, read in zip(chunk, run_get_text(self.reader, [lines[i] for i in chunk], width, ignore_char)):
+                out[i] = read
+        return out
+
+    @profiling.profiled("ocr.recognize")
+    def recognize_probs(self, lines: List[np.ndarray], batch_size: int = 32) -> List[np.ndarray]:
+        """
+        Recognizer forward passes like recognize_lines, returning per-frame
+        character probabilities instead of decoded text: one (T, 1 + C) array
+        per line with the CTC blank in column 0 and the grammar's charset
+        after it (other characters removed and renormalized, as EasyOCR does
+        for its ignore list).
+        """
+        import torch
+        r = self.reader
+        cols = [0] + [1 + r.character.index(c) for c in self.grammar.charset]
+        out: List[np.ndarray] = [np.zeros((0, len(cols)), np.float32)] * len(lines)
+        for width, chunk in self._buckets(lines, batch_size):
+            # EasyOCR's AlignCollate/NormalizePAD: [-1, 1], right-padded with the last column
+            batch = np.empty((len(chunk), 1, RECOG_HEIGHT, width), dtype=np.float32)
+            for j, i in enumerate(chunk):
+                line = lines[i][:, :width].astype(np.float32) / 127.5 - 1.0
+                batch[j, 0, :, :line.shape[1]] = line
+                batch[j, 0, :, line.shape[1]:] = line[:, -1:]
+            with torch.no_grad():
+                x = torch.from_numpy(batch).to(r.device)
+                preds = r.recognizer(x, torch.zeros((len(chunk), 1), dtype=torch.long, device=x.device))
+                probs = torch.softmax(preds, dim=2).cpu().numpy()
+            probs = probs[:, :, cols]
+            probs /= np.maximum(probs.sum(axis=2, keepdims=True), 1e-12)
+            for j, i in enumerate(chunk):
+                out[i] = probs[j]
+        return out
+
+    def read_lines(self, cands: List[List[np.ndarray]], batch_size: int = 32) -> List[Tuple[str, float]]:
+        """
+        Read recognizer candidates (each the text rows of one image, top to
+        bottom) with all rows in one recognize call. Returns (text, conf) per
+        candidate: rows joined by join_lines, or with plate formats the best
+        template-valid string of the rows' probabilities.
+        """
+        flat = [line for lines in cands for line in lines]
+        if self.grammar is None:
+            res = iter(self.recognize_lines(flat, batch_size=batch_size))
+            return [join_lines([next(res) for _ in lines]) for lines in cands]
+        probs = iter(self.recognize_probs(flat, batch_size=batch_size))
+        seqs = [self.grammar.join_rows([next(probs) for _ in lines]) for lines in cands]
+        with profiling.span("ocr.grammar"):
+            decoded = self.grammar.decode_ctc(seqs, k=1)
+        return [(d[0].text, d[0].conf) if d else ("", 0.0) for d in decoded]
+
+    def _recognize(self, img: np.ndarray, rotations: Tuple[int, ...]):
+        """Recognition only on the whole crop or its two rows, joined top to bottom."""
+        cands = self.direct_candidates(img, rotations)
+        n = sum(len(lines) for lines in cands)
+        results = [(None,) + read for read in self.read_lines(cands, batch_size=n or 1)]
+        return results, n
+
+    def consider(self, best: OcrReading, best_score: float, txt: str, conf: float,
+                 variant: str, rotations: Tuple[int, ...], source: str) -> float:
+        """Keep the candidate in `best` if it scores higher; returns the best score."""
+        if not txt:
+            return best_score
+        norm = self.normalize(txt)
+        score = self.validity(norm) + int(conf*100)*0.01
+        if score > best_score:
+            best.text, best.conf, best_score = norm, float(conf), score
+            best.variant, best.rotations, best.source = variant, tuple(rotations), source
+        return best_score
+
+    def accepted(self, best_score: float) -> bool:
+        return self.mode == "cascade" and best_score >= self.accept_score
+
+    def _run_plan(self, variants: Dict[str, np.ndarray], read_fn, source: str,
+                  best: OcrReading, best_score: float) -> float:
+        for name, rotations in self.plan:
+            results, passes = read_fn(variants[name], rotations)
+            best.passes += passes
             for _, txt, conf in results:
-                if not txt: continue
-                norm = normalize_plate(txt)
-                score = plate_validity_score(norm) + int(conf*100)*0.01
-                if score > best_score:
-                    best_txt, best_conf, best_score = norm, float(conf), score
-
-        if not best_txt:
-            flat = self.reader.readtext(variants[0], detail=0, allowlist=ALLOWLIST)
+                best_score = self.consider(best, best_score, txt, conf, name, rotations, source)
+            if self.accepted(best_score):
+                break
+        return best_score
+
+    def finish_readtext(self, variants: Dict[str, np.ndarray], best: OcrReading, best_score: float) -> OcrReading:
+        """
+        readtext (CRAFT) stage: skipped when a direct read already matched a
+        plate pattern, plus the flat last-resort read when nothing was found.
+        """
+        if best.source == "recognize" and self.validity(best.text) >= VALID_PLATE_SCORE:
+            if self.grammar is None or best_score >= self.accept_score:
+                return best
+        self._run_plan(variants, self._readtext, "readtext", best, best_score)
+
+        if not best.text:
+            with profiling.span("ocr.readtext"):
+                flat = self.reader.readtext(variants["gray"], detail=0, allowlist=ALLOWLIST)
+            best.passes += 1
             if isinstance(flat, list) and flat:
                 joined = "".join([t for t in flat if isinstance(t, str)])
-                best_txt = normalize_plate(joined)
-        return best_txt, best_conf
+                best.text = self.normalize(joined)
+                if best.text:
+                    best.variant, best.source = "gray-flat", "readtext"
+        return best
+
+    def read_img_detail(self, bgr: np.ndarray) -> OcrReading:
+        variants = dict(zip(VARIANT_NAMES, build_variants(bgr)))
+        best, best_score = OcrReading(), -999
+        if self.recognizer_only:
+            best_score = self._run_plan(variants, self._recognize, "recognize", best, best_score)
+        return self.finish_readtext(variants, best, best_score)
@@ -0,0 +1,398 @@
+# lpr_easy/ocr/plate_grammar.py
+# All comments/docstrings in English.
+
+"""
+Grammar-constrained plate decoding.
+
+Instead of reading the recognizer's best string and fixing confusable
+characters afterwards (normalize_plate), the decoder searches the
+recognizer's character probabilities directly for the most likely strings
+that fit one of the configured plate templates, so each position gets the
+letter or digit its template allows.
+
+A template is one token per plate position:
+    L      letter          D      digit          A      letter or digit
+    [XYZ]  one of the listed characters
+Any token may be followed by {n} or {m,n} to repeat it, e.g. "LLLDLDD"
+(Brazil, Mercosur) or "L{2,5}D{1,4}" (Germany, without the separators).
+New formats are data: register_format("XX", "LLDDDD"), no regex code.
+"""
+
+import itertools
+import re
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..utils.text_utils import ALLOWLIST
+
+DIGITS = "0123456789"
+LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+CLASSES = {"L": LETTERS, "D": DIGITS, "A": DIGITS + LETTERS}
+
+PLATE_FORMATS: Dict[str, Tuple[str, ...]] = {
+    "BR": ("LLLDDDD", "LLLDLDD"),                        # ABC1234, Mercosur ABC1D23
+    "AR": ("LLLDDD", "LLDDDLL", "DDDLLL", "LDDDLLL"),    # ABC123, Mercosur AB123CD, motos 123ABC / A123BCD
+    "ES": ("DDDD[BCDFGHJKLMNPRSTVWXYZ]{3}",),            # 1234BCD, no vowels
+    "FR": ("[ABCDEFGHJKLMNPQRSTVWXYZ]{2}DDD[ABCDEFGHJKLMNPQRSTVWXYZ]{2}",),  # AB123CD, no I/O/U
+    "IT": ("[ABCDEFGHJKLMNPRSTVWXYZ]{2}DDD[ABCDEFGHJKLMNPRSTVWXYZ]{2}",),   # AB123CD, no I/O/Q/U
+    "PT": ("LLDDDD", "DDDDLL", "DDLLDD", "LLDDLL"),      # older formats and AA00AA
+    "DE": ("L{2,5}D{1,4}",),                             # district + letters + number, separators dropped
+}
+FORMAT_GROUPS: Dict[str, Tuple[str, ...]] = {"EU": ("ES", "FR", "IT", "PT", "DE")}
+
+_TOKEN = re.compile(r"([LDA]|\[[0-9A-Z]+\])(?:\{(\d+)(?:,(\d+))?\})?")
+
+def register_format(code: str, *templates: str):
+    """Add (or replace) the templates of a country code."""
+    for t in templates:
+        expand_template(t)  # validate now, not at first decode
+    PLATE_FORMATS[code.upper()] = tuple(templates)
+
+def expand_template(template: str) -> List[Tuple[str, ...]]:
+    """
+    Fixed-length expansions of a template: each one is a tuple with the
+    allowed characters of every position. Raises ValueError on bad syntax.
+    """
+    spec = template.replace(" ", "").upper()
+    tokens, pos = [], 0
+    while pos < len(spec):
+        m = _TOKEN.match(spec, pos)
+        if not m:
+            raise ValueError(f"Bad plate template {template!r} at position {pos}")
+        tok, lo, hi = m.groups()
+        chars = CLASSES[tok] if tok in CLASSES else tok[1:-1]
+        lo = int(lo) if lo else 1
+        hi = int(hi) if hi else lo
+        if hi < lo or hi == 0:
+            raise ValueError(f"Bad repeat in plate template {template!r}: {m.group(0)}")
+        tokens.append((chars, lo, hi))
+        pos = m.end()
+    out = []
+    for counts in itertools.product(*[range(lo, hi + 1) for _, lo, hi in tokens]):
+        out.append(tuple(chars for (chars, _, _), n in zip(tokens, counts) for _ in range(n)))
+    return out
+
+def country_templates(countries: Sequence[str]) -> List[str]:
+    """Templates of the given country codes or groups (e.g. ["BR", "AR", "EU"]), in order."""
+    out: List[str] = []
+    for code in countries:
+        code = code.strip().upper()
+        if not code:
+            continue
+        for c in FORMAT_GROUPS.get(code, (code,)):
+            if c not in PLATE_FORMATS:
+                known = ", ".join(sorted(PLATE_FORMATS) + sorted(FORMAT_GROUPS))
+                raise ValueError(f"Unknown plate format: {c} (known: {known})")
+            out += [t for t in PLATE_FORMATS[c] if t not in out]
+    return out
+
+# Characters a recognizer commonly mistakes for each other; snap() uses them
+# as the prior when only a string (no probabilities) is available.
+CONFUSABLE: Dict[str, str] = {
+    "0": "ODQ", "O": "0DQ", "D": "0O", "Q": "O0",
+    "1": "ILT", "I": "1L", "L": "1I", "T": "17",
+    "2": "Z", "Z": "2", "4": "A", "A": "4",
+    "5": "S", "S": "5", "6": "G", "G": "6",
+    "7": "T", "8": "B", "B": "8",
+}
+
+class PlateCandidate(NamedTuple):
+    text: str
+    score: float  # total log-probability of the decoded path
+    conf: float  # geometric-mean probability per plate character
+    template: str  # template (country format) the text fits
+
+_NEG = -1e9  # finite "impossible" log-prob, so sums never produce nan
+
+class PlateGrammar:
+    """
+    Set of fixed-length plate templates over `charset` (the recognizer's
+    allowlist), compiled to per-position boolean masks.
+
+    decode_positions() takes per-position log-probabilities (B, n, C);
+    decode_ctc() takes per-frame CTC probabilities, blank first. Both decode
+    a whole batch at once and return the top-k template-valid strings per
+    item, best first.
+    """
+    def __init__(self, templates: Sequence[str], charset: str = ALLOWLIST):
+        self.charset = charset
+        self.index = {c: i for i, c in enumerate(charset)}
+        self.templates: List[Tuple[str, np.ndarray]] = []  # (source template, (n, C) mask)
+        seen = set()
+        for t in templates:
+            for pos in expand_template(t):
+                mask = np.array([[c in allowed for c in charset] for allowed in pos], dtype=bool)
+                if mask.tobytes() in seen or not mask.any(axis=1).all():
+                    continue
+                seen.add(mask.tobytes())
+                self.templates.append((t, mask))
+        if not self.templates:
+            raise ValueError("No usable plate templates.")
+        self.lengths = sorted({m.shape[0] for _, m in self.templates})
+
+    @classmethod
+    def for_countries(cls, countries: Sequence[str], charset: str = ALLOWLIST) -> "PlateGrammar":
+        return cls(country_templates(countries), charset)
+
+    def template_of(self, text: str) -> Optional[str]:
+        """First template that text fits, or None."""
+        idx = [self.index.get(c, -1) for c in text]
+        if -1 in idx:
+            return None
+        for t, mask in self.templates:
+            if mask.shape[0] == len(idx) and mask[np.arange(len(idx)), idx].all():
+                return t
+        return None
+
+    def matches(self, text: str) -> bool:
+        return self.template_of(text) is not None
+
+    def join_rows(self, rows: Sequence[np.ndarray]) -> np.ndarray:
+        """CTC outputs of a plate's text rows as one sequence, top to bottom, with a blank frame between rows."""
+        sep = np.zeros((1, 1 + len(self.charset)), dtype=np.float32)
+        sep[0, 0] = 1.0
+        parts = []
+        for row in rows:
+            parts += [sep, row] if parts else [row]
+        return np.concatenate(parts).astype(np.float32, copy=False) if parts else sep[:0]
+
+    def _collect(self, found: List[List[PlateCandidate]], k: int) -> List[List[PlateCandidate]]:
+        """Best k distinct texts per item over all templates."""
+        out = []
+        for cands in found:
+            cands.sort(key=lambda c: -c.score)
+            best: Dict[str, PlateCandidate] = {}
+            for c in cands:
+                if c.text not in best:
+                    best[c.text] = c
+            out.append(list(best.values())[:k])
+        return out
+
+    def decode_positions(self, logp: np.ndarray, k: int = 1) -> List[List[PlateCandidate]]:
+        """
+        Top-k template-valid strings for a batch of per-position
+        log-probabilities (B, n, C) over charset. Only templates of length n
+        apply; positions are independent, so the search is exact.
+        """
+        logp = np.asarray(logp, dtype=np.float64)
+        b, n, _ = logp.shape
+        found: List[List[PlateCandidate]] = [[] for _ in range(b)]
+        for t, mask in self.templates:
+            if mask.shape[0] != n:
+                continue
+            lp = np.where(mask[None], logp, _NEG)
+            scores, paths = _topk_paths(lp, k)
+            for i in range(b):
+                for s, path in zip(scores[i], paths[i]):
+                    if s > _NEG / 2:
+                        found[i].append(PlateCandidate(self._text(path), float(s), float(np.exp(s / n)), t))
+        return self._collect(found, k)
+
+    def decode_ctc(self, probs: Sequence[np.ndarray], k: int = 1) -> List[List[PlateCandidate]]:
+        """
+        Top-k template-valid strings for a batch of CTC outputs, each a
+        (T_i, 1 + C) array of per-frame probabilities with the blank in
+        column 0 and charset after it.
+
+        A constrained Viterbi pass (vectorized over the batch, the templates
+        of one length and the characters) finds the best alignment of exactly
+        n characters for every template whose length n is within one of the
+        unconstrained read's (or nearest to it). Each character is limited
+        to its template's classes and a repeat needs a blank in between (CTC
+        collapse rule).
+        The frames aligned to each position then rank its alternatives, so
+        the other k - 1 candidates differ from the best in one or a few
+        positions with the same alignment. conf is the geometric mean of the
+        aligned frame probabilities per character, scaled down by how much
+        less likely (per character) the path is than the unconstrained best
+        path, so a character the template forced in or out lowers it.
+        """
+        b = len(probs)
+        if b == 0:
+            return []
+        frames = [_squeeze_blanks(np.asarray(p, dtype=np.float32)) for p in probs]
+        t_max = max(1, max(len(p) for p in frames))
+        c = len(self.charset)
+        lp = np.full((b, t_max, 1 + c), _NEG, dtype=np.float32)
+        lp[:, :, 0] = 0.0  # pad with certain blanks
+        for i, p in enumerate(frames):
+            if len(p):
+                lp[i, :len(p)] = np.log(np.clip(p, 1e-12, None))
+        # (total, template, mask, backtrace, row) per item, over all templates
+        paths: List[list] = [[] for _ in range(b)]
+        # only lengths within one character of the free (greedy) read are searched
+        greedy = lp.argmax(axis=2)
+        free_len = ((greedy != 0) & (greedy != np.c_[np.full(b, -1), greedy[:, :-1]])).sum(axis=1)
+        lengths = np.array(self.lengths)
+        near = np.abs(lengths[None, :] - free_len[:, None])
+        near = (near <= np.maximum(1, near.min(axis=1, keepdims=True)))
+        for li, n in enumerate(self.lengths):
+            group = [(t, m) for t, m in self.templates if m.shape[0] == n]
+            items = np.flatnonzero(near[:, li])
+            if not len(items):
+                continue
+            rows = np.repeat(items, len(group))
+            masks = np.tile(np.stack([m for _, m in group]), (len(items), 1, 1))
+            total, backtrace = _ctc_viterbi(lp[rows], masks)
+            for r, i in enumerate(rows):
+                if total[r] > _NEG / 2:
+                    t, m = group[r % len(group)]
+                    paths[i].append((float(total[r]), t, m, backtrace, r))
+        # Alternatives of a template never beat its best path, so the k best
+        # strings come from the k best templates of each item.
+        jobs: Dict[int, list] = {}
+        for i in range(b):
+            for total, t, mask, backtrace, r in sorted(paths[i], key=lambda x: -x[0])[:k]:
+                jobs.setdefault(mask.shape[0], []).append((i, total, t, mask, backtrace(r)))
+        cum = np.concatenate([np.zeros((b, 1, c)), np.cumsum(lp[:, :, 1:], axis=1, dtype=np.float64)], axis=1)
+        free = lp.max(axis=2).sum(axis=1, dtype=np.float64)  # best unconstrained path
+        found: List[List[PlateCandidate]] = [[] for _ in range(b)]
+        for n, group in jobs.items():
+            items = np.array([j[0] for j in group])[:, None]
+            runs = np.array([j[4] for j in group])  # (R, n, 3): first frame, end frame, character
+            t0, t1, best_ch = runs[:, :, 0], runs[:, :, 1], runs[:, :, 2]
+            # summed log-probs of the frames aligned to each position
+            pos = np.where(np.stack([j[3] for j in group]), cum[items, t1] - cum[items, t0], _NEG)
+            vit = np.take_along_axis(pos, best_ch[:, :, None], axis=2)[:, :, 0].sum(axis=1)
+            scores, alts = _topk_paths(pos, k)
+            # the best alignment's own string first: the top alternative may repeat a
+            # character across a blank-less boundary, which CTC would collapse
+            scores = np.concatenate([vit[:, None], scores], axis=1)
+            alts = np.concatenate([best_ch[:, None, :], alts], axis=1)
+            per_char = np.take_along_axis(pos, alts.transpose(0, 2, 1), axis=2) / (t1 - t0)[:, :, None]
+            conf = np.exp(per_char.mean(axis=1))
+            for r, (i, total, t, _, rr) in enumerate(group):
+                for s, path, cf in zip(scores[r], alts[r], conf[r]):
+                    if s > _NEG / 2 and not _repeats_without_blank(path, rr):
+                        score = float(total - vit[r] + s)
+                        cf *= np.exp(min(0.0, (score - free[i]) / n))
+                        found[i].append(PlateCandidate(self._text(path), score, float(cf), t))
+        return self._collect(found, k)
+
+    def snap(self, text: str) -> str:
+        """
+        Closest template-valid string to an already decoded text (e.g. a
+        readtext result), using CONFUSABLE as the per-character prior.
+        Returns the cleaned text unchanged when no template fits with each
+        character kept or swapped for one of its confusables.
+        """
+        s = "".join(ch for ch in text.upper() if ch in self.index)
+        if not s or len(s) not in self.lengths:
+            return s
+        lp = np.full((1, len(s), len(self.charset)), _NEG)
+        for p, ch in enumerate(s):
+            for rank, alt in enumerate(CONFUSABLE.get(ch, "")):
+                if alt in self.index:
+                    lp[0, p, self.index[alt]] = np.log(0.05 / (1 + rank))
+            lp[0, p, self.index[ch]] = np.log(0.9)
+        best = self.decode_positions(lp, k=1)[0]
+        return best[0].text if best else s
+
+    def _text(self, path: Sequence[int]) -> str:
+        return "".join(self.charset[int(i)] for i in path)
+
+def _topk_paths(lp: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    k best character paths of independent positions: lp (B, n, C) ->
+    scores (B, k') and character indices (B, k', n), best first. Beam over
+    positions keeping the k best prefixes; exact since scores add up.
+    """
+    b, n, c = lp.shape
+    kk = max(1, min(k, c))
+    scores = np.zeros((b, 1))
+    paths = np.zeros((b, 1, 0), dtype=np.int64)
+    for p in range(n):
+        top = np.argsort(-lp[:, p, :], axis=1, kind="stable")[:, :kk]
+        top_lp = np.take_along_axis(lp[:, p, :], top, axis=1)
+        total = (scores[:, :, None] + top_lp[:, None, :]).reshape(b, -1)
+        sel = np.argsort(-total, axis=1, kind="stable")[:, :kk]
+        prev, cur = sel // kk, sel % kk
+        paths = np.concatenate([np.take_along_axis(paths, prev[:, :, None], axis=1),
+                                np.take_along_axis(top, cur, axis=1)[:, :, None]], axis=2)
+        scores = np.take_along_axis(total, sel, axis=1)
+    return scores, paths
+
+def _squeeze_blanks(probs: np.ndarray, sure: float = 0.999) -> np.ndarray:
+    """Keep one frame of every run of near-certain blanks (the alignment is the same, T shrinks)."""
+    if len(probs) < 2:
+        return probs
+    blank = probs[:, 0] >= sure
+    return probs[~(blank & np.r_[False, blank[:-1]])]
+
+def _repeats_without_blank(path: Sequence[int], runs: Sequence[Tuple[int, int, int]]) -> bool:
+    """True if two equal neighbours share no blank frame between them (CTC would merge them)."""
+    return any(path[p] == path[p + 1] and runs[p][1] == runs[p + 1][0] for p in range(len(path) - 1))
+
+def _ctc_viterbi(lp: np.ndarray, mask: np.ndarray):
+    """
+    Best CTC alignment of exactly n characters, character p of row r
+    restricted to mask[r, p]. lp is (R, T, 1 + C) log-probs, blank first;
+    mask is (R, n, C).
+
+    States per frame: E[p, c] (inside the run of character p, which is c)
+    and Bk[j] (blank after j characters). Returns the best total log-prob
+    per row (<= _NEG / 2 if T is too short) and backtrace(row), which gives
+    the run (first frame, end frame, character) of every position.
+    """
+    rows, t_len, _ = lp.shape
+    _, n, c = mask.shape
+    blank, chars = lp[:, :, 0], lp[:, :, 1:]
+    cidx = np.arange(c)
+    e = np.full((rows, n, c), _NEG, dtype=lp.dtype)
+    e[:, 0] = np.where(mask[:, 0], chars[:, 0], _NEG)
+    bk = np.full((rows, n + 1), _NEG, dtype=lp.dtype)
+    bk[:, 0] = blank[:, 0]
+    # backpointers: E came from 0 = same run, 1 = blank, 2 = previous character (ptr_c)
+    ptr_e = np.zeros((t_len, rows, n, c), dtype=np.int8)
+    ptr_c = np.zeros((t_len, rows, n, c), dtype=np.int8)
+    # Bk came from 0 = blank, 1 = the end of character j - 1 (ptr_bc)
+    ptr_b = np.zeros((t_len, rows, n + 1), dtype=bool)
+    ptr_bc = np.zeros((t_len, rows, n + 1), dtype=np.int8)
+    direct = np.full((rows, n, c), _NEG, dtype=lp.dtype)
+    for t in range(1, t_len):
+        # best and runner-up character of every position at t - 1
+        a1 = e.argmax(axis=2)
+        v1 = np.take_along_axis(e, a1[:, :, None], axis=2)[:, :, 0]
+        rest = e.copy()
+        np.put_along_axis(rest, a1[:, :, None], 2 * _NEG, axis=2)
+        a2 = rest.argmax(axis=2)
+        v2 = np.take_along_axis(rest, a2[:, :, None], axis=2)[:, :, 0]
+        # direct move from character p - 1 (any c' != c) without a blank
+        same = cidx == a1[:, :-1, None]
+        direct[:, 1:] = np.where(same, v2[:, :-1, None], v1[:, :-1, None])
+        from_b = bk[:, :n, None]
+        best = np.maximum(e, from_b)
+        choice = (from_b > e).astype(np.int8)
+        jump = direct > best
+        best = np.where(jump, direct, best)
+        choice[jump] = 2
+        ptr_e[t] = choice
+        ptr_c[t, :, 1:] = np.where(same, a2[:, :-1, None], a1[:, :-1, None])
+        ptr_b[t, :, 1:] = v1 > bk[:, 1:]
+        ptr_bc[t, :, 1:] = a1
+        bk[:, 1:] = np.maximum(bk[:, 1:], v1)
+        bk += blank[:, t, None]
+        e = np.where(mask, best + chars[:, t, None, :], _NEG).astype(lp.dtype, copy=False)
+    end_e, end_c = e[:, n - 1].max(axis=1), e[:, n - 1].argmax(axis=1)
+    total = np.maximum(end_e, bk[:, n])
+
+    def backtrace(r: int) -> List[Tuple[int, int, int]]:
+        # walk back from the end; state is ("e", p, ch) or ("b", j)
+        state = ("e", n - 1, int(end_c[r])) if end_e[r] >= bk[r, n] else ("b", n)
+        start, end, ch_of = [0] * n, [0] * n, [0] * n
+        for t in range(t_len - 1, -1, -1):
+            if state[0] == "e":
+                _, p, ch = state
+                if end[p] == 0:
+                    end[p], ch_of[p] = t + 1, ch
+                start[p] = t
+                if t == 0:
+                    break
+                how = ptr_e[t, r, p, ch]
+                state = ("e", p, ch) if how == 0 else ("b", p) if how == 1 else ("e", p - 1, int(ptr_c[t, r, p, ch]))
+            elif t > 0 and ptr_b[t, r, state[1]]:
+                state = ("e", state[1] - 1, int(ptr_bc[t, r, state[1]]))
+        return [(start[p], end[p], ch_of[p]) for p in range(n)]
+
+    return total, backtrace
@@ -0,0 +1,85 @@
+# lpr_easy/ocr/scheduler.py
+# All comments/docstrings in English.
+
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from .easyocr_engine import EasyOCREngine, OcrReading, VARIANT_NAMES, build_variants
+
+class OcrScheduler:
+    """
+    Collects plate crops from many images and reads them together.
+
+    With a recognizer-only engine, every cascade stage runs as one batched
+    recognizer call over all crops still unresolved (rows of all crops are
+    grouped into width buckets of up to batch_size lines). Crops that fail the
+    plate-pattern check fall back to per-crop readtext. Other engines read the
+    crops one by one. Results are returned keyed by the caller's key, e.g.
+    (image index, detection index).
+    """
+    def __init__(self, engine: EasyOCREngine, batch_size: int = 32):
+        self.engine = engine
+        self.batch_size = max(1, int(batch_size))
+        self.items: List[Tuple[Hashable, np.ndarray]] = []
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def add(self, key: Hashable, crop: np.ndarray):
+        self.items.append((key, crop))
+
+    def run(self) -> Dict[Hashable, Optional[OcrReading]]:
+        """
+        Read all queued crops and clear the queue. A crop whose read fails maps to None.
+        """
+        items, self.items = self.items, []
+        if not items:
+            return {}
+        if getattr(self.engine, "recognizer_only", False):
+            try:
+                return self._run_batched(items)
+            except Exception as e:
+                print(f"[WARN] Batched OCR failed ({e}); reading crops one by one.")
+        return {key: self._read_one(crop) for key, crop in items}
+
+    def _read_one(self, crop: np.ndarray) -> Optional[OcrReading]:
+        try:
+            return self.engine.read_img_detail(crop)
+        except Exception:
+            return None
+
+    def _run_batched(self, items) -> Dict[Hashable, Optional[OcrReading]]:
+        eng = self.engine
+        n = len(items)
+        variants: List[Optional[Dict[str, np.ndarray]]] = []
+        for _, crop in items:
+            try:
+                variants.append(dict(zip(VARIANT_NAMES, build_variants(crop))))
+            except Exception:
+                variants.append(None)
+        best = [OcrReading() for _ in range(n)]
+        scores = [-999.0] * n
+        active = [i for i in range(n) if variants[i] is not None]
+
+        for name, rotations in eng.plan:
+            if not active:
+                break
+            # (crop index, candidate lines) for every crop still unresolved
+            jobs = [(i, lines) for i in active for lines in eng.direct_candidates(variants[i][name], rotations)]
+            reads = eng.read_lines([lines for _, lines in jobs], batch_size=self.batch_size)
+            for (i, lines), (txt, conf) in zip(jobs, reads):
+                best[i].passes += len(lines)
+                scores[i] = eng.consider(best[i], scores[i], txt, conf, name, rotations, "recognize")
+            active = [i for i in active if not eng.accepted(scores[i])]
+
+        out: Dict[Hashable, Optional[OcrReading]] = {}
+        for i, (key, _) in enumerate(items):
+            if variants[i] is None:
+                out[key] = None
+                continue
+            try:
+                out[key] = eng.finish_readtext(variants[i], best[i], scores[i])
+            except Exception:
+                out[key] = None
+        return out
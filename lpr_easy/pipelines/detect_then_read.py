@@ -1,95 +1,327 @@
 # lpr_easy/pipelines/detect_then_read.py
 # All comments/docstrings in English.
 
-from typing import Dict, Any, List
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Any, Iterator, List, Optional, Set, Tuple
 from pathlib import Path
+import os
+import threading
 import cv2
+import numpy as np
 
+from ..backends import create_detector, create_ocr
 from ..config import AppConfig
 from ..detectors.yolo_detector import YoloPlateDetector
-from ..ocr.easyocr_engine import EasyOCREngine
+from ..ocr.easyocr_engine import EasyOCREngine, OcrReading
+from ..ocr.scheduler import OcrScheduler
+from ..utils import profiling
+from ..utils.cache import ResultCache, array_digest, bytes_digest, file_digest
+from ..utils.inputs import iter_images, read_manifest, shard_filter
 from ..utils.io_utils import (
-    ensure_dir, collect_images, save_visualization, save_pre,
-    save_crop, maybe_rename_crop_with_plate,
-    write_main_csv, write_main_json, write_ocr_sidecar
+    ensure_dir, save_visualization, save_pre,
+    pad_crop, crop_out_path, write_crop,
+    decode_reduced, jpeg_size, pick_decode_scale, scale_dets
 )
+from .staging import BoundedPool, DepthStat, batched, read_images, run_or_submit
 
-def run_pipeline(cfg: AppConfig):
-    # Collect images
-    if cfg.image and not cfg.input_dir:
-        cfg.input_dir = str(Path(cfg.image).parent)
-        cfg.pattern = Path(cfg.image).name
+@dataclass
+class ImageResult:
+    """
+    Output rows of one image: CSV rows, JSON entries and OCR readings (aligned,
+    one per detection; readings are None when OCR is off or failed).
+    """
+    image: str
+    rows: List[list] = field(default_factory=list)
+    entries: List[Dict[str, Any]] = field(default_factory=list)
+    readings: List[Optional[OcrReading]] = field(default_factory=list)
+    error: str = ""  # non-empty if the image could not be read or processed
+    counters: Dict[str, int] = field(default_factory=dict)  # e.g. cache hits/misses
 
-    if not cfg.input_dir:
-        print("[INFO] Nothing to do: provide --image or --input_dir.")
-        return
+def load_models(cfg: AppConfig) -> Tuple[YoloPlateDetector, Optional[EasyOCREngine]]:
+    """
+    Instantiate the detector and, if enabled, the OCR engine for a config
+    (backends are looked up by name in lpr_easy.backends). With cfg.tile the
+    detector runs tiled (see detectors.tiling).
+    """
+    detector = create_detector(cfg.detector, cfg)
+    if cfg.tile > 0:
+        from ..detectors.tiling import TiledDetector
+        detector = TiledDetector(detector, tile=cfg.tile, overlap=cfg.tile_overlap, coarse=cfg.tile_coarse)
+    return detector, create_ocr(cfg.ocr, cfg)
 
-    imgs = collect_images(cfg.input_dir, cfg.pattern)
-    if not imgs:
-        print("[INFO] No input images found.")
-        return
+class BatchProcessor:
+    """
+    Detection + OCR over batches of decoded images.
 
-    # Prepare output dirs
-    if cfg.save_pre: ensure_dir(cfg.save_pre)
-    if cfg.save_vis: ensure_dir(cfg.save_vis)
-    if cfg.save_crops: ensure_dir(cfg.save_crops)
+    feed() detects a batch, saves visualization/pre images and queues plate
+    crops; OCR runs through an OcrScheduler once ocr_batch_size crops are
+    queued (crops from many images are read together). Finished images are
+    returned in input order by feed()/flush(); images with no crop waiting
+    for OCR come back from feed() right away.
+    JPEG writes go to `writer` when given.
 
-    # Init components
-    detector = YoloPlateDetector(cfg.weights)
-    ocr_engine = None
-    if cfg.ocr == "easyocr-plus":
-        gpu_flag = None
-        if cfg.ocr_gpu is not None:
-            gpu_flag = cfg.ocr_gpu.strip().lower() in ("true","1","yes","on")
-        ocr_engine = EasyOCREngine(langs=["en"], gpu=gpu_flag)
-
-    all_rows, all_entries = [], []
-
-    for img_path in imgs:
-        img = cv2.imread(img_path)
+    With cfg.cache_dir, detections are cached by image content + weights +
+    conf/square_size and OCR readings by crop content + engine settings, so
+    only cache misses reach the models. Use read() as the image reader so the
+    file bytes are hashed while decoding.
+
+    With cfg.decode_scale, JPEGs are decoded at 1/2-1/8 size for detection
+    (DCT scaling) and boxes are mapped back to full-resolution coordinates.
+    The full image is decoded only for images with detections that need
+    pixels (OCR, --save_crops) or for --save_vis, and released once cropped.
+    cfg.tile sizes are source pixels, so tiled runs always decode at full size.
+    """
+    def __init__(self, cfg: AppConfig, detector: YoloPlateDetector,
+                 ocr_engine: Optional[EasyOCREngine] = None, writer: Optional[BoundedPool] = None):
+        self.cfg = cfg
+        self.detector = detector
+        self.ocr = OcrScheduler(ocr_engine, batch_size=cfg.ocr_batch_size) if ocr_engine else None
+        self.writer = writer
+        self.decode_scale = "1" if cfg.tile > 0 else cfg.decode_scale
+        # (seq, img_path, dets, crops, error, counters); seq keys the image's OCR reads
+        self.pending: List[Tuple[int, str, list, list, str, Dict[str, int]]] = []
+        self._seq = 0
+        self._ocr_waiting: Set[int] = set()  # seqs with crops queued on the OCR scheduler
+
+        self.cache = None
+        # per-image decode state, one entry per decoded occurrence of a path (a path
+        # can repeat, e.g. listed twice in a manifest); decode() may run on other threads
+        self._state_lock = threading.Lock()
+        self._digests: Dict[str, List[str]] = {}
+        self._ocr_cached: Dict[Tuple[int, int], OcrReading] = {}
+        self._ocr_keys: Dict[Tuple[int, int], str] = {}
+        self._reduced: Dict[str, List[Tuple[bytes, Tuple[int, int]]]] = {}  # path -> [(JPEG bytes, full size)]
+        if cfg.cache_dir:
+            self.cache = ResultCache(cfg.cache_dir, max_bytes=int(cfg.cache_max_mb * (1 << 20)))
+            weights = file_digest(cfg.weights) if os.path.isfile(cfg.weights) else cfg.weights
+            self.det_suffix = f"{cfg.detector}:{weights}:{cfg.conf}:{cfg.square_size}"
+            if self.decode_scale != "1":
+                self.det_suffix += f":decode{self.decode_scale}"
+            if cfg.tile > 0:
+                self.det_suffix += f":tile{cfg.tile}/{cfg.tile_overlap}" + ("/coarse" if cfg.tile_coarse else "")
+            self.ocr_suffix = bytes_digest(ocr_engine.settings_key().encode()) if ocr_engine else ""
+
+    @profiling.profiled("decode")
+    def read(self, path: str):
+        """Image reader for read_images(); also hashes the file when caching."""
+        if self.cache is None and self.decode_scale == "1":
+            return cv2.imread(path)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        return self.decode(path, data)
+
+    def decode(self, path: str, data: bytes):
+        """Decode encoded image bytes fed later under `path` (hashed for the cache)."""
+        size = jpeg_size(data) if self.decode_scale != "1" else None
+        scale = pick_decode_scale(size, self.cfg.square_size, self.decode_scale)
+        img = reduced = None
+        if scale > 1:
+            img, full_size = decode_reduced(data, scale, size)
+            if img is not None:
+                reduced = (data, full_size)
         if img is None:
-            print(f"[WARN] Could not read image: {img_path}")
-            continue
+            img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        if img is None:
+            return None  # never fed to _detect, so it keeps no state
+        if self.cache is not None:
+            self._push(self._digests, path, bytes_digest(data))
+        if reduced is not None:
+            self._push(self._reduced, path, reduced)
+        return img
+
+    def discard(self, path: str):
+        """Forget per-image decode state of an image that will not be fed (e.g. a rejected request)."""
+        self._take(self._digests, path)
+        self._take(self._reduced, path)
+
+    def _push(self, table: Dict[str, list], path: str, value):
+        with self._state_lock:
+            table.setdefault(path, []).append(value)
+
+    def _take(self, table: Dict[str, list], path: str):
+        """Oldest state entry of `path` (None if there is none), removed."""
+        with self._state_lock:
+            values = table.get(path)
+            if not values:
+                return None
+            value = values.pop(0)
+            if not values:
+                del table[path]
+            return value
+
+    def _full_image(self, img, reduced, need: bool):
+        """Full-resolution pixels of a fed image (decoded now if it was read reduced; None if not needed)."""
+        if reduced is None:
+            return img
+        if not need:
+            return None
+        with profiling.span("decode.full"):
+            return cv2.imdecode(np.frombuffer(reduced[0], np.uint8), cv2.IMREAD_COLOR)
+
+    def close(self):
+        if self.cache is not None:
+            self.cache.close()
+
+    def feed(self, batch: List[Tuple[str, Any]]) -> List[ImageResult]:
+        cfg = self.cfg
+        batch_paths, batch_imgs = [], []
+        for img_path, img in batch:
+            if img is None:
+                print(f"[WARN] Could not read image: {img_path}")
+                self._append_pending(img_path, [], [], "unreadable", {})
+                continue
+            batch_paths.append(img_path)
+            batch_imgs.append(img)
+
+        # this occurrence's reduced-decode state travels with the image
+        batch_reduced = [self._take(self._reduced, p) for p in batch_paths]
+        batch_dets, counters = self._detect(batch_paths, batch_imgs, batch_reduced)
+        profiling.count("images", len(batch_imgs))
+        profiling.count("detections", sum(len(d) for d in batch_dets))
+        for img_path, img, reduced, dets, counts in zip(batch_paths, batch_imgs, batch_reduced, batch_dets, counters):
+            need_crops = bool(dets) and (self.ocr is not None or bool(cfg.save_crops))
+            full = self._full_image(img, reduced, need_crops or bool(cfg.save_vis))
+            self._save_image_artifacts(img_path, img, full, dets)
+            # OCR reads the in-memory crop, saving is a side output
+            crops = [pad_crop(full, d[:4]) for d in dets] if need_crops else [None] * len(dets)
+            if self.ocr is not None:
+                for i, crop in enumerate(crops):
+                    self._queue_ocr((self._seq, i), crop, counts)
+            self._append_pending(img_path, dets, crops, "", counts)
+
+        # images stuck behind a queued crop count towards the batch too, so pending stays bounded
+        ocr_batch = max(1, cfg.ocr_batch_size)
+        if self.ocr is not None and len(self.ocr) < ocr_batch and len(self.pending) < ocr_batch:
+            return self._release_ready()
+        return self.flush()
+
+    def _append_pending(self, img_path: str, dets: list, crops: list, error: str, counts: Dict[str, int]):
+        self.pending.append((self._seq, img_path, dets, crops, error, counts))
+        self._seq += 1
+
+    def _release_ready(self) -> List[ImageResult]:
+        """
+        Results of the leading pending images with no crop waiting for OCR
+        (no plates, unreadable, or all reads cached), so they are streamed and
+        checkpointed without waiting for the OCR batch to fill. Keeps input order.
+        """
+        k = 0
+        while k < len(self.pending) and self.pending[k][0] not in self._ocr_waiting:
+            k += 1
+        ready, self.pending = self.pending[:k], self.pending[k:]
+        return [
+            self._build_result(img_path, dets, crops,
+                               [self._ocr_cached.pop((seq, i), None) for i in range(len(dets))], error, counts)
+            for seq, img_path, dets, crops, error, counts in ready
+        ]
+
+    def flush(self) -> List[ImageResult]:
+        readings = {}
+        if self.ocr is not None:
+            with profiling.span("ocr"):
+                readings = self.ocr.run()
+        for r in readings.values():
+            if r is not None:
+                profiling.observe("ocr_passes_per_plate", r.passes)
+        if self.cache is not None:
+            for k, r in readings.items():
+                if r is not None and k in self._ocr_keys:
+                    self.cache.put("ocr", self._ocr_keys[k], asdict(r))
+            readings.update(self._ocr_cached)
+            self._ocr_cached, self._ocr_keys = {}, {}
+            self.cache.commit()
+        pending, self.pending = self.pending, []
+        self._ocr_waiting.clear()
+        return [
+            self._build_result(img_path, dets, crops, [readings.get((seq, i)) for i in range(len(dets))], error, counts)
+            for seq, img_path, dets, crops, error, counts in pending
+        ]
+
+    def _detect(self, paths: List[str], imgs: list, reduced: list) -> Tuple[List[list], List[Dict[str, int]]]:
+        """Detections per image, served from the cache when possible."""
+        cfg = self.cfg
+        counters = [{} for _ in paths]
+        if self.cache is None:
+            with profiling.span("detect"):
+                dets = self.detector.predict_batch(imgs, conf=cfg.conf, imgsz=cfg.square_size)
+            return [self._to_full(img, r, d) for img, r, d in zip(imgs, reduced, dets)], counters
 
-        dets = detector.predict(img, conf=cfg.conf, imgsz=cfg.square_size)
-        class_names = detector.class_names
+        dets: List[Optional[list]] = [None] * len(paths)
+        keys = []
+        for j, p in enumerate(paths):
+            digest = self._take(self._digests, p) or file_digest(p)
+            keys.append(f"{digest}:{self.det_suffix}")
+            hit = self.cache.get("det", keys[j])
+            if hit is not None:
+                dets[j] = [tuple(d) for d in hit]
+                counters[j]["det_hit"] = 1
+            else:
+                counters[j]["det_miss"] = 1
+        todo = [j for j, d in enumerate(dets) if d is None]
+        if todo:
+            with profiling.span("detect"):
+                fresh = self.detector.predict_batch([imgs[j] for j in todo], conf=cfg.conf, imgsz=cfg.square_size)
+            for j, d in zip(todo, fresh):
+                dets[j] = d = self._to_full(imgs[j], reduced[j], d)
+                self.cache.put("det", keys[j], [list(x) for x in d])
+        return dets, counters
 
-        # Save visualization and pre if requested
+    def _to_full(self, img, reduced, dets: list) -> list:
+        """Detections in full-resolution coordinates (only differs for reduced decodes)."""
+        return scale_dets(dets, img.shape, reduced[1]) if reduced and dets else dets
+
+    def _queue_ocr(self, key: Tuple[int, int], crop, counts: Dict[str, int]):
+        if self.cache is None:
+            self.ocr.add(key, crop)
+            self._ocr_waiting.add(key[0])
+            return
+        ck = f"{array_digest(crop)}:{self.ocr_suffix}"
+        hit = self.cache.get("ocr", ck)
+        if hit is not None:
+            hit["rotations"] = tuple(hit.get("rotations", ()))
+            self._ocr_cached[key] = OcrReading(**hit)
+            counts["ocr_hit"] = counts.get("ocr_hit", 0) + 1
+        else:
+            self._ocr_keys[key] = ck
+            self.ocr.add(key, crop)
+            self._ocr_waiting.add(key[0])
+            counts["ocr_miss"] = counts.get("ocr_miss", 0) + 1
+
+    def _save_image_artifacts(self, img_path: str, img, full, dets):
+        """Visualization on the full-resolution image; the pre image is resized from the (possibly reduced) decode."""
+        cfg = self.cfg
         if cfg.save_vis:
             vis_path = str(Path(cfg.save_vis) / f"{Path(img_path).stem}_det.jpg")
-            save_visualization(img, dets, vis_path, class_names)
+            run_or_submit(self.writer, save_visualization, full, dets, vis_path, self.detector.class_names)
         if cfg.save_pre:
             pre_path = str(Path(cfg.save_pre) / f"{Path(img_path).stem}_pre.jpg")
-            save_pre(img, pre_path, cfg.square_size)
+            run_or_submit(self.writer, save_pre, img, pre_path, cfg.square_size)
+
+    def _build_result(self, img_path: str, dets, crops, readings, error: str = "",
+                      counters: Optional[Dict[str, int]] = None) -> ImageResult:
+        cfg, class_names = self.cfg, self.detector.class_names
+        res = ImageResult(image=img_path, readings=readings, error=error, counters=counters or {})
+        for i, ((x1,y1,x2,y2,score,cls), crop, reading) in enumerate(zip(dets, crops, readings)):
+            plate_txt, plate_conf = (reading.text, reading.conf) if reading else ("", 0.0)
 
-        # Iterate detections and optionally OCR
-        for i, (x1,y1,x2,y2,score,cls) in enumerate(dets):
             crop_path = ""
             if cfg.save_crops:
-                crop_path = save_crop(img, (x1,y1,x2,y2), cfg.save_crops, Path(img_path).name, i)
-
-            plate_txt, plate_conf = "", 0.0
-            if ocr_engine and crop_path:
-                try:
-                    plate_txt, plate_conf = ocr_engine.read_path(crop_path)
-                except Exception:
-                    plate_txt, plate_conf = "", 0.0
-
-                if cfg.name_with_plate and plate_txt:
-                    new_cp = maybe_rename_crop_with_plate(crop_path, plate_txt)
-                    if new_cp != crop_path:
-                        crop_path = new_cp
+                crop_path = crop_out_path(cfg.save_crops, Path(img_path).name, i,
+                                          plate_txt if cfg.name_with_plate else "")
+                run_or_submit(self.writer, write_crop, crop, crop_path)
 
             # append CSV row
-            row = [
+            res.rows.append([
                 img_path, crop_path, x1, y1, x2, y2, f"{score:.4f}",
                 class_names[cls] if 0 <= cls < len(class_names) else str(cls),
                 plate_txt, f"{plate_conf:.4f}"
-            ]
-            all_rows.append(row)
+            ])
 
             # append JSON entry
-            all_entries.append({
+            res.entries.append({
                 "image": img_path,
                 "crop_path": crop_path,
                 "bbox": [x1,y1,x2,y2],
@@ -98,22 +330,127 @@ def run_pipeline(cfg: AppConfig):
                 "plate": plate_txt,
                 "plate_conf": float(plate_conf),
             })
+        return res
+
+def build_ocr_map(entries: List[Dict[str, Any]], readings: List[Optional[OcrReading]]) -> Dict[str, dict]:
+    """
+    Build the OCR sidecar map { crop_path: {plate, conf, ...} }; without saved
+    crops the key is "<image>#<detection index>".
+    """
+    ocr_map, det_idx = {}, {}
+    for e, r in zip(entries, readings):
+        i = det_idx[e["image"]] = det_idx.get(e["image"], -1) + 1
+        key = e["crop_path"] or f'{e["image"]}#{i}'
+        ocr_map[key] = {"plate": e["plate"], "conf": e["plate_conf"]}
+        if r is not None:
+            ocr_map[key].update(variant=r.variant, rotations=list(r.rotations),
+                                passes=r.passes, source=r.source)
+    return ocr_map
+
+def iter_results(cfg: AppConfig, imgs: List[str],
+                 models: Optional[Tuple[YoloPlateDetector, Optional[EasyOCREngine]]] = None) -> Iterator[ImageResult]:
+    """
+    Run detection (+OCR) in this process and yield one ImageResult per input
+    image, in input order. Optionally staged (decode ahead / background writes).
+    models=(detector, ocr_engine) skips load_models().
+    """
+    # Init components
+    detector, ocr_engine = models or load_models(cfg)
+    batch_size = max(1, int(cfg.batch_size or 1))
 
-    # Write outputs
-    if cfg.csv:
-        write_main_csv(cfg.csv, all_rows)
-        print(f"[OK] CSV written: {cfg.csv} ({len(all_rows)} rows)")
-
-    if cfg.out and cfg.fmt.lower() == "json":
-        write_main_json(cfg.out, all_entries)
-        print(f"[OK] JSON written: {cfg.out} ({len(all_entries)} entries)")
-
-    # Optional OCR sidecar
-    if cfg.ocr_out and ocr_engine:
-        # Build a simple map { crop_path: {plate, conf} }
-        ocr_map = {}
-        for e in all_entries:
-            if e["crop_path"]:
-                ocr_map[e["crop_path"]] = {"plate": e["plate"], "conf": e["plate_conf"]}
-        write_ocr_sidecar(cfg.ocr_out, ocr_map)
-        print(f"[OK] OCR sidecar written: {cfg.ocr_out}")
+    # Staged mode: decode ahead and write JPEGs on thread pools
+    decode_pool = writer = None
+    decode_ready = DepthStat()
+    if cfg.prefetch > 0:
+        io_workers = max(1, int(cfg.io_workers))
+        decode_pool = BoundedPool("decode", io_workers, cfg.prefetch * batch_size)
+        writer = BoundedPool("write", io_workers, io_workers * 4)
+
+    proc = None
+    try:
+        proc = BatchProcessor(cfg, detector, ocr_engine, writer)
+        source = read_images(imgs, decode_pool, decode_ready, reader=proc.read)
+        for batch in batched(source, batch_size):
+            yield from proc.feed(batch)
+        yield from proc.flush()
+    finally:
+        # also runs when the consumer stops early, so the cache connection is closed
+        if proc is not None:
+            proc.close()
+        for pool in (decode_pool, writer):
+            if pool is not None:
+                pool.close()
+
+    if decode_pool is not None:
+        print(f"[INFO] Queue depth decode(ready): {decode_ready.summary()} "
+              f"decode(in-flight): {decode_pool.depth.summary()} write(in-flight): {writer.depth.summary()}")
+
+def run_pipeline(cfg: AppConfig):
+    # Collect images
+    if cfg.image and not cfg.input_dir:
+        cfg.input_dir = str(Path(cfg.image).parent)
+        cfg.pattern = Path(cfg.image).name
+
+    if not cfg.input_dir and not cfg.manifest:
+        print("[INFO] Nothing to do: provide --image, --input_dir or --manifest.")
+        return
+
+    # Paths are streamed: listing, sharding and resume filtering stay lazy
+    if cfg.manifest:
+        imgs = shard_filter(read_manifest(cfg.manifest), cfg.shard)
+    else:
+        imgs = shard_filter(iter_images(cfg.input_dir, cfg.pattern), cfg.shard, root=cfg.input_dir)
+
+    # Prepare output dirs
+    if cfg.save_pre: ensure_dir(cfg.save_pre)
+    if cfg.save_vis: ensure_dir(cfg.save_vis)
+    if cfg.save_crops: ensure_dir(cfg.save_crops)
+
+    # Streaming outputs (+ resume from the last checkpoint)
+    from .outputs import ResultSink
+    sink = ResultSink(cfg)
+    skipped = [0]
+    if sink.done:
+        def _todo(paths):
+            for p in paths:
+                if p in sink.done:
+                    skipped[0] += 1
+                else:
+                    yield p
+        imgs = _todo(imgs)
+
+    if cfg.profile or cfg.profile_prom or cfg.profile_trace:
+        profiling.enable(trace_limit=cfg.profile_trace_spans if cfg.profile_trace else 0)
+
+    if cfg.workers > 1:
+        from .parallel import iter_parallel
+        results = iter_parallel(cfg, imgs)
+    else:
+        results = iter_results(cfg, imgs)
+
+    failed = seen = 0
+    counters: Dict[str, int] = {}
+    try:
+        for r in results:
+            seen += 1
+            if r.error:
+                failed += 1
+            for k, v in r.counters.items():
+                counters[k] = counters.get(k, 0) + v
+            with profiling.span("write.outputs"):
+                sink.write(r)
+    finally:
+        sink.close()
+        for k, v in counters.items():
+            profiling.count(k, v)
+        profiling.finish(summary=cfg.profile, prometheus=cfg.profile_prom, trace=cfg.profile_trace)
+    if skipped[0]:
+        print(f"[INFO] Resumed: {skipped[0]} image(s) already processed, {seen} processed now.")
+    elif not seen:
+        print("[INFO] No input images found.")
+    if failed:
+        print(f"[WARN] {failed} image(s) failed or could not be read.")
+    if cfg.cache_dir:
+        print(f"[INFO] Cache det: {counters.get('det_hit', 0)} hits / {counters.get('det_miss', 0)} misses; "
+              f"ocr: {counters.get('ocr_hit', 0)} hits / {counters.get('ocr_miss', 0)} misses")
+    sink.report()
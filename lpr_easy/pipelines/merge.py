@@ -0,0 +1,158 @@
+# lpr_easy/pipelines/merge.py
+# All comments/docstrings in English.
+
+"""
+Merge per-shard outputs (--shard K/N runs) into one deterministic file.
+
+Rows are ordered by image path (component-wise, the order the directory
+walker produces) and keep their detection order within an image, so the
+result does not depend on how many shards ran or which node finished first.
+An image present in several inputs keeps the rows of the first input
+(inputs are taken in sorted path order).
+"""
+
+import argparse
+import csv
+import heapq
+import json
+import os
+import re
+from typing import Any, Iterator, List, Tuple
+
+from ..utils.inputs import path_order_key
+from ..utils.stream_io import CsvStream, JsonArrayStream, JsonlStream, JsonObjectStream
+
+Item = Tuple[Tuple, Any]  # (sort key, row / entry / (key, value))
+
+def sort_key(path: str) -> Tuple:
+    """Order key of an image path or OCR sidecar key ("<image>#<i>" sorts by detection index)."""
+    m = re.fullmatch(r"(.*)#(\d+)", path)
+    return (path_order_key(m.group(1)), int(m.group(2))) if m else (path_order_key(path), -1)
+
+def _kind(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return "csv"
+    if ext == ".jsonl":
+        return "jsonl"
+    if ext == ".json":
+        with open(path, "r", encoding="utf-8") as f:
+            head = f.read(64).lstrip()
+        return "json_object" if head.startswith("{") else "json"
+    raise ValueError(f"Cannot merge {path}: expected .csv, .json or .jsonl")
+
+def _csv_header(path: str) -> List[str]:
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), [])
+
+def _read(path: str, kind: str) -> Iterator[Item]:
+    """Stream (sort key, item) pairs of one shard output."""
+    if kind == "csv":
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            rows = csv.reader(f)
+            next(rows, None)
+            for row in rows:
+                if row:
+                    yield sort_key(row[0]), row
+    elif kind == "jsonl":
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    e = json.loads(line)
+                    yield sort_key(e.get("image", "")), e
+    elif kind == "json":
+        with open(path, "r", encoding="utf-8") as f:
+            for e in json.load(f):
+                yield sort_key(e.get("image", "")), e
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            for k, v in json.load(f).items():
+                yield sort_key(k), (k, v)
+
+def _is_sorted(items: Iterator[Item]) -> bool:
+    last = None
+    for key, _ in items:
+        if last is not None and key < last:
+            return False
+        last = key
+    return True
+
+def merge_outputs(inputs: List[str], out: str) -> int:
+    """
+    Merge shard outputs of one kind (main CSV, OCR sidecar CSV, JSON array,
+    JSON Lines or sidecar JSON object) into `out`, written with the same
+    encoders as a normal run. Returns the number of rows/entries written.
+
+    Shard outputs come out of the walker already sorted, so they are merged
+    as streams; an unsorted input (e.g. from a manifest) falls back to an
+    in-memory sort.
+    """
+    inputs = sorted(inputs)
+    if not inputs:
+        raise ValueError("Nothing to merge: no input files given.")
+    if os.path.abspath(out) in {os.path.abspath(p) for p in inputs}:
+        raise ValueError(f"Output {out} is also an input.")
+    missing = [p for p in inputs if not os.path.isfile(p)]
+    if missing:
+        raise ValueError(f"Input not found: {missing[0]}")
+    kinds = {p: _kind(p) for p in inputs}
+    kind = kinds[inputs[0]]
+    mixed = [p for p in inputs if kinds[p] != kind]
+    if mixed:
+        raise ValueError(f"Cannot merge {kind} with {kinds[mixed[0]]} ({mixed[0]}).")
+    header = None
+    if kind == "csv":
+        header = _csv_header(inputs[0])
+        for p in inputs[1:]:
+            if _csv_header(p) != header:
+                raise ValueError(f"CSV header of {p} differs from {inputs[0]}.")
+
+    def tagged(i: int) -> Iterator[Tuple[Tuple, int, Any]]:
+        for key, item in _read(inputs[i], kind):
+            yield key, i, item
+
+    streams = [tagged(i) for i in range(len(inputs))]
+    if all(_is_sorted(_read(p, kind)) for p in inputs):
+        merged = heapq.merge(*streams, key=lambda t: t[0])
+    else:
+        print("[INFO] Inputs are not in walk order; sorting in memory.")
+        merged = iter(sorted((t for s in streams for t in s), key=lambda t: t[0]))
+
+    if kind == "csv":
+        sink = CsvStream(out, header)
+    elif kind == "jsonl":
+        sink = JsonlStream(out)
+    elif kind == "json":
+        sink = JsonArrayStream(out)
+    else:
+        sink = JsonObjectStream(out)
+    # merged rows are sorted, so all rows of an image are adjacent
+    image, owner, dropped = None, None, 0
+    try:
+        for key, i, item in merged:
+            if key[0] != image:
+                image, owner = key[0], i
+            elif i != owner:
+                dropped += 1
+                continue
+            sink.write([item])
+    finally:
+        sink.close()
+    if dropped:
+        print(f"[WARN] Dropped {dropped} duplicate row(s) of images present in more than one input.")
+    return sink.count
+
+def main(argv=None):
+    p = argparse.ArgumentParser(prog="lpr-easy merge",
+                                description="Merge per-shard CSV/JSON/JSONL outputs into one deterministic file")
+    p.add_argument("inputs", nargs="+", help="Shard outputs of the same kind (e.g. shard*/results.csv).")
+    p.add_argument("-o", "--out", required=True, help="Merged output path.")
+    args = p.parse_args(argv)
+    try:
+        n = merge_outputs(args.inputs, args.out)
+    except ValueError as e:
+        p.error(str(e))
+    print(f"[OK] Merged {len(args.inputs)} file(s) into {args.out} ({n} rows)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# lpr_easy/pipelines/outputs.py
+# All comments/docstrings in English.
+
+from typing import Dict, Optional
+
+from ..config import AppConfig
+from ..utils.io_utils import MAIN_CSV_HEADER, OCR_CSV_HEADER, ocr_sidecar_row
+from ..utils.stream_io import Checkpoint, CsvStream, JsonArrayStream, JsonlStream, JsonObjectStream
+from .detect_then_read import ImageResult, build_ocr_map
+
+def progress_path(cfg: AppConfig) -> Optional[str]:
+    """Progress marker next to the main output (None if there is no main output)."""
+    main = cfg.csv or (cfg.out if cfg.fmt.lower() in ("json", "jsonl") else None)
+    return f"{main}.progress.json" if main else None
+
+class ResultSink:
+    """
+    Streams ImageResults to the main CSV, the JSON/JSON Lines output and the
+    OCR sidecar as each image finishes. With cfg.resume or cfg.checkpoint_every,
+    progress is checkpointed every checkpoint_every (default 100) images; with
+    cfg.resume, outputs are truncated back to the last checkpoint and `done`
+    holds the images to skip.
+    """
+    def __init__(self, cfg: AppConfig):
+        self.cfg = cfg
+        self.every = max(1, cfg.checkpoint_every or 100)
+        marker = progress_path(cfg)
+        self.ckpt = None
+        if marker and (cfg.resume or cfg.checkpoint_every > 0):
+            self.ckpt = Checkpoint(marker, resume=cfg.resume)
+        elif marker:
+            Checkpoint.remove(marker)  # the outputs are rewritten, so an old marker would no longer match
+        st = (lambda name, path: self.ckpt.file_state(name, path)) if self.ckpt else (lambda name, path: None)
+
+        self.streams: Dict[str, object] = {}
+        if cfg.csv:
+            self.streams["csv"] = CsvStream(cfg.csv, MAIN_CSV_HEADER, st("csv", cfg.csv))
+        fmt = cfg.fmt.lower()
+        if cfg.out and fmt == "json":
+            self.streams["out"] = JsonArrayStream(cfg.out, st("out", cfg.out))
+        elif cfg.out and fmt == "jsonl":
+            self.streams["out"] = JsonlStream(cfg.out, st("out", cfg.out))
+        if cfg.ocr_out and cfg.ocr != "none":
+            if cfg.ocr_out.lower().endswith(".json"):
+                self.streams["ocr_out"] = JsonObjectStream(cfg.ocr_out, st("ocr_out", cfg.ocr_out))
+            else:
+                self.streams["ocr_out"] = CsvStream(cfg.ocr_out, OCR_CSV_HEADER, st("ocr_out", cfg.ocr_out))
+        self.since_commit = 0
+
+    @property
+    def done(self) -> set:
+        return self.ckpt.done if self.ckpt else set()
+
+    def write(self, r: ImageResult):
+        if "csv" in self.streams:
+            self.streams["csv"].write(r.rows)
+        if "out" in self.streams:
+            self.streams["out"].write(r.entries)
+        side = self.streams.get("ocr_out")
+        if side is not None:
+            ocr_map = build_ocr_map(r.entries, r.readings)
+            if isinstance(side, CsvStream):
+                side.write(ocr_sidecar_row(k, v) for k, v in ocr_map.items())
+            else:
+                side.write(ocr_map.items())
+        # failed images (timeout, worker crash) produce no rows and stay out of the
+        # ledger, so --resume retries them; unreadable files would fail again
+        if self.ckpt and (not r.error or r.error == "unreadable"):
+            self.ckpt.mark(r.image)
+            self.since_commit += 1
+            if self.since_commit >= self.every:
+                self.commit()
+
+    def commit(self):
+        if self.ckpt:
+            self.ckpt.commit(self.streams)
+            self.since_commit = 0
+
+    def close(self):
+        try:
+            self.commit()
+        finally:
+            for s in self.streams.values():
+                s.close()
+            if self.ckpt:
+                self.ckpt.close()
+
+    def report(self):
+        labels = {"csv": "CSV", "out": self.cfg.fmt.upper(), "ocr_out": "OCR sidecar"}
+        for name, s in self.streams.items():
+            print(f"[OK] {labels[name]} written: {s.path} ({s.count} rows)")
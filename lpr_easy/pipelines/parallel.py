@@ -0,0 +1,120 @@
+# lpr_easy/pipelines/parallel.py
+# All comments/docstrings in English.
+
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterable, Iterator, List, Optional
+
+from ..config import AppConfig
+from .detect_then_read import BatchProcessor, ImageResult, load_models
+from .staging import batched, read_images
+
+# Per-worker state, set once by _init_worker
+_WORKER: Optional[BatchProcessor] = None
+
+def _init_worker(cfg: AppConfig, threads: int):
+    """
+    Load the detector/OCR models once per worker process and cap its
+    intra-op threads so N workers do not oversubscribe the cores.
+    """
+    global _WORKER
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    import cv2
+    cv2.setNumThreads(1)
+    try:
+        import torch
+    except ImportError:  # backends without torch (e.g. ONNX Runtime)
+        torch = None
+    if torch is not None:
+        torch.set_num_threads(threads)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            pass  # already set (interop threads can only be set once)
+    detector, ocr_engine = load_models(cfg)
+    _WORKER = BatchProcessor(cfg, detector, ocr_engine)
+
+def _run_chunk(paths: List[str]) -> List[ImageResult]:
+    proc = _WORKER
+    results = []
+    for batch in batched(read_images(paths, reader=proc.read), max(1, proc.cfg.batch_size)):
+        results.extend(proc.feed(batch))
+    results.extend(proc.flush())
+    return results
+
+def _kill(pool: ProcessPoolExecutor):
+    # ProcessPoolExecutor cannot cancel a running task: terminate its workers
+    for p in list(getattr(pool, "_processes", {}).values()):
+        p.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def iter_parallel(cfg: AppConfig, imgs: Iterable[str]) -> Iterator[ImageResult]:
+    """
+    Shard images across cfg.workers processes (each with warm models) and yield
+    one ImageResult per image, in input order. imgs may be a lazy iterator:
+    only the chunks in flight are pulled from it.
+
+    A chunk whose worker crashes or exceeds cfg.worker_timeout seconds per
+    image is retried one image at a time on a fresh pool; an image that fails
+    again is yielded with `error` set instead of aborting the run.
+    """
+    workers = max(1, int(cfg.workers))
+    threads = cfg.worker_threads or max(1, (os.cpu_count() or 1) // workers)
+    chunk = max(1, int(cfg.batch_size or 1)) * 4
+    ctx = mp.get_context("spawn")
+
+    def _new_pool() -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                                   initializer=_init_worker, initargs=(cfg, threads))
+
+    # ordered slots: [paths, attempts, future or None], topped up from the input as they drain
+    chunks = batched(imgs, chunk)
+    slots: List[list] = []
+    print(f"[INFO] {workers} workers x {threads} threads, {chunk} images per chunk")
+    pool = _new_pool()
+    try:
+        while True:
+            for paths in chunks:
+                slots.append([paths, 0, None])
+                if len(slots) >= workers * 2:
+                    break
+            if not slots:
+                break
+            inflight = sum(1 for s in slots if s[2] is not None and not s[2].done())
+            for s in slots:
+                if inflight >= workers * 2:
+                    break
+                if s[2] is None:
+                    s[2] = pool.submit(_run_chunk, s[0])
+                    inflight += 1
+
+            paths, attempts, fut = slots[0]
+            timeout = cfg.worker_timeout * len(paths) if cfg.worker_timeout > 0 else None
+            try:
+                results = fut.result(timeout=timeout)
+            except Exception as e:
+                slots.pop(0)
+                broken = isinstance(e, (FutureTimeout, BrokenProcessPool))
+                reason = "timeout" if isinstance(e, FutureTimeout) else f"{type(e).__name__}: {e}"
+                if broken:
+                    _kill(pool)
+                    pool = _new_pool()
+                    # keep finished chunks, resubmit the rest (queued ones were cancelled by the shutdown)
+                    for s in slots:
+                        if s[2] is not None and (s[2].cancelled() or not s[2].done() or s[2].exception() is not None):
+                            s[2] = None
+                if len(paths) > 1:
+                    slots[:0] = [[[p], attempts + 1, None] for p in paths]
+                elif broken and attempts < 2:
+                    slots.insert(0, [paths, attempts + 1, None])
+                else:
+                    print(f"[WARN] Worker failed on {paths[0]}: {reason}")
+                    yield ImageResult(image=paths[0], error=reason)
+                continue
+            slots.pop(0)
+            yield from results
+    finally:
+        _kill(pool)
@@ -0,0 +1,279 @@
+# lpr_easy/pipelines/serve.py
+# All comments/docstrings in English.
+
+import json
+import os
+import queue
+import socketserver
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from ..config import AppConfig
+from ..utils.io_utils import ensure_dir
+from .detect_then_read import BatchProcessor, load_models
+from .staging import DepthStat
+
+class QueueFull(Exception):
+    pass
+
+class MicroBatcher:
+    """
+    Collects concurrent requests into detector batches: the first queued image
+    opens a window of window_ms, and the batch closes when the window ends or
+    max_batch images are in. One thread owns the warm models (and the result
+    cache connection); callers get a Future per image. submit() raises
+    QueueFull once max_queue images are waiting.
+    """
+    def __init__(self, cfg: AppConfig, max_batch: int = 8, window_ms: float = 5.0, max_queue: int = 64):
+        self.cfg = cfg
+        self.max_batch = max(1, int(max_batch))
+        self.window = max(0.0, window_ms) / 1000.0
+        self.q: "queue.Queue[Tuple[str, object, Future]]" = queue.Queue(maxsize=max(1, int(max_queue)))
+        self.proc: Optional[BatchProcessor] = None
+        self.batch_sizes = DepthStat()
+        self.served = self.rejected = self.failed = 0
+        self.seq = 0
+        self.lock = threading.Lock()
+        self.ready = threading.Event()
+        self.error: Optional[BaseException] = None
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self._loop, name="lpr-batcher", daemon=True)
+        self.thread.start()
+
+    def wait_ready(self):
+        self.ready.wait()
+        if self.error is not None:
+            raise RuntimeError(f"Model load failed: {self.error}") from self.error
+
+    def next_key(self) -> str:
+        with self.lock:
+            self.seq += 1
+            return f"request-{self.seq}"
+
+    def decode(self, key: str, data: bytes):
+        """
+        Decode on the calling handler thread; BatchProcessor guards the
+        per-image decode state it shares with the batcher thread with a lock.
+        """
+        return self.proc.decode(key, data)
+
+    def full(self) -> bool:
+        """True (and counted as a rejection) when max_queue images are already waiting."""
+        if not self.q.full():
+            return False
+        with self.lock:
+            self.rejected += 1
+        return True
+
+    def submit(self, key: str, img) -> Future:
+        fut: Future = Future()
+        try:
+            self.q.put_nowait((key, img, fut))
+        except queue.Full:
+            with self.lock:
+                self.rejected += 1
+            raise QueueFull() from None
+        return fut
+
+    def _loop(self):
+        try:
+            detector, ocr_engine = load_models(self.cfg)
+            self.proc = BatchProcessor(self.cfg, detector, ocr_engine)
+        except BaseException as e:
+            self.error = e
+            self.ready.set()
+            return
+        self.ready.set()
+        while not self.stop.is_set():
+            try:
+                first = self.q.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            batch = [first]
+            deadline = time.perf_counter() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.q.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._run(batch)
+        self.proc.close()
+
+    def _run(self, batch: List[Tuple[str, object, Future]]):
+        self.batch_sizes.observe(len(batch))
+        try:
+            results = self.proc.feed([(key, img) for key, img, _ in batch]) + self.proc.flush()
+        except Exception as e:
+            for _, _, fut in batch:
+                fut.set_exception(e)
+            with self.lock:
+                self.failed += len(batch)
+            return
+        for (_, _, fut), res in zip(batch, results):
+            fut.set_result(res)
+        with self.lock:
+            self.served += len(batch)
+
+    def health(self) -> dict:
+        return {
+            "status": "ok" if self.proc is not None and self.thread.is_alive() else "starting",
+            "queue_depth": self.q.qsize(), "queue_size": self.q.maxsize,
+            "max_batch": self.max_batch, "window_ms": self.window * 1000.0,
+            "served": self.served, "rejected": self.rejected, "failed": self.failed,
+            "batch_size": self.batch_sizes.summary(),
+        }
+
+    def close(self):
+        self.stop.set()
+        self.thread.join(timeout=5)
+
+class Handler(BaseHTTPRequestHandler):
+    """
+    POST /detect   body = encoded image bytes (JPEG/PNG...), optional ?name=<image name>
+                   -> JSON array with the write_main_json fields per detection
+    GET  /health   -> queue depth, batch sizes and counters
+    """
+    server_version = "lpr-easy"
+    protocol_version = "HTTP/1.1"
+    batcher: MicroBatcher = None  # set by serve()
+    timeout_s: float = 30.0
+
+    def _send(self, code: int, payload, headers: Optional[dict] = None):
+        body = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if urlparse(self.path).path == "/health":
+            self._send(200, self.batcher.health())
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/detect":
+            self._send(404, {"error": "not found"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0:
+            self._send(400, {"error": "empty body: send the image bytes"})
+            return
+        data = self.rfile.read(length)
+        # shed load before paying for the decode; submit() still catches a queue that fills meanwhile
+        if self.batcher.full():
+            self._busy()
+            return
+        key = self.batcher.next_key()
+        name = parse_qs(url.query).get("name", [key])[0]
+        img = self.batcher.decode(key, data)
+        if img is None:
+            self.batcher.proc.discard(key)
+            self._send(400, {"error": "could not decode image"})
+            return
+        try:
+            fut = self.batcher.submit(key, img)
+        except QueueFull:
+            self.batcher.proc.discard(key)
+            self._busy()
+            return
+        try:
+            res = fut.result(timeout=self.timeout_s)
+        except FutureTimeout:
+            self._send(504, {"error": "timed out"})
+            return
+        except Exception as e:
+            self._send(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+        for e in res.entries:
+            e["image"] = name
+        self._send(200, res.entries)
+
+    def _busy(self):
+        self._send(429, {"error": "server busy, retry later"}, {"Retry-After": "1"})
+
+    def log_message(self, fmt, *args):
+        pass  # one line per request would dominate the output under load
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        conn, _ = super().get_request()
+        return conn, ("unix", 0)  # BaseHTTPRequestHandler expects a (host, port) address
+
+def serve(cfg: AppConfig, host: str = "127.0.0.1", port: int = 8080, unix_socket: Optional[str] = None,
+          max_batch: int = 8, window_ms: float = 5.0, max_queue: int = 64, timeout_s: float = 30.0):
+    """Load the models once and serve /detect and /health until interrupted."""
+    for d in (cfg.save_pre, cfg.save_vis, cfg.save_crops):
+        if d:
+            ensure_dir(d)
+    batcher = MicroBatcher(cfg, max_batch=max_batch, window_ms=window_ms, max_queue=max_queue)
+    batcher.wait_ready()
+    handler = type("LprHandler", (Handler,), {"batcher": batcher, "timeout_s": timeout_s})
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.unlink(unix_socket)
+        server = UnixHTTPServer(unix_socket, handler)
+        where = f"unix:{unix_socket}"
+    else:
+        server = ThreadingHTTPServer((host, port), handler)
+        where = f"http://{host}:{server.server_address[1]}"
+    print(f"[OK] Serving on {where} (max batch {batcher.max_batch}, window {window_ms:g} ms, queue {max_queue})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        batcher.close()
+        if unix_socket and os.path.exists(unix_socket):
+            os.unlink(unix_socket)
+
+# options of the shared batch parser that serve has no use for (dest -> flag); rejected instead of ignored
+BATCH_ONLY = {
+    "input_dir": "--input_dir", "image": "--image", "pattern": "--pattern", "manifest": "--manifest",
+    "shard": "--shard", "batch_size": "--batch-size", "prefetch": "--prefetch", "io_workers": "--io-workers",
+    "workers": "--workers", "worker_timeout": "--worker-timeout", "profile": "--profile",
+    "profile_prom": "--profile-prom", "profile_trace": "--profile-trace",
+    "profile_trace_spans": "--profile-trace-spans", "watch": "--watch", "watch_settle": "--watch-settle",
+    "watch_poll": "--watch-poll", "watch_backend": "--watch-backend", "csv": "--csv", "out": "--out",
+    "fmt": "--format", "resume": "--resume", "checkpoint_every": "--checkpoint-every", "ocr_out": "--ocr-out",
+}
+
+def main(argv=None):
+    from ..cli import build_parser
+    p = build_parser()
+    p.prog = "lpr-easy serve"
+    p.description = "Serve detection (+OCR) over HTTP with warm models and dynamic micro-batching"
+    g = p.add_argument_group("server")
+    g.add_argument("--host", default="127.0.0.1")
+    g.add_argument("--port", type=int, default=8080)
+    g.add_argument("--unix-socket", dest="unix_socket", default=None, help="Listen on a Unix socket instead of TCP.")
+    g.add_argument("--max-batch", dest="max_batch", type=int, default=8, help="Images per detector batch.")
+    g.add_argument("--batch-window-ms", dest="batch_window_ms", type=float, default=5.0,
+                   help="How long the first queued image waits for others to join its batch.")
+    g.add_argument("--max-queue", dest="max_queue", type=int, default=64,
+                   help="Images waiting for a batch before requests get 429.")
+    g.add_argument("--request-timeout", dest="request_timeout", type=float, default=30.0)
+    args = vars(p.parse_args(argv))
+    unused = [flag for dest, flag in BATCH_ONLY.items() if args[dest] != p.get_default(dest)]
+    if unused:
+        p.error(f"not used by serve (batch options): {', '.join(unused)}")
+    server_args = {k: args.pop(k) for k in ("host", "port", "unix_socket", "max_batch", "batch_window_ms",
+                                            "max_queue", "request_timeout")}
+    serve(AppConfig(**args), host=server_args["host"], port=server_args["port"],
+          unix_socket=server_args["unix_socket"], max_batch=server_args["max_batch"],
+          window_ms=server_args["batch_window_ms"], max_queue=server_args["max_queue"],
+          timeout_s=server_args["request_timeout"])
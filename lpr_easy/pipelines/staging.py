@@ -0,0 +1,113 @@
+# lpr_easy/pipelines/staging.py
+# All comments/docstrings in English.
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+class DepthStat:
+    """
+    Running average/max of a queue depth sampled at chosen points.
+    """
+    def __init__(self):
+        self.total = 0
+        self.samples = 0
+        self.max = 0
+
+    def observe(self, depth: int):
+        self.total += depth
+        self.samples += 1
+        self.max = max(self.max, depth)
+
+    def summary(self) -> Dict[str, float]:
+        avg = self.total / self.samples if self.samples else 0.0
+        return {"avg": round(avg, 2), "max": self.max, "samples": self.samples}
+
+class BoundedPool:
+    """
+    ThreadPoolExecutor with a cap on in-flight tasks (backpressure) and depth stats.
+    submit() blocks on the oldest task once max_pending tasks are outstanding.
+    """
+    def __init__(self, name: str, workers: int, max_pending: int):
+        self.name = name
+        self.max_pending = max(1, int(max_pending))
+        self.pool = ThreadPoolExecutor(max_workers=max(1, int(workers)), thread_name_prefix=f"lpr-{name}")
+        self.pending: Deque[Future] = deque()
+        self.depth = DepthStat()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        while self.pending and self.pending[0].done():
+            self.pending.popleft().result()
+        while len(self.pending) >= self.max_pending:
+            self.pending.popleft().result()
+        fut = self.pool.submit(fn, *args, **kwargs)
+        self.pending.append(fut)
+        self.depth.observe(sum(1 for f in self.pending if not f.done()))
+        return fut
+
+    def drain(self):
+        while self.pending:
+            self.pending.popleft().result()
+
+    def close(self):
+        try:
+            self.drain()
+        finally:
+            self.pool.shutdown(wait=True)
+
+def run_or_submit(pool: Optional[BoundedPool], fn: Callable, *args, **kwargs) -> Any:
+    """
+    Run fn inline when no pool is given, otherwise hand it to the pool.
+    """
+    if pool is None:
+        return fn(*args, **kwargs)
+    pool.submit(fn, *args, **kwargs)
+    return None
+
+def read_images(paths: Iterable[str], pool: Optional[BoundedPool] = None,
+                ready: Optional[DepthStat] = None,
+                reader: Callable[[str], Optional[np.ndarray]] = cv2.imread) -> Iterator[Tuple[str, Optional[np.ndarray]]]:
+    """
+    Yield (path, image) in input order. With a pool, up to pool.max_pending images
+    are decoded ahead of the consumer; `ready` records how many were already
+    decoded each time the consumer asked for the next one.
+    """
+    if pool is None:
+        for p in paths:
+            yield p, reader(p)
+        return
+
+    it = iter(paths)
+    window: Deque[Tuple[str, Future]] = deque()
+
+    def _fill():
+        while len(window) < pool.max_pending:
+            p = next(it, None)
+            if p is None:
+                return
+            window.append((p, pool.submit(reader, p)))
+
+    _fill()
+    while window:
+        if ready is not None:
+            ready.observe(sum(1 for _, f in window if f.done()))
+        p, fut = window.popleft()
+        img = fut.result()
+        _fill()
+        yield p, img
+
+def batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """
+    Group an iterable into lists of at most `size` items, preserving order.
+    """
+    buf = []
+    for x in items:
+        buf.append(x)
+        if len(buf) >= size:
+            yield buf
+            buf = []
+    if buf:
+        yield buf
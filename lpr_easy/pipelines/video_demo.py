@@ -3,17 +3,27 @@
 
 from pathlib import Path
 import os
+import queue
+import sys
+import threading
+import time
 import cv2
 import numpy as np
 
 # Allow running as module or as script
 if __package__ is None or __package__ == "":
-    import sys
-
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
-    from lpr_easy.detectors.yolo_detector import YoloPlateDetector
+    from lpr_easy.backends import create_detector, create_ocr, detector_names, ocr_names
+    from lpr_easy.config import AppConfig
+    from lpr_easy.utils import profiling
+    from lpr_easy.utils.stream_io import CsvStream, JsonlStream
+    from lpr_easy.utils.tracking import PlateTracker, box_agreement
 else:
-    from ..detectors.yolo_detector import YoloPlateDetector
+    from ..backends import create_detector, create_ocr, detector_names, ocr_names
+    from ..config import AppConfig
+    from ..utils import profiling
+    from ..utils.stream_io import CsvStream, JsonlStream
+    from ..utils.tracking import PlateTracker, box_agreement
 
 
 def draw_box(frame: np.ndarray, bbox):
@@ -22,17 +32,235 @@ def draw_box(frame: np.ndarray, bbox):
     cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
 
 
+class StageClock:
+    """
+    Busy time and item count of one pipeline stage (for per-stage FPS). Each
+    add() is also recorded as a "video.<name>" span when profiling is enabled.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self.frames = 0
+        self.seconds = 0.0
+
+    def add(self, frames: int, seconds: float):
+        self.frames += frames
+        self.seconds += seconds
+        profiling.add(f"video.{self.name}", seconds, time.perf_counter() - seconds)
+
+    def fps(self) -> float:
+        return self.frames / self.seconds if self.seconds > 0 else 0.0
+
+
+def _open_writer(output_video: str, fps: float, size) -> "cv2.VideoWriter":
+    Path(output_video).parent.mkdir(parents=True, exist_ok=True)
+    # Prefer H.264 if available; fallback to mp4v
+    fourcc = cv2.VideoWriter_fourcc(*"avc1")
+    writer = cv2.VideoWriter(output_video, fourcc, fps, size)
+    if not writer.isOpened():
+        fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+        writer = cv2.VideoWriter(output_video, fourcc, fps, size)
+    if not writer.isOpened():
+        raise RuntimeError(f"Cannot open writer: {output_video}")
+    return writer
+
+
+def _annotate(frame: np.ndarray, dets, size_in, size_out) -> np.ndarray:
+    """Resize for output if needed and draw only boxes."""
+    (w_in, h_in), (w_out, h_out) = size_in, size_out
+    if (w_out, h_out) != (w_in, h_in):
+        frame_draw = cv2.resize(frame, (w_out, h_out))
+        sx_d = w_out / float(w_in)
+        sy_d = h_out / float(h_in)
+    else:
+        frame_draw = frame
+        sx_d = sy_d = 1.0
+
+    for (x1, y1, x2, y2, _score, _cls_id) in dets:
+        x1s = int(x1 * sx_d)
+        y1s = int(y1 * sy_d)
+        x2s = int(x2 * sx_d)
+        y2s = int(y2 * sy_d)
+        draw_box(frame_draw, (x1s, y1s, x2s, y2s))
+    return frame_draw
+
+
+class FrameSource:
+    """
+    Sequential frames of a capture as (frame_index, frame). With step > 1 only
+    every step-th frame is decoded; the frames in between are grab()bed
+    (demuxed) but never decoded.
+    """
+    def __init__(self, cap, step: int = 1):
+        self.cap = cap
+        self.step = max(1, int(step))
+        self.pos = 0  # index of the next frame in the stream
+
+    def read(self):
+        if self.pos > 0:
+            for _ in range(self.step - 1):
+                if not self.cap.grab():
+                    return None
+                self.pos += 1
+        ok, frame = self.cap.read()
+        if not ok:
+            return None
+        self.pos += 1
+        return self.pos - 1, frame
+
+
+def parse_roi(text: str | None):
+    """Parse 'x1,y1;x2,y2;...' (input-frame pixels) into an (N,2) int32 polygon."""
+    if not text:
+        return None
+    pts = [tuple(int(float(v)) for v in pair.split(",")) for pair in text.split(";") if pair.strip()]
+    if len(pts) < 3:
+        raise ValueError(f"ROI needs at least 3 points: {text}")
+    return np.array(pts, dtype=np.int32)
+
+
+class MotionGate:
+    """
+    Frame differencing at low resolution. update(frame) returns True when the
+    fraction of changed pixels (inside the optional ROI polygon) reaches
+    `threshold`, i.e. when the frame is worth sending to the detector.
+    """
+    def __init__(self, frame_size, threshold: float = 0.002, roi=None,
+                 width: int = 160, pixel_delta: int = 25):
+        w_in, h_in = frame_size
+        self.size = (width, max(1, int(round(h_in * width / float(w_in)))))
+        self.threshold = threshold
+        self.pixel_delta = pixel_delta
+        self.mask = None
+        if roi is not None:
+            scale = np.array([self.size[0] / float(w_in), self.size[1] / float(h_in)])
+            self.mask = np.zeros((self.size[1], self.size[0]), dtype=np.uint8)
+            cv2.fillPoly(self.mask, [np.round(roi * scale).astype(np.int32)], 1)
+        self.prev = None
+        self.moving = 0
+        self.still = 0
+
+    def update(self, frame: np.ndarray) -> bool:
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        gray = cv2.GaussianBlur(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY), (5, 5), 0)
+        prev, self.prev = self.prev, gray
+        if prev is None:
+            self.moving += 1
+            return True
+        changed = cv2.absdiff(gray, prev) > self.pixel_delta
+        if self.mask is not None:
+            frac = float(np.count_nonzero(changed & (self.mask > 0))) / max(1, int(np.count_nonzero(self.mask)))
+        else:
+            frac = float(np.count_nonzero(changed)) / changed.size
+        moving = frac >= self.threshold
+        if moving:
+            self.moving += 1
+        else:
+            self.still += 1
+        return moving
+
+
+_EOS = object()  # end-of-stream marker for the stage queues
+
+
+def _decode_loop(source: FrameSource, out_q: "queue.Queue", clock: StageClock, stop: threading.Event):
+    try:
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            item = source.read()
+            if item is None:
+                break
+            clock.add(1, time.perf_counter() - t0)
+            out_q.put(item)
+    finally:
+        out_q.put(_EOS)
+
+
+def _encode_loop(writer, in_q: "queue.Queue", clock: StageClock, errors: list):
+    try:
+        while True:
+            frame = in_q.get()
+            if frame is _EOS:
+                break
+            t0 = time.perf_counter()
+            writer.write(frame)
+            clock.add(1, time.perf_counter() - t0)
+    except BaseException as e:
+        errors.append(e)  # re-raised on the inference thread by _put_encoded
+
+
+def _put_encoded(out_q: "queue.Queue", item, encoder: threading.Thread, errors: list):
+    """Queue item for the encoder; raise instead of blocking forever if it has died."""
+    while True:
+        try:
+            out_q.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            if not encoder.is_alive():
+                break
+    raise RuntimeError("encoder thread stopped") from (errors[0] if errors else None)
+
+
 def process_video(weights: str,
                   input_video: str,
-                  output_video: str,
+                  output_video: str | None,
                   conf: float = 0.25,
                   square_size: int = 640,
                   output_max_width: int | None = None,
-                  fps_out: float | None = None):
+                  fps_out: float | None = None,
+                  threaded: bool = False,
+                  batch_frames: int = 1,
+                  queue_size: int = 32,
+                  detect_stride: int = 1,
+                  validate_every: int = 0,
+                  ocr: str = "none",
+                  ocr_gpu: bool | None = None,
+                  ocr_recognizer_only: bool = False,
+                  plate_formats: str | None = None,
+                  reads_per_track: int = 3,
+                  min_track_hits: int = 2,
+                  events_out: str | None = None,
+                  sample_fps: float | None = None,
+                  motion_threshold: float | None = None,
+                  roi: str | None = None,
+                  detections_out: str | None = None,
+                  detector=None,
+                  ocr_engine=None,
+                  backend: str = "yolo"):
     """
     Run YOLO plate detection per frame and save an annotated MP4.
     Only rectangles are drawn (no text).
+
+    threaded=True runs decode and encode on their own threads around the
+    inference loop (bounded queues of queue_size frames), and inference takes
+    batch_frames frames per detector call. Frame order is preserved either way.
+    Decode, inference and encode FPS are reported separately.
+
+    detect_stride=N runs YOLO on every N-th frame only; a Kalman/IoU tracker
+    carries the boxes through the frames in between and re-syncs on each
+    keyframe. validate_every=K also runs YOLO on every K-th tracked frame and
+    reports how well tracked boxes agree with the every-frame detections.
+
+    ocr="easyocr-plus" reads plates per track instead of per frame: the
+    reads_per_track sharpest/largest crops of each track are read when the
+    track ends and merged by voting; events_out gets one row per track (CSV or
+    JSON). plate_formats ("BR,AR", "EU", ...) decodes and votes against those
+    country templates. Frames still show boxes only.
+
+    For long fixed-camera footage: sample_fps analyses only that many frames
+    per second (the rest are grabbed, not decoded); motion_threshold skips
+    detection on frames whose low-res difference to the previous analysed
+    frame (inside the roi polygon "x1,y1;x2,y2;...") is below that fraction of
+    pixels, keeping the last boxes. detections_out writes per-frame boxes with
+    timestamps (CSV, or JSON Lines for .jsonl); output_video may then be None
+    to skip re-encoding.
+
+    backend / ocr name registered backends (lpr_easy.backends); detector /
+    ocr_engine replace them with ready instances (e.g. the stub backends of
+    lpr_easy.bench). Returns frame counts and per-stage FPS.
     """
+    if not (output_video or detections_out or events_out):
+        raise ValueError("Nothing to write: set output_video, detections_out or events_out.")
+
     cap = cv2.VideoCapture(input_video)
     if not cap.isOpened():
         raise RuntimeError(f"Cannot open video: {input_video}")
@@ -41,6 +269,9 @@ def process_video(weights: str,
     w_in = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
     h_in = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
 
+    step = max(1, int(round(fps_in / sample_fps))) if sample_fps else 1
+    source = FrameSource(cap, step)
+
     # Optional downscale for output
     if output_max_width and w_in > output_max_width:
         scale = output_max_width / float(w_in)
@@ -49,69 +280,254 @@ def process_video(weights: str,
     else:
         w_out, h_out = w_in, h_in
 
-    fps = fps_out or fps_in
+    fps = fps_out or fps_in / step
+    writer = _open_writer(output_video, fps, (w_out, h_out)) if output_video else None
+    det_stream = None
+    if detections_out:
+        Path(detections_out).parent.mkdir(parents=True, exist_ok=True)
+        if detections_out.lower().endswith(".jsonl"):
+            det_stream = JsonlStream(detections_out)
+        else:
+            det_stream = CsvStream(detections_out, ["frame", "ts", "x1", "y1", "x2", "y2", "score",
+                                                    "class_id", "track_id", "source"])
 
-    # Prefer H.264 if available; fallback to mp4v
-    fourcc = cv2.VideoWriter_fourcc(*"avc1")
-    writer = cv2.VideoWriter(output_video, fourcc, fps, (w_out, h_out))
-    if not writer.isOpened():
-        fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-        writer = cv2.VideoWriter(output_video, fourcc, fps, (w_out, h_out))
-    if not writer.isOpened():
-        raise RuntimeError(f"Cannot open writer: {output_video}")
+    detector = detector or create_detector(backend, AppConfig(detector=backend, weights=weights,
+                                                              conf=conf, square_size=square_size))
 
-    Path(output_video).parent.mkdir(parents=True, exist_ok=True)
+    clocks = {name: StageClock(name) for name in ("decode", "infer", "encode")}
+    batch_frames = max(1, int(batch_frames))
+    detect_stride = max(1, int(detect_stride))
+    gate = MotionGate((w_in, h_in), motion_threshold, parse_roi(roi)) if motion_threshold is not None else None
+    track_ocr = None
+    if ocr != "none" or ocr_engine is not None:
+        from lpr_easy.pipelines.track_ocr import TrackOcr, write_events
+        engine = ocr_engine or create_ocr(ocr, AppConfig(
+            ocr=ocr, ocr_gpu=None if ocr_gpu is None else str(bool(ocr_gpu)).lower(),
+            ocr_recognizer_only=ocr_recognizer_only, plate_formats=plate_formats))
+        track_ocr = TrackOcr(engine, reads_per_track=reads_per_track, min_hits=min_track_hits)
+        clocks["ocr"] = StageClock("ocr")
+    # tracks survive ~0.5 s without a matching keyframe detection
+    max_misses = max(1, int(round(0.5 * fps_in / (step * detect_stride))))
+    tracker = PlateTracker(max_misses=max_misses) if (detect_stride > 1 or track_ocr) else None
+    agree = [0, 0, 0, 0.0]  # matched, reference boxes, tracked boxes, matched IoU sum
+    stop = threading.Event()
+    threads = []
+    encode_errors: list = []
+    if threaded:
+        frame_q: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+        out_q: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+        threads = [threading.Thread(target=_decode_loop, args=(source, frame_q, clocks["decode"], stop), daemon=True)]
+        if writer is not None:
+            threads.append(threading.Thread(target=_encode_loop, args=(writer, out_q, clocks["encode"], encode_errors),
+                                            daemon=True))
+        for t in threads:
+            t.start()
 
-    detector = YoloPlateDetector(weights)
+        def _next_frame():
+            item = frame_q.get()
+            return None if item is _EOS else item
+
+        def _emit(frame):
+            _put_encoded(out_q, frame, threads[1], encode_errors)
+    else:
+        def _next_frame():
+            t0 = time.perf_counter()
+            item = source.read()
+            if item is not None:
+                clocks["decode"].add(1, time.perf_counter() - t0)
+            return item
+
+        def _emit(frame):
+            t0 = time.perf_counter()
+            writer.write(frame)
+            clocks["encode"].add(1, time.perf_counter() - t0)
 
     frames = 0
-    while True:
-        ok, frame = cap.read()
-        if not ok:
-            break
+    analysed = 0  # position among analysed frames (drives detect_stride)
+    last_dets = []
+    t_start = time.perf_counter()
+    try:
+        eos = False
+        while not eos:
+            batch = []
+            while len(batch) < batch_frames:
+                item = _next_frame()
+                if item is None:
+                    eos = True
+                    break
+                batch.append(item)
+            if not batch:
+                break
 
-        dets = detector.predict(frame, conf=conf, imgsz=square_size)
+            t0 = time.perf_counter()
+            positions = range(analysed, analysed + len(batch))
+            analysed += len(batch)
+            moving = [gate.update(f) for _, f in batch] if gate else [True] * len(batch)
+            keys = [j for j, pos in enumerate(positions) if pos % detect_stride == 0 and moving[j]]
+            key_dets = dict(zip(keys, detector.predict_batch([batch[j][1] for j in keys], conf=conf, imgsz=square_size)))
+            profiling.count("frames", len(batch))
+            profiling.count("frames_detected", len(keys))
+            profiling.count("detections", sum(len(d) for d in key_dets.values()))
+            batch_out = []  # per frame: (dets, track ids, source)
+            for j, (i, frame) in enumerate(batch):
+                if tracker is None:
+                    if j in key_dets:
+                        last_dets = key_dets[j]
+                        batch_out.append((last_dets, [None] * len(last_dets), "detect"))
+                    else:
+                        batch_out.append((last_dets, [None] * len(last_dets), "hold"))
+                    continue
+                tracker.step()
+                if j in key_dets:
+                    pairs = tracker.update(key_dets[j])
+                    batch_out.append((key_dets[j], [tid for tid, _ in pairs], "detect"))
+                    if track_ocr:
+                        t1 = time.perf_counter()
+                        track_ocr.observe(i, frame, pairs)
+                        ended = tracker.pop_finished()
+                        if ended:
+                            track_ocr.finish(ended)
+                        t_ocr = time.perf_counter() - t1
+                        clocks["ocr"].add(0, t_ocr)
+                        t0 += t_ocr  # keep OCR time out of the inference clock
+                    continue
+                active = tracker.active(frame.shape)
+                tracked = [d for _, d in active]
+                batch_out.append((tracked, [tid for tid, _ in active], "track"))
+                if validate_every and i % validate_every == 0:
+                    m, n_ref, n_test, iou_sum = box_agreement(
+                        detector.predict(frame, conf=conf, imgsz=square_size), tracked)
+                    agree[0] += m; agree[1] += n_ref; agree[2] += n_test; agree[3] += iou_sum
+            annotated = []
+            if writer is not None:
+                annotated = [_annotate(f, d, (w_in, h_in), (w_out, h_out)) for (_, f), (d, _, _) in zip(batch, batch_out)]
+            clocks["infer"].add(len(batch), time.perf_counter() - t0)
 
-        # Resize for output if needed
-        if (w_out, h_out) != (w_in, h_in):
-            frame_draw = cv2.resize(frame, (w_out, h_out))
-            sx_d = w_out / float(w_in)
-            sy_d = h_out / float(h_in)
-        else:
-            frame_draw = frame
-            sx_d = sy_d = 1.0
+            if det_stream is not None:
+                for (i, _), (dets, ids, src) in zip(batch, batch_out):
+                    det_stream.write(_detection_records(i, fps_in, dets, ids, src, isinstance(det_stream, CsvStream)))
+            for frame_draw in annotated:
+                _emit(frame_draw)
+            frames += len(batch)
+            if frames // 50 != (frames - len(batch)) // 50:
+                print(f"[INFO] processed {frames} frames...")
+    finally:
+        stop.set()
+        if threaded:
+            # unblock the decoder if it waits on a full queue, then stop the encoder
+            while threads[0].is_alive():
+                try:
+                    frame_q.get_nowait()
+                except queue.Empty:
+                    threads[0].join(timeout=0.05)
+            if writer is not None:
+                if threads[1].is_alive():
+                    try:
+                        _put_encoded(out_q, _EOS, threads[1], encode_errors)
+                    except RuntimeError:
+                        pass  # died meanwhile; reported below
+                threads[1].join()
+                if encode_errors and sys.exc_info()[0] is None:
+                    raise RuntimeError("encoder thread failed") from encode_errors[0]
+        cap.release()
+        if writer is not None:
+            writer.release()
+        if det_stream is not None:
+            det_stream.close()
+
+    if track_ocr:
+        t1 = time.perf_counter()
+        track_ocr.finish()
+        clocks["ocr"].add(0, time.perf_counter() - t1)
+        clocks["ocr"].frames = frames
+        if events_out:
+            Path(events_out).parent.mkdir(parents=True, exist_ok=True)
+            write_events(events_out, track_ocr.events, fps_in)
+            print(f"[OK] Track events written: {events_out} ({len(track_ocr.events)} tracks)")
 
-        # Draw only boxes
-        for (x1, y1, x2, y2, _score, _cls_id) in dets:
-            x1s = int(x1 * sx_d);
-            y1s = int(y1 * sy_d)
-            x2s = int(x2 * sx_d);
-            y2s = int(y2 * sy_d)
-            draw_box(frame_draw, (x1s, y1s, x2s, y2s))
+    wall = time.perf_counter() - t_start
+    if output_video:
+        print(f"[OK] Annotated video written: {output_video} ({frames} frames)")
+    if detections_out:
+        print(f"[OK] Detections written: {detections_out} ({det_stream.count} rows, {frames} frames)")
+    if step > 1 or gate:
+        skipped = source.pos - frames
+        print(f"[INFO] Frames: {source.pos} in stream, {skipped} skipped by sampling, "
+              f"{gate.still if gate else 0} without motion (detection skipped)")
+    print("[INFO] FPS " + " ".join(f"{c.name}={c.fps():.1f}" for c in clocks.values())
+          + f" overall={frames / wall if wall > 0 else 0.0:.1f}")
+    if agree[1] or agree[2]:
+        m, n_ref, n_test, iou_sum = agree
+        print(f"[INFO] Tracked vs every-frame boxes: recall={m / max(1, n_ref):.3f} "
+              f"precision={m / max(1, n_test):.3f} mean_iou={iou_sum / max(1, m):.3f} ({n_ref} reference boxes)")
+    return {
+        "frames": frames, "stream_frames": source.pos, "seconds": wall,
+        "fps": {c.name: c.fps() for c in clocks.values()},
+        "overall_fps": frames / wall if wall > 0 else 0.0,
+        "tracks": len(track_ocr.events) if track_ocr else 0,
+    }
 
-        writer.write(frame_draw)
-        frames += 1
-        if frames % 50 == 0:
-            print(f"[INFO] processed {frames} frames...")
 
-    cap.release()
-    writer.release()
-    print(f"[OK] Annotated video written: {output_video} ({frames} frames)")
+def _detection_records(frame_idx: int, fps: float, dets, ids, src: str, as_rows: bool):
+    """Per-box records of one analysed frame (CSV rows or JSON objects)."""
+    ts = round(frame_idx / fps, 3)
+    out = []
+    for (x1, y1, x2, y2, score, cls_id), tid in zip(dets, ids):
+        if as_rows:
+            out.append([frame_idx, ts, x1, y1, x2, y2, f"{score:.4f}", cls_id, "" if tid is None else tid, src])
+        else:
+            out.append({"frame": frame_idx, "ts": ts, "bbox": [x1, y1, x2, y2], "score": float(score),
+                        "class_id": cls_id, "track_id": tid, "source": src})
+    return out
 
 
 if __name__ == "__main__":
     import argparse
 
     p = argparse.ArgumentParser(description="Annotate a video with YOLO plate detections only (no OCR)")
+    p.add_argument("--detector", default="yolo", choices=detector_names(), help="Detector backend (default: yolo)")
     p.add_argument("--weights", required=True, help="Path to YOLO .pt weights")
     p.add_argument("--input_video", required=True, help="Path to input video (mp4)")
-    p.add_argument("--output_video", required=True, help="Path to output annotated video (mp4)")
+    p.add_argument("--output_video", default=None,
+                   help="Path to output annotated video (mp4); optional with --detections-out/--events-out")
     p.add_argument("--conf", type=float, default=0.25, help="YOLO confidence threshold")
     p.add_argument("--square_size", type=int, default=640, help="YOLO inference size (imgsz)")
     p.add_argument("--output-max-width", type=int, default=None, help="Optional output max width (keeps aspect).")
     p.add_argument("--fps-out", type=float, default=None, help="Optional output FPS override.")
+    p.add_argument("--threaded", action="store_true",
+                   help="Decode and encode on their own threads around inference (bounded queues).")
+    p.add_argument("--batch-frames", type=int, default=1, help="Frames per detector call.")
+    p.add_argument("--queue-size", type=int, default=32, help="Frame queue size between stages (threaded mode).")
+    p.add_argument("--detect-stride", type=int, default=1,
+                   help="Run YOLO every N frames and track boxes in between (1 = every frame).")
+    p.add_argument("--validate-every", type=int, default=0,
+                   help="Also detect every K-th tracked frame and report agreement with tracked boxes.")
+    p.add_argument("--ocr", choices=ocr_names(), default="none",
+                   help="Read plates per track (a few crops per vehicle) and write --events-out.")
+    p.add_argument("--ocr-gpu", type=str, default=None, help="Force GPU for OCR: 'true'/'false'.")
+    p.add_argument("--ocr-recognizer-only", action="store_true", help="Skip EasyOCR's text detector on crops.")
+    p.add_argument("--plate-formats", type=str, default=None, metavar="CC[,CC...]",
+                   help="Decode and vote plates against these country templates (e.g. BR,AR or EU).")
+    p.add_argument("--reads-per-track", type=int, default=3, help="OCR reads per track (best crops).")
+    p.add_argument("--min-track-hits", type=int, default=2, help="Ignore tracks with fewer keyframe detections.")
+    p.add_argument("--events-out", type=str, default=None, help="Per-track events CSV/JSON (with --ocr).")
+    p.add_argument("--sample-fps", type=float, default=None,
+                   help="Analyse only this many frames per second; skipped frames are not decoded.")
+    p.add_argument("--motion-threshold", type=float, default=None,
+                   help="Detect only when this fraction of low-res pixels changed (e.g. 0.002).")
+    p.add_argument("--roi", type=str, default=None,
+                   help="Motion ROI polygon in input pixels: 'x1,y1;x2,y2;x3,y3;...'.")
+    p.add_argument("--detections-out", type=str, default=None,
+                   help="Per-frame boxes with timestamps (CSV, or JSON Lines for .jsonl).")
+    p.add_argument("--profile", action="store_true", help="Print per-stage timings and counters at the end.")
+    p.add_argument("--profile-prom", type=str, default=None, help="Also write a Prometheus text-format file.")
+    p.add_argument("--profile-trace", type=str, default=None, help="Also write a Chrome trace JSON of the first spans.")
+    p.add_argument("--profile-trace-spans", type=int, default=20000, help="Spans recorded in the Chrome trace.")
     args = p.parse_args()
 
+    if args.profile or args.profile_prom or args.profile_trace:
+        profiling.enable(trace_limit=args.profile_trace_spans if args.profile_trace else 0)
+
     process_video(
         weights=args.weights,
         input_video=args.input_video,
@@ -120,4 +536,22 @@ if __name__ == "__main__":
         square_size=args.square_size,
         output_max_width=args.output_max_width,
         fps_out=args.fps_out,
+        threaded=args.threaded,
+        batch_frames=args.batch_frames,
+        queue_size=args.queue_size,
+        detect_stride=args.detect_stride,
+        validate_every=args.validate_every,
+        ocr=args.ocr,
+        ocr_gpu=None if args.ocr_gpu is None else args.ocr_gpu.strip().lower() in ("true", "1", "yes", "on"),
+        ocr_recognizer_only=args.ocr_recognizer_only,
+        plate_formats=args.plate_formats,
+        reads_per_track=args.reads_per_track,
+        min_track_hits=args.min_track_hits,
+        events_out=args.events_out,
+        sample_fps=args.sample_fps,
+        motion_threshold=args.motion_threshold,
+        roi=args.roi,
+        detections_out=args.detections_out,
+        backend=args.detector,
     )
+    profiling.finish(summary=args.profile, prometheus=args.profile_prom, trace=args.profile_trace)
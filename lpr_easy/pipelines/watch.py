@@ -0,0 +1,229 @@
+# lpr_easy/pipelines/watch.py
+# All comments/docstrings in English.
+
+import ctypes
+import ctypes.util
+import os
+import select
+import signal
+import struct
+import sys
+import time
+from dataclasses import replace
+from typing import Dict, List, Optional, Set, Tuple
+
+from ..config import AppConfig
+from ..utils.inputs import match_pattern, shard_filter
+from ..utils.io_utils import ensure_dir
+from .detect_then_read import BatchProcessor, load_models
+from .outputs import ResultSink, progress_path
+from .staging import batched, read_images
+
+# inotify(7) constants
+IN_MODIFY, IN_CLOSE_WRITE, IN_MOVED_TO, IN_CREATE = 0x2, 0x8, 0x80, 0x100
+IN_DELETE_SELF, IN_Q_OVERFLOW, IN_ISDIR = 0x400, 0x4000, 0x40000000
+IN_NONBLOCK, IN_CLOEXEC = 0o4000, 0o2000000
+_EVENT = struct.Struct("iIII")
+
+class _Inotify:
+    """Minimal recursive inotify via libc (Linux only, no dependencies)."""
+    MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.libc = libc
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs: Dict[int, str] = {}
+
+    def add(self, path: str):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), self.MASK)
+        if wd >= 0:
+            self.dirs[wd] = path
+
+    def read(self, timeout: float) -> List[Tuple[str, int]]:
+        """(path, mask) events, waiting up to timeout seconds for the first one."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            buf = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return []
+        events, off = [], 0
+        while off + _EVENT.size <= len(buf):
+            wd, mask, _, n = _EVENT.unpack_from(buf, off)
+            name = buf[off + _EVENT.size: off + _EVENT.size + n].rstrip(b"\0")
+            off += _EVENT.size + n
+            if mask & IN_Q_OVERFLOW:
+                events.append(("", IN_Q_OVERFLOW))
+            elif wd in self.dirs:
+                events.append((os.path.join(self.dirs[wd], os.fsdecode(name)), mask))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+class FolderWatcher:
+    """
+    Finds image files under root that match a glob pattern and reports each
+    once it is fully written: on inotify, when the writer closes it or moves
+    it in; otherwise (and for files already present) once its size and mtime
+    stopped changing and it is at least `settle` seconds old.
+
+    Polling rescans only directories whose mtime changed (a new entry changes
+    its parent's mtime) and re-stats only files still being written.
+    """
+    def __init__(self, root: str, pattern: str = "**/*.*", settle: float = 2.0, backend: str = "auto"):
+        self.root = root
+        self.pattern = pattern
+        self.settle = settle
+        self.pending: Dict[str, Tuple[int, int]] = {}  # path -> (size, mtime_ns) at the last check
+        self.closed: Set[str] = set()  # inotify says the writer is done
+        self.dir_mtime: Dict[str, int] = {}
+        self.subdirs: Dict[str, List[str]] = {}
+        self.seen: Set[str] = set()
+        self.inotify: Optional[_Inotify] = None
+        if backend in ("auto", "inotify") and sys.platform.startswith("linux"):
+            try:
+                self.inotify = _Inotify()
+            except (OSError, AttributeError):
+                if backend == "inotify":
+                    raise
+        elif backend == "inotify":
+            raise RuntimeError("inotify is only available on Linux")
+        self.backend = "inotify" if self.inotify else "poll"
+        self._scan(root)
+
+    def _matches(self, path: str) -> bool:
+        return match_pattern(os.path.relpath(path, self.root), self.pattern)
+
+    def _track(self, path: str):
+        if path not in self.seen and self._matches(path):
+            self.seen.add(path)
+            self.pending.setdefault(path, (-1, -1))
+
+    def _scan(self, d: str):
+        """Scan d, listing only directories that are new or whose mtime changed."""
+        try:
+            mtime = os.stat(d).st_mtime_ns
+        except OSError:
+            self.dir_mtime.pop(d, None)
+            return
+        if self.dir_mtime.get(d) != mtime:
+            if d not in self.dir_mtime and self.inotify:
+                self.inotify.add(d)
+            self.dir_mtime[d] = mtime
+            subdirs = []
+            try:
+                with os.scandir(d) as it:
+                    for e in it:
+                        if e.is_dir(follow_symlinks=False):
+                            subdirs.append(e.path)
+                        elif e.is_file():
+                            self._track(e.path)
+            except OSError:
+                return
+            self.subdirs[d] = subdirs
+        for sub in self.subdirs.get(d, []):
+            self._scan(sub)
+
+    def _stable(self) -> List[str]:
+        ready, now = [], time.time()
+        for path, last in list(self.pending.items()):
+            try:
+                st = os.stat(path)
+            except OSError:
+                self.pending.pop(path, None)
+                self.closed.discard(path)
+                continue
+            cur = (st.st_size, st.st_mtime_ns)
+            if path in self.closed or (cur == last and now - st.st_mtime >= self.settle):
+                ready.append(path)
+            else:
+                self.pending[path] = cur
+        for path in ready:
+            self.pending.pop(path, None)
+            self.closed.discard(path)
+        return sorted(ready)
+
+    def poll(self, timeout: float = 1.0) -> List[str]:
+        """Wait up to timeout seconds and return files that became ready."""
+        if self.inotify is None:
+            time.sleep(timeout)
+            self._scan(self.root)
+            return self._stable()
+        for path, mask in self.inotify.read(timeout):
+            if mask & IN_Q_OVERFLOW:
+                self.dir_mtime.clear()  # events were lost: list everything again
+                self._scan(self.root)
+            elif mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self._scan(path)  # files may land before the new watch is added
+            elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                self._track(path)
+                if path in self.pending:
+                    self.closed.add(path)
+            elif mask & (IN_CREATE | IN_MODIFY):
+                self._track(path)
+        return self._stable()
+
+    def close(self):
+        if self.inotify:
+            self.inotify.close()
+
+def watch_folder(cfg: AppConfig, settle: float = 2.0, poll: float = 1.0, backend: str = "auto"):
+    """
+    Process new images under cfg.input_dir as they arrive, with the models
+    loaded once. Results are appended to the streaming outputs and the
+    progress ledger is committed after every micro-batch, so a restart skips
+    everything already processed (including files that arrived while down).
+    """
+    if not progress_path(cfg):
+        raise ValueError("Watch mode needs a main output (--csv, or --out with --format json/jsonl) for its ledger.")
+    cfg = replace(cfg, resume=True)
+    for d in (cfg.save_pre, cfg.save_vis, cfg.save_crops):
+        if d:
+            ensure_dir(d)
+
+    sink = ResultSink(cfg)
+    detector, ocr_engine = load_models(cfg)
+    proc = BatchProcessor(cfg, detector, ocr_engine)
+    watcher = FolderWatcher(cfg.input_dir, cfg.pattern, settle=settle, backend=backend)
+    print(f"[OK] Watching {cfg.input_dir} ({watcher.backend}); {len(sink.done)} image(s) already in the ledger.")
+
+    def _stop(signum, frame):
+        raise KeyboardInterrupt
+    signal.signal(signal.SIGTERM, _stop)
+
+    retry: Dict[str, int] = {}
+    total = 0
+    try:
+        while True:
+            paths = [p for p in shard_filter(watcher.poll(poll), cfg.shard, root=cfg.input_dir) if p not in sink.done]
+            for batch in batched(read_images(paths, reader=proc.read), max(1, cfg.batch_size)):
+                ok = []
+                for path, img in batch:
+                    # a file rewritten in place can still be incomplete: give it a few more tries
+                    if img is None and retry.get(path, 0) < 3:
+                        retry[path] = retry.get(path, 0) + 1
+                        watcher.pending[path] = (-1, -1)
+                        continue
+                    retry.pop(path, None)
+                    ok.append((path, img))
+                if not ok:
+                    continue  # only files still being written; retried on a later poll
+                results = proc.feed(ok) + proc.flush()
+                for r in results:
+                    sink.write(r)
+                sink.commit()
+                total += len(results)
+                print(f"[INFO] Processed {len(results)} new image(s) ({total} this session).")
+    except KeyboardInterrupt:
+        print("[INFO] Stopping watch.")
+    finally:
+        watcher.close()
+        proc.close()
+        sink.close()
+        sink.report()
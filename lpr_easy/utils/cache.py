@@ -0,0 +1,105 @@
+# lpr_easy/utils/cache.py
+# All comments/docstrings in English.
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Optional
+
+import numpy as np
+
+def bytes_digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def file_digest(path: str, chunk: int = 1 << 20) -> str:
+    """Content hash of a file (blake2b, 128 bits)."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def array_digest(arr: np.ndarray) -> str:
+    """Content hash of an array, including its shape and dtype."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{arr.shape}{arr.dtype}".encode())
+    h.update(np.ascontiguousarray(arr).tobytes())
+    return h.hexdigest()
+
+class ResultCache:
+    """
+    Content-addressed on-disk cache (SQLite) for detection and OCR results.
+
+    Values are JSON, grouped by namespace ("det", "ocr"). Total value size is
+    bounded by max_bytes; least recently used entries are evicted first.
+    Safe to share between processes (WAL journal, busy timeout); the size
+    total lives in the database and is updated in each write transaction,
+    so every process evicts against the shared total.
+    """
+    def __init__(self, cache_dir: str, max_bytes: int = 1 << 30, commit_every: int = 256):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, "lpr_cache.sqlite")
+        self.db = sqlite3.connect(self.path, timeout=30.0)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " ns TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+            " size INTEGER NOT NULL, atime REAL NOT NULL, PRIMARY KEY (ns, key))"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS entries_atime ON entries (atime)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self.db.execute("INSERT OR IGNORE INTO meta (name, value) SELECT 'total', COALESCE(SUM(size), 0) FROM entries")
+        self.db.commit()
+        self.max_bytes = int(max_bytes)
+        self.commit_every = commit_every
+        self._writes = 0
+
+    def get(self, ns: str, key: str) -> Optional[Any]:
+        row = self.db.execute("SELECT value FROM entries WHERE ns=? AND key=?", (ns, key)).fetchone()
+        if row is None:
+            return None
+        self.db.execute("UPDATE entries SET atime=? WHERE ns=? AND key=?", (time.time(), ns, key))
+        self._wrote()
+        return json.loads(row[0])
+
+    def put(self, ns: str, key: str, value: Any):
+        data = json.dumps(value, separators=(",", ":"))
+        old = self.db.execute("SELECT size FROM entries WHERE ns=? AND key=?", (ns, key)).fetchone()
+        self.db.execute("INSERT OR REPLACE INTO entries (ns, key, value, size, atime) VALUES (?, ?, ?, ?, ?)",
+                        (ns, key, data, len(data), time.time()))
+        # read back inside this write transaction: includes other processes' committed writes
+        self.db.execute("UPDATE meta SET value = value + ? WHERE name='total'", (len(data) - (old[0] if old else 0),))
+        total = self.db.execute("SELECT value FROM meta WHERE name='total'").fetchone()[0]
+        if total > self.max_bytes:
+            self.evict(total=total)
+        self._wrote()
+
+    def evict(self, target: float = 0.9, total: Optional[int] = None):
+        """Drop least recently used entries until the cache is under target * max_bytes."""
+        goal = int(self.max_bytes * target)
+        if total is None:
+            total = self.db.execute("SELECT value FROM meta WHERE name='total'").fetchone()[0]
+        while total > goal:
+            rows = self.db.execute("SELECT ns, key, size FROM entries ORDER BY atime LIMIT 256").fetchall()
+            if not rows:
+                total = 0
+                break
+            self.db.executemany("DELETE FROM entries WHERE ns=? AND key=?", [(ns, k) for ns, k, _ in rows])
+            total -= sum(size for _, _, size in rows)
+        self.db.execute("UPDATE meta SET value=? WHERE name='total'", (total,))
+
+    def _wrote(self):
+        self._writes += 1
+        if self._writes >= self.commit_every:
+            self.commit()
+
+    def commit(self):
+        self.db.commit()
+        self._writes = 0
+
+    def close(self):
+        self.commit()
+        self.db.close()
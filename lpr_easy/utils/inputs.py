@@ -0,0 +1,125 @@
+# lpr_easy/utils/inputs.py
+# All comments/docstrings in English.
+
+import hashlib
+import os
+import re
+import sys
+from functools import lru_cache
+from typing import Iterator, Optional, Pattern, Tuple
+
+IMAGE_EXTS = {".jpg",".jpeg",".png",".bmp",".webp"}
+
+@lru_cache(maxsize=32)
+def glob_regex(pattern: str) -> Pattern:
+    """
+    Compile a glob pattern relative to the input dir ("**/*.jpg", "cam*/*.png")
+    with glob.glob(recursive=True) semantics: "*", "?" and "[...]" stay
+    within one path segment and "**" matches any number of directories.
+    """
+    out = []
+    parts = pattern.replace(os.sep, "/").split("/")
+    for k, part in enumerate(parts):
+        last = k == len(parts) - 1
+        if part == "**":
+            out.append(".*" if last else "(?:[^/]*/)*")
+            continue
+        i = 0
+        while i < len(part):
+            c = part[i]
+            if c == "*":
+                out.append("[^/]*")
+            elif c == "?":
+                out.append("[^/]")
+            elif c == "[" and part.find("]", i + 2) > 0:
+                j = part.find("]", i + 2)
+                body = part[i + 1:j].replace("\\", "\\\\")
+                out.append("[" + ("^" + body[1:] if body.startswith("!") else body) + "]")
+                i = j
+            else:
+                out.append(re.escape(c))
+            i += 1
+        if not last:
+            out.append("/")
+    return re.compile("".join(out) + r"\Z")
+
+def match_pattern(rel_path: str, pattern: str) -> bool:
+    """True if a path relative to the input dir matches the glob and is an image."""
+    if os.path.splitext(rel_path)[1].lower() not in IMAGE_EXTS:
+        return False
+    return glob_regex(pattern).match(rel_path.replace(os.sep, "/")) is not None
+
+def iter_images(input_dir: str, pattern: str = "**/*.*") -> Iterator[str]:
+    """
+    Lazily walk input_dir with os.scandir and yield matching image paths as
+    they are found (same paths and filter as collect_images, no full listing
+    in memory). Entries are visited depth first in name order, so the output
+    is sorted by path_order_key; hidden entries are skipped like glob does.
+    Without "**" the walk stops at the pattern's depth.
+    """
+    pattern = pattern.replace(os.sep, "/")
+    max_depth = None if "**" in pattern else pattern.count("/")
+
+    def walk(d: str, depth: int) -> Iterator[str]:
+        try:
+            with os.scandir(d) as it:
+                entries = sorted((e for e in it if not e.name.startswith(".")), key=lambda e: e.name)
+        except OSError as e:
+            print(f"[WARN] Cannot list {d}: {e}")
+            return
+        for e in entries:
+            try:
+                is_dir = e.is_dir()
+            except OSError:
+                continue
+            if is_dir:
+                if max_depth is None or depth < max_depth:
+                    yield from walk(e.path, depth + 1)
+            elif match_pattern(os.path.relpath(e.path, input_dir), pattern):
+                yield e.path
+
+    yield from walk(input_dir, 0)
+
+def read_manifest(path: str) -> Iterator[str]:
+    """Image paths from a manifest (one per line, "-" = stdin); blank lines and # comments skipped."""
+    f = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    try:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """ "K/N" -> (K, N) with 0 <= K < N."""
+    m = re.fullmatch(r"\s*(\d+)\s*/\s*(\d+)\s*", spec or "")
+    if not m:
+        raise ValueError(f"Invalid shard '{spec}': expected K/N, e.g. 0/4")
+    k, n = int(m.group(1)), int(m.group(2))
+    if n < 1 or not 0 <= k < n:
+        raise ValueError(f"Invalid shard '{spec}': need N >= 1 and 0 <= K < N")
+    return k, n
+
+def shard_of(key: str, n: int) -> int:
+    """Stable shard index of a path key (same on every node, Python version and run)."""
+    digest = hashlib.blake2b(key.replace(os.sep, "/").encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % n
+
+def shard_filter(paths, spec: Optional[str], root: Optional[str] = None) -> Iterator[str]:
+    """
+    Keep the paths of shard K of N. Keys are relative to root when given, so
+    nodes mounting the same tree at different places still agree.
+    """
+    if not spec:
+        yield from paths
+        return
+    k, n = parse_shard(spec)
+    for p in paths:
+        if shard_of(os.path.relpath(p, root) if root else p, n) == k:
+            yield p
+
+def path_order_key(path: str) -> Tuple[str, ...]:
+    """Sort key matching iter_images order (component-wise, so 'a/b.jpg' < 'a.jpg')."""
+    return tuple(path.replace(os.sep, "/").split("/"))
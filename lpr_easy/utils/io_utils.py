@@ -5,11 +5,15 @@ import csv
 import json
 import os
 from pathlib import Path
-from typing import Iterable, List, Tuple
+from typing import Iterable, List, Optional, Tuple
 
 import cv2
 import numpy as np
 
+from . import profiling
+from .inputs import IMAGE_EXTS
+from .stream_io import JsonArrayStream, JsonlStream
+
 def ensure_dir(d: str):
     if d and not os.path.exists(d):
         os.makedirs(d, exist_ok=True)
@@ -17,16 +21,79 @@ def ensure_dir(d: str):
 def collect_images(input_dir: str, pattern: str) -> List[str]:
     """
     Return a list of image paths under input_dir that match a glob pattern.
+    For large trees prefer inputs.iter_images, which streams them.
     """
     import glob
     paths = sorted(glob.glob(os.path.join(input_dir, pattern), recursive=True))
     valid = []
-    exts = {".jpg",".jpeg",".png",".bmp",".webp"}
     for p in paths:
-        if Path(p).suffix.lower() in exts:
+        if Path(p).suffix.lower() in IMAGE_EXTS:
             valid.append(p)
     return valid
 
+# cv2 flags that decode a JPEG at 1/2, 1/4, 1/8 size (libjpeg DCT scaling, not a resize)
+REDUCED_FLAGS = {1: cv2.IMREAD_COLOR, 2: cv2.IMREAD_REDUCED_COLOR_2,
+                 4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}
+_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+def jpeg_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """(width, height) from a JPEG's SOF header without decoding; None if not a JPEG."""
+    if data[:2] != b"\xff\xd8":
+        return None
+    i, n = 2, len(data)
+    while i + 9 < n:
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker in _SOF:
+            h, w = int.from_bytes(data[i + 5:i + 7], "big"), int.from_bytes(data[i + 7:i + 9], "big")
+            return (w, h) if w and h else None
+        if marker == 0xD8 or 0xD0 <= marker <= 0xD7:
+            i += 2
+            continue
+        i += 2 + int.from_bytes(data[i + 2:i + 4], "big")
+    return None
+
+def pick_decode_scale(size: Optional[Tuple[int, int]], target: int, scale: str = "auto") -> int:
+    """
+    JPEG decode reduction for detection: the configured 2/4/8, or with "auto"
+    the largest one that keeps the long side >= target (the detector's input
+    size, so detection sees the same pixels it would after its own resize).
+    """
+    if size is None or scale == "1":
+        return 1
+    if scale != "auto":
+        return int(scale)
+    for s in (8, 4, 2):
+        if max(size) / s >= target:
+            return s
+    return 1
+
+def decode_reduced(data: bytes, scale: int, size: Tuple[int, int]) -> Tuple[Optional[np.ndarray], Tuple[int, int]]:
+    """
+    Decode a JPEG at 1/scale. Returns (image, full (width, height)) where the
+    full size follows the decoded orientation (EXIF rotation swaps the header's).
+    """
+    img = cv2.imdecode(np.frombuffer(data, np.uint8), REDUCED_FLAGS[scale])
+    w, h = size
+    if img is not None and (abs(img.shape[1] * scale - w) >= scale or abs(img.shape[0] * scale - h) >= scale):
+        w, h = h, w
+    return img, (w, h)
+
+def scale_dets(dets: List[Tuple[int,int,int,int,float,int]], shape: Tuple[int, ...],
+               size: Tuple[int, int]) -> List[Tuple[int,int,int,int,float,int]]:
+    """Map detections on an image of `shape` to a (width, height) version of it, clipped like the detectors do."""
+    h, w = shape[:2]
+    fw, fh = size
+    sx, sy = fw / w, fh / h
+    return [(min(fw - 1, int(round(x1 * sx))), min(fh - 1, int(round(y1 * sy))),
+             min(fw - 1, int(round(x2 * sx))), min(fh - 1, int(round(y2 * sy))), score, cls)
+            for (x1, y1, x2, y2, score, cls) in dets]
+
+@profiling.profiled("write.vis")
 def save_visualization(img: np.ndarray, dets: List[Tuple[int,int,int,int,float,int]], out_path: str, class_names: List[str]):
     """
     Draw bounding boxes on the image and save it.
@@ -39,50 +106,74 @@ def save_visualization(img: np.ndarray, dets: List[Tuple[int,int,int,int,float,i
         cv2.putText(vis, label, (x1, max(0, y1 - 5)), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
     cv2.imwrite(out_path, vis)
 
+@profiling.profiled("write.pre")
 def save_pre(img: np.ndarray, out_path: str, square_size: int):
     resized = cv2.resize(img, (square_size, square_size))
     cv2.imwrite(out_path, resized)
 
-def save_crop(img: np.ndarray, bbox, out_dir: str, base_name: str, idx: int) -> str:
+def pad_crop(img: np.ndarray, bbox) -> np.ndarray:
     """
-    Save a plate crop from the original image given a bbox (x1,y1,x2,y2).
-    Returns the crop path.
+    Return a copy of the plate region given a bbox (x1,y1,x2,y2), padded by 5%
+    of its largest side and clipped to the image.
     """
     x1, y1, x2, y2 = bbox
     h, w = img.shape[:2]
     pad = int(0.05 * max(x2 - x1, y2 - y1))
     x1p = max(0, x1 - pad); y1p = max(0, y1 - pad)
     x2p = min(w - 1, x2 + pad); y2p = min(h - 1, y2 + pad)
-    crop = img[y1p:y2p, x1p:x2p].copy()
-    out_path = os.path.join(out_dir, f"{Path(base_name).stem}_crop{idx:02d}.jpg")
-    cv2.imwrite(out_path, crop)
-    return out_path
+    return img[y1p:y2p, x1p:x2p].copy()
 
-def maybe_rename_crop_with_plate(crop_path: str, plate_text: str) -> str:
+def crop_out_path(out_dir: str, base_name: str, idx: int, plate_text: str = "") -> str:
     """
-    Optionally rename the crop file by appending the plate string.
+    Path of the idx-th crop of an image. When plate_text is given, the
+    alphanumeric plate is appended to the stem (e.g. img_crop00__ABC1D23.jpg).
     """
-    if not plate_text:
-        return crop_path
-    p = Path(crop_path)
+    stem = f"{Path(base_name).stem}_crop{idx:02d}"
     safe_plate = "".join([c for c in plate_text if c.isalnum()])
-    new_name = f"{p.stem}__{safe_plate}{p.suffix}"
-    new_path = str(p.with_name(new_name))
-    try:
-        os.replace(str(p), new_path)
-        return new_path
-    except Exception:
-        return crop_path
+    if safe_plate:
+        stem = f"{stem}__{safe_plate}"
+    return os.path.join(out_dir, f"{stem}.jpg")
+
+@profiling.profiled("write.crop")
+def write_crop(crop: np.ndarray, out_path: str):
+    cv2.imwrite(out_path, crop)
+
+def save_crop(img: np.ndarray, bbox, out_dir: str, base_name: str, idx: int, plate_text: str = "") -> str:
+    """
+    Save a plate crop from the original image given a bbox (x1,y1,x2,y2).
+    Returns the crop path.
+    """
+    out_path = crop_out_path(out_dir, base_name, idx, plate_text)
+    write_crop(pad_crop(img, bbox), out_path)
+    return out_path
+
+MAIN_CSV_HEADER = ["image_path","crop_path","x1","y1","x2","y2","score","class","plate","plate_conf"]
+OCR_CSV_HEADER = ["crop_path","plate","conf","variant","rotations","passes","source"]
+
+def ocr_sidecar_row(key: str, v: dict) -> list:
+    return [key, v.get("plate",""), f'{v.get("conf",0.0):.4f}', v.get("variant",""),
+            " ".join(str(a) for a in v.get("rotations",[])), v.get("passes",""), v.get("source","")]
 
 def write_main_csv(csv_path: str, rows: List[list]):
     with open(csv_path, "w", newline="") as f:
         w = csv.writer(f)
-        w.writerow(["image_path","crop_path","x1","y1","x2","y2","score","class","plate","plate_conf"])
+        w.writerow(MAIN_CSV_HEADER)
         w.writerows(rows)
 
-def write_main_json(json_path: str, entries: List[dict]):
-    with open(json_path, "w") as f:
-        json.dump(entries, f, ensure_ascii=False, indent=2)
+def write_main_json(json_path: str, entries: Iterable[dict]):
+    # streaming encoder: same bytes as json.dump(list(entries), indent=2)
+    out = JsonArrayStream(json_path)
+    try:
+        out.write(entries)
+    finally:
+        out.close()
+
+def write_main_jsonl(jsonl_path: str, entries: Iterable[dict]):
+    out = JsonlStream(jsonl_path)
+    try:
+        out.write(entries)
+    finally:
+        out.close()
 
 def write_ocr_sidecar(path: str, ocr_map: dict):
     if path.lower().endswith(".json"):
@@ -91,6 +182,6 @@ def write_ocr_sidecar(path: str, ocr_map: dict):
     else:
         with open(path, "w", newline="") as f:
             w = csv.writer(f)
-            w.writerow(["crop_path","plate","conf"])
+            w.writerow(OCR_CSV_HEADER)
             for k,v in ocr_map.items():
-                w.writerow([k, v.get("plate",""), f'{v.get("conf",0.0):.4f}'])
+                w.writerow(ocr_sidecar_row(k, v))
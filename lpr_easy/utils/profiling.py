@@ -0,0 +1,219 @@
+# lpr_easy/utils/profiling.py
+# All comments/docstrings in English.
+
+import bisect
+import functools
+import json
+import os
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+# Histogram bounds: stage durations (seconds) and plain values (e.g. OCR passes)
+TIME_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+VALUE_BUCKETS = (1, 2, 3, 4, 6, 8, 12, 16, 24, 32, 64)
+RESERVOIR = 50_000  # samples kept per histogram for percentiles
+
+class Histogram:
+    """Cumulative bucket counts + sum (Prometheus style) and a sample reservoir for percentiles."""
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.buckets = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: List[float] = []
+
+    def add(self, v: float):
+        self.buckets[bisect.bisect_left(self.bounds, v)] += 1
+        self.count += 1
+        self.total += v
+        self.max = max(self.max, v)
+        if len(self.samples) < RESERVOIR:
+            self.samples.append(v)
+        else:
+            j = random.randrange(self.count)
+            if j < RESERVOIR:
+                self.samples[j] = v
+
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        s = sorted(self.samples)
+        return s[min(len(s) - 1, int(round(q / 100.0 * (len(s) - 1))))]
+
+class _Span:
+    __slots__ = ("prof", "name", "t0")
+
+    def __init__(self, prof: "Profiler", name: str):
+        self.prof, self.name = prof, name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.prof.add(self.name, time.perf_counter() - self.t0, self.t0)
+        return False
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL = _NullSpan()
+
+class Profiler:
+    """
+    Per-stage timing histograms, value histograms and counters, plus Chrome
+    trace events for the first trace_limit spans (0 = no trace).
+    Thread-safe; stages running on pool threads show up on their own trace rows.
+    """
+    def __init__(self, trace_limit: int = 0):
+        self.stages: Dict[str, Histogram] = {}
+        self.values: Dict[str, Histogram] = {}
+        self.counters: Dict[str, float] = {}
+        self.trace_limit = trace_limit
+        self.events: List[dict] = []
+        self.t_origin = time.perf_counter()
+        self.lock = threading.Lock()
+
+    def span(self, name: str) -> _Span:
+        return _Span(self, name)
+
+    def add(self, name: str, seconds: float, start: Optional[float] = None):
+        with self.lock:
+            h = self.stages.get(name)
+            if h is None:
+                h = self.stages[name] = Histogram(TIME_BUCKETS)
+            h.add(seconds)
+            if start is not None and len(self.events) < self.trace_limit:
+                self.events.append({
+                    "name": name, "ph": "X", "pid": os.getpid(), "tid": threading.get_ident(),
+                    "ts": round((start - self.t_origin) * 1e6, 1), "dur": round(seconds * 1e6, 1),
+                })
+
+    def count(self, name: str, n: float = 1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name: str, value: float):
+        with self.lock:
+            h = self.values.get(name)
+            if h is None:
+                h = self.values[name] = Histogram(VALUE_BUCKETS)
+            h.add(value)
+
+    def summary(self) -> str:
+        """Text table: stage timings (ms), value histograms and counters."""
+        lines = [f"{'stage':<22}{'count':>9}{'total s':>10}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}"]
+        for name, h in sorted(self.stages.items(), key=lambda kv: -kv[1].total):
+            lines.append(f"{name:<22}{h.count:>9}{h.total:>10.2f}{1000 * h.total / max(1, h.count):>10.2f}"
+                         f"{1000 * h.percentile(50):>10.2f}{1000 * h.percentile(95):>10.2f}{1000 * h.max:>10.2f}")
+        for name, h in sorted(self.values.items()):
+            lines.append(f"{name:<22}{h.count:>9}  mean={h.total / max(1, h.count):.2f} "
+                         f"p50={h.percentile(50):g} p95={h.percentile(95):g} max={h.max:g}")
+        if self.counters:
+            lines.append("counters: " + " ".join(f"{k}={v:g}" for k, v in sorted(self.counters.items())))
+        return "\n".join(lines)
+
+    def write_prometheus(self, path: str, prefix: str = "lpr"):
+        """Prometheus text exposition format (histograms + counters)."""
+        out = []
+
+        def hist(metric: str, label: str, items: Dict[str, Histogram]):
+            if not items:
+                return
+            out.append(f"# TYPE {metric} histogram")
+            for name, h in sorted(items.items()):
+                cum = 0
+                for bound, n in zip(h.bounds + (float("inf"),), h.buckets):
+                    cum += n
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    out.append(f'{metric}_bucket{{{label}="{name}",le="{le}"}} {cum}')
+                out.append(f'{metric}_sum{{{label}="{name}"}} {h.total:.6f}')
+                out.append(f'{metric}_count{{{label}="{name}"}} {h.count}')
+
+        hist(f"{prefix}_stage_seconds", "stage", self.stages)
+        hist(f"{prefix}_value", "name", self.values)
+        if self.counters:
+            out.append(f"# TYPE {prefix}_events_total counter")
+            for name, v in sorted(self.counters.items()):
+                out.append(f'{prefix}_events_total{{name="{name}"}} {v:g}')
+        with open(path, "w") as f:
+            f.write("\n".join(out) + "\n")
+
+    def write_chrome_trace(self, path: str):
+        """Chrome trace JSON (chrome://tracing, Perfetto) of the recorded spans."""
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
+# Process-wide profiler; None when disabled so hooks cost one global lookup.
+_active: Optional[Profiler] = None
+
+def enable(trace_limit: int = 0) -> Profiler:
+    global _active
+    _active = Profiler(trace_limit=trace_limit)
+    return _active
+
+def disable() -> Optional[Profiler]:
+    global _active
+    prof, _active = _active, None
+    return prof
+
+def current() -> Optional[Profiler]:
+    return _active
+
+def span(name: str):
+    """Context manager timing a stage (a shared no-op when profiling is off)."""
+    prof = _active
+    return _NULL if prof is None else prof.span(name)
+
+def count(name: str, n: float = 1):
+    prof = _active
+    if prof is not None:
+        prof.count(name, n)
+
+def observe(name: str, value: float):
+    prof = _active
+    if prof is not None:
+        prof.observe(name, value)
+
+def add(name: str, seconds: float, start: Optional[float] = None):
+    """Record an already measured stage duration (e.g. from an existing clock)."""
+    prof = _active
+    if prof is not None:
+        prof.add(name, seconds, start)
+
+def profiled(name: str):
+    """Decorator form of span() for whole functions."""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            prof = _active
+            if prof is None:
+                return fn(*args, **kwargs)
+            with prof.span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+def finish(summary: bool = True, prometheus: Optional[str] = None, trace: Optional[str] = None):
+    """Disable profiling, print the summary table and write the optional exports."""
+    prof = disable()
+    if prof is None:
+        return None
+    if summary:
+        print("[PROFILE]\n" + prof.summary())
+    if prometheus:
+        prof.write_prometheus(prometheus)
+        print(f"[OK] Prometheus metrics written: {prometheus}")
+    if trace:
+        prof.write_chrome_trace(trace)
+        print(f"[OK] Chrome trace written: {trace} ({len(prof.events)} spans)")
+    return prof
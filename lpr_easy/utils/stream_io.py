@@ -0,0 +1,180 @@
+# lpr_easy/utils/stream_io.py
+# All comments/docstrings in English.
+
+import csv
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+def _fsync(f):
+    f.flush()
+    os.fsync(f.fileno())
+
+class _Stream:
+    """
+    Base for append-only output files that can be checkpointed (byte offset +
+    item count) and resumed by truncating back to the last checkpoint.
+    """
+    def __init__(self, path: str, state: Optional[dict] = None):
+        self.path = path
+        self.count = 0
+        if state and os.path.exists(path):
+            with open(path, "r+b") as f:
+                f.truncate(int(state["offset"]))
+            self.count = int(state["count"])
+            self.f = open(path, "a", newline="", encoding="utf-8")
+        else:
+            self.f = open(path, "w", newline="", encoding="utf-8")
+            self._begin()
+
+    def _begin(self):
+        pass
+
+    def _end(self):
+        pass
+
+    def state(self) -> dict:
+        self.f.flush()
+        return {"path": self.path, "offset": self.f.tell(), "count": self.count}
+
+    def sync(self):
+        _fsync(self.f)
+
+    def close(self):
+        if self.f.closed:
+            return
+        self._end()
+        self.f.close()
+
+class CsvStream(_Stream):
+    """CSV file written row by row, with a header on creation."""
+    def __init__(self, path: str, header: List[str], state: Optional[dict] = None):
+        self.header = header
+        super().__init__(path, state)
+        self.w = csv.writer(self.f)
+
+    def _begin(self):
+        csv.writer(self.f).writerow(self.header)
+
+    def write(self, rows: Iterable[list]):
+        for row in rows:
+            self.w.writerow(row)
+            self.count += 1
+        self.f.flush()
+
+class JsonlStream(_Stream):
+    """JSON Lines: one compact JSON object per line."""
+    def write(self, entries: Iterable[Any]):
+        for e in entries:
+            self.f.write(json.dumps(e, ensure_ascii=False) + "\n")
+            self.count += 1
+        self.f.flush()
+
+def _indent(text: str, pad: str = "  ") -> str:
+    return "\n".join(pad + line for line in text.split("\n"))
+
+class JsonArrayStream(_Stream):
+    """
+    Streaming encoder for a JSON array; the bytes match
+    json.dump(entries, f, ensure_ascii=False, indent=2).
+    Checkpoint offsets never include the closing bracket.
+    """
+    def _begin(self):
+        self.f.write("[")
+
+    def write(self, entries: Iterable[Any]):
+        for e in entries:
+            self.f.write((",\n" if self.count else "\n") + _indent(json.dumps(e, ensure_ascii=False, indent=2)))
+            self.count += 1
+        self.f.flush()
+
+    def _end(self):
+        self.f.write("\n]" if self.count else "]")
+
+class JsonObjectStream(_Stream):
+    """
+    Streaming encoder for a JSON object written key by key; the bytes match
+    json.dump(mapping, f, ensure_ascii=False, indent=2).
+    """
+    def _begin(self):
+        self.f.write("{")
+
+    def write(self, items: Iterable[Tuple[str, Any]]):
+        for k, v in items:
+            value = json.dumps(v, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+            self.f.write((",\n" if self.count else "\n") + f"  {json.dumps(k, ensure_ascii=False)}: {value}")
+            self.count += 1
+        self.f.flush()
+
+    def _end(self):
+        self.f.write("\n}" if self.count else "}")
+
+class Checkpoint:
+    """
+    Progress marker for --resume: a ledger of processed images (one path per
+    line) plus a JSON marker holding the ledger and output offsets. The marker
+    is replaced atomically after fsync'ing every file it points into, so after
+    a crash outputs can be truncated back to a consistent state. `done` (the
+    set of processed images) is only kept when resuming, for the skip check.
+    """
+    def __init__(self, marker_path: str, resume: bool = False):
+        self.marker_path = marker_path
+        self.resume = resume
+        self.ledger_path = marker_path + ".done"
+        self.files: Dict[str, dict] = {}
+        self.done: Set[str] = set()
+        self.images = 0
+
+        state = None
+        if resume and os.path.exists(marker_path):
+            with open(marker_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        if state:
+            self.files = state.get("files", {})
+            self.images = int(state.get("images", 0))
+            with open(self.ledger_path, "r+b") as f:
+                f.truncate(int(state["ledger_offset"]))
+            with open(self.ledger_path, "r", encoding="utf-8") as f:
+                self.done = {line.rstrip("\n") for line in f if line.strip()}
+            self.ledger = open(self.ledger_path, "a", encoding="utf-8")
+        else:
+            if resume:
+                print(f"[INFO] No progress marker at {marker_path}; starting from scratch.")
+            self.ledger = open(self.ledger_path, "w", encoding="utf-8")
+
+    @staticmethod
+    def remove(marker_path: str):
+        """Delete a marker and its ledger, if present."""
+        for p in (marker_path, marker_path + ".done"):
+            if os.path.exists(p):
+                os.remove(p)
+
+    def file_state(self, name: str, path: str) -> Optional[dict]:
+        """Checkpointed state for an output, if it was written to the same path."""
+        st = self.files.get(name)
+        return st if st and st.get("path") == path else None
+
+    def mark(self, image: str):
+        self.ledger.write(image + "\n")
+        if self.resume:
+            self.done.add(image)
+        self.images += 1
+
+    def commit(self, streams: Dict[str, _Stream]):
+        for s in streams.values():
+            s.sync()
+        _fsync(self.ledger)
+        marker = {
+            "version": 1,
+            "images": self.images,
+            "ledger_offset": self.ledger.tell(),
+            "files": {name: s.state() for name, s in streams.items()},
+        }
+        tmp = self.marker_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(marker, f, indent=2)
+            _fsync(f)
+        os.replace(tmp, self.marker_path)
+
+    def close(self):
+        self.ledger.close()
@@ -2,6 +2,7 @@
 # All comments/docstrings in English.
 
 import re
+from typing import Callable, Sequence, Tuple
 
 PAT_BR_OLD = re.compile(r"^[A-Z]{3}\d{4}$")         # ABC1234
 PAT_BR_MERC = re.compile(r"^[A-Z]{3}\d[A-Z]\d{2}$") # ABC1D23
@@ -50,3 +51,44 @@ def plate_validity_score(s: str) -> int:
         if ch not in ALLOWLIST:
             score -= 1
     return score
+
+def vote_plate(readings: Sequence[Tuple[str, float]],
+               normalize: Callable[[str], str] = normalize_plate,
+               validity: Callable[[str], int] = plate_validity_score) -> Tuple[str, float]:
+    """
+    Merge several readings of the same plate by per-character voting.
+    Each reading votes with weight conf * (1 + validity / 12), so
+    pattern-valid reads dominate. Only readings of the most supported length
+    vote per position. Returns (plate, conf) where conf is the average
+    weighted agreement of the winning characters; the best single reading is
+    returned instead if it scores higher than the vote.
+    normalize/validity default to the Brazilian rules; pass an engine's
+    normalize/validity to vote under its plate formats.
+    """
+    reads = [(normalize(t), float(c)) for t, c in readings if t]
+    reads = [(t, c) for t, c in reads if t]
+    if not reads:
+        return "", 0.0
+    weighted = [(t, c, c * (1 + max(0, validity(t)) / 12.0)) for t, c in reads]
+
+    by_len = {}
+    for t, c, w in weighted:
+        by_len[len(t)] = by_len.get(len(t), 0.0) + w
+    n = max(by_len, key=lambda k: (by_len[k], k == 7))
+    same = [(t, c, w) for t, c, w in weighted if len(t) == n]
+
+    chars, shares = [], []
+    for pos in range(n):
+        votes = {}
+        for t, _, w in same:
+            votes[t[pos]] = votes.get(t[pos], 0.0) + w
+        ch = max(votes, key=votes.get)
+        chars.append(ch)
+        shares.append(votes[ch] / max(sum(votes.values()), 1e-9))
+    voted = normalize("".join(chars))
+    conf = sum(shares) / n * max(c for _, c, _ in same)
+
+    best_t, best_c, _ = max(weighted, key=lambda x: (validity(x[0]) + x[1], x[1]))
+    if validity(best_t) + best_c > validity(voted) + conf:
+        return best_t, best_c
+    return voted, conf
@@ -0,0 +1,178 @@
+# lpr_easy/utils/tracking.py
+# All comments/docstrings in English.
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+Box = Tuple[int, int, int, int]
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU of (N,4) and (M,4) xyxy boxes -> (N,M)."""
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros((len(a), len(b)), dtype=np.float32)
+    a = a.astype(np.float32)[:, None, :]
+    b = b.astype(np.float32)[None, :, :]
+    iw = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    ih = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = iw * ih
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return inter / np.maximum(area_a + area_b - inter, 1e-6)
+
+def greedy_match(iou: np.ndarray, threshold: float) -> List[Tuple[int, int]]:
+    """One-to-one (row, col) pairs, highest IoU first, IoU >= threshold."""
+    pairs = []
+    if iou.size == 0:
+        return pairs
+    rows, cols = np.nonzero(iou >= threshold)
+    order = np.argsort(-iou[rows, cols], kind="stable")
+    used_r, used_c = set(), set()
+    for k in order:
+        r, c = int(rows[k]), int(cols[k])
+        if r in used_r or c in used_c:
+            continue
+        used_r.add(r); used_c.add(c)
+        pairs.append((r, c))
+    return pairs
+
+class BoxTrack:
+    """
+    Constant-velocity Kalman filter on (cx, cy, w, h) for one plate box.
+    """
+    # state: cx, cy, w, h, vcx, vcy, vw, vh; one step = one frame
+    F = np.eye(8, dtype=np.float64)
+    F[:4, 4:] = np.eye(4)
+    H = np.eye(4, 8, dtype=np.float64)
+
+    def __init__(self, track_id: int, det):
+        x1, y1, x2, y2, score, cls = det
+        self.id = track_id
+        self.cls = int(cls)
+        self.score = float(score)
+        w, h = float(x2 - x1), float(y2 - y1)
+        self.x = np.array([x1 + w / 2, y1 + h / 2, w, h, 0, 0, 0, 0], dtype=np.float64)
+        self.P = np.diag([w, h, w, h, 4 * w, 4 * h, w, h]) ** 2 * 0.05 + np.eye(8)
+        self.hits = 1  # keyframe detections matched to this track
+        self.misses = 0  # consecutive keyframes without a match
+        self.age = 0  # frames since the last matched detection
+
+    def _noise(self):
+        w, h = max(self.x[2], 1.0), max(self.x[3], 1.0)
+        q = np.array([w, h, w, h, w, h, w, h]) * np.array([0.05, 0.05, 0.05, 0.05, 0.01, 0.01, 0.005, 0.005])
+        r = np.array([w, h, w, h]) * 0.05
+        return np.diag(q ** 2), np.diag(r ** 2)
+
+    def predict(self):
+        Q, _ = self._noise()
+        self.x = self.F @ self.x
+        self.x[2:4] = np.maximum(self.x[2:4], 1.0)
+        self.P = self.F @ self.P @ self.F.T + Q
+        self.age += 1
+
+    def update(self, det):
+        x1, y1, x2, y2, score, cls = det
+        w, h = float(x2 - x1), float(y2 - y1)
+        z = np.array([x1 + w / 2, y1 + h / 2, w, h], dtype=np.float64)
+        _, R = self._noise()
+        S = self.H @ self.P @ self.H.T + R
+        K = self.P @ self.H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ (z - self.H @ self.x)
+        self.P = (np.eye(8) - K @ self.H) @ self.P
+        self.score = float(score)
+        self.hits += 1
+        self.misses = 0
+        self.age = 0
+
+    def box(self) -> Box:
+        cx, cy, w, h = self.x[:4]
+        return (int(cx - w / 2), int(cy - h / 2), int(cx + w / 2), int(cy + h / 2))
+
+    def as_det(self, shape) -> Optional[Tuple[int, int, int, int, float, int]]:
+        """The predicted box as a detection tuple, clipped to the frame (None if outside)."""
+        h, w = shape[:2]
+        x1, y1, x2, y2 = self.box()
+        x1 = max(0, min(x1, w - 1)); x2 = max(0, min(x2, w - 1))
+        y1 = max(0, min(y1, h - 1)); y2 = max(0, min(y2, h - 1))
+        if x2 <= x1 or y2 <= y1:
+            return None
+        return (x1, y1, x2, y2, self.score, self.cls)
+
+class PlateTracker:
+    """
+    IoU tracker with a constant-velocity Kalman motion model.
+
+    step() advances every track by one frame; update(dets) then associates a
+    keyframe's detections with the predicted tracks (greedy IoU, same class,
+    one-to-one) and re-syncs matched tracks to the detector boxes. Unmatched
+    detections start new tracks; tracks unmatched for more than max_misses
+    keyframes are dropped. Between keyframes only tracks matched on the last
+    keyframe are reported, so a stale track is never drawn or read.
+    """
+    def __init__(self, iou_threshold: float = 0.3, max_misses: int = 1):
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses
+        self.tracks: List[BoxTrack] = []
+        self.finished: List[int] = []  # ids of dropped tracks, see pop_finished()
+        self._next_id = 1
+
+    def step(self):
+        for t in self.tracks:
+            t.predict()
+
+    def update(self, dets: Sequence) -> List[Tuple[int, tuple]]:
+        """
+        Associate keyframe detections; returns (track_id, det) per detection, in det order.
+        """
+        boxes_t = np.array([t.box() for t in self.tracks], dtype=np.float32).reshape(-1, 4)
+        boxes_d = np.array([d[:4] for d in dets], dtype=np.float32).reshape(-1, 4)
+        iou = iou_matrix(boxes_t, boxes_d)
+        for ti, t in enumerate(self.tracks):
+            for di, d in enumerate(dets):
+                if int(d[5]) != t.cls:
+                    iou[ti, di] = 0.0
+
+        ids: Dict[int, int] = {}
+        matched_t = set()
+        for ti, di in greedy_match(iou, self.iou_threshold):
+            self.tracks[ti].update(dets[di])
+            ids[di] = self.tracks[ti].id
+            matched_t.add(ti)
+        for ti, t in enumerate(self.tracks):
+            if ti not in matched_t:
+                t.misses += 1
+        self.finished.extend(t.id for t in self.tracks if t.misses > self.max_misses)
+        self.tracks = [t for t in self.tracks if t.misses <= self.max_misses]
+        for di, d in enumerate(dets):
+            if di not in ids:
+                t = BoxTrack(self._next_id, d)
+                self._next_id += 1
+                self.tracks.append(t)
+                ids[di] = t.id
+        return [(ids[di], d) for di, d in enumerate(dets)]
+
+    def pop_finished(self) -> List[int]:
+        """Ids of tracks dropped since the last call."""
+        out, self.finished = self.finished, []
+        return out
+
+    def active(self, shape) -> List[Tuple[int, tuple]]:
+        """(track_id, predicted det) for tracks matched on the last keyframe."""
+        out = []
+        for t in self.tracks:
+            if t.misses == 0:
+                d = t.as_det(shape)
+                if d is not None:
+                    out.append((t.id, d))
+        return out
+
+def box_agreement(ref: Sequence, test: Sequence, iou_threshold: float = 0.5) -> Tuple[int, int, int, float]:
+    """
+    Compare test boxes against reference boxes.
+    Returns (matched, n_ref, n_test, sum of matched IoU).
+    """
+    a = np.array([d[:4] for d in ref], dtype=np.float32).reshape(-1, 4)
+    b = np.array([d[:4] for d in test], dtype=np.float32).reshape(-1, 4)
+    iou = iou_matrix(a, b)
+    pairs = greedy_match(iou, iou_threshold)
+    return len(pairs), len(ref), len(test), float(sum(iou[r, c] for r, c in pairs))